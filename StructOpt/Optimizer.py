@@ -1,16 +1,28 @@
 import os
+import copy
+import json
+import math
 import time
 import random
 import logging
+import numpy
 from importlib import import_module
 
 import StructOpt.tools
 import StructOpt.fileio
+from StructOpt.tools.timing import timers, clock
 
 from ase import Atom, Atoms
 
 from mpi4py import MPI
 
+# MPI message tag for offspring exchanged in the steady-state algorithm
+STEADY_STATE_TAG = 11
+# Selections tried by breed_offspring before it gives up on producing a new structure
+BREED_ATTEMPTS = 100
+# MPI message tag for individuals migrating between islands
+MIGRATION_TAG = 12
+
 class Optimizer():
     __version__  = 'StructOpt_v2.0'
 
@@ -19,6 +31,15 @@ class Optimizer():
         self.logger = logging.getLogger('default')
         for k, v in StructOpt.parameters.items():
             setattr(self, k, v)
+        StructOpt.generate.descriptor_cache.resize(self.descriptor_cache_size)
+        StructOpt.generate.evaluation_cache.resize(self.evaluation_cache_size)
+        timers.enabled = self.timing
+        if self.surrogate_screening:
+            self.surrogate = StructOpt.tools.FitnessSurrogate(self.surrogate_train_size,
+                self.surrogate_alpha)
+        else:
+            self.surrogate = None
+        self.setup_islands()
 
         self.relaxation_modules = []
         for rm in self.relaxations:
@@ -32,22 +53,18 @@ class Optimizer():
             cls = getattr(mod, '{cls_name}_eval'.format(cls_name=fm))  # Get's the class from the module package
             self.fitness_modules.append(cls())
 
+        self.writer = None
         if self.restart_optimizer:
                 self.logger.info('restarting output')
+                if self.output_async and self.comm.Get_rank() == 0:
+                    self.writer = StructOpt.fileio.OutputWriter()
                 outdict = StructOpt.fileio.restart_output.restart_output(self)
                 self.__dict__.update(outdict)
                 self.logger.info('Loading individual files')
-                poplist = []
-                for indfile in self.population:
-                    ind = StructOpt.fileio.read_individual.read_individual(indfile)
-                    poplist.append(ind)
-                self.population = poplist
+                self.population = StructOpt.generate.Population(
+                    StructOpt.fileio.read_population(self.population), self.generation)
                 self.logger.info('Loading bests')
-                bestlist = []
-                for bestfile in self.BESTS:
-                    ind = StructOpt.fileio.read_individual.read_individual(bestfile)
-                    bestlist.append(ind)
-                self.BESTS = bestlist
+                self.BESTS = StructOpt.fileio.read_population(self.BESTS)
                 self.restart = True
                 if self.structure == 'Defect':
                     bulk = StructOpt.fileio.read_xyz.read_xyz(self.solidfile)
@@ -70,7 +87,7 @@ class Optimizer():
             self.minfit = 0
             self.convergence = False
             self.overrideconvergence = False
-            self.population = list()
+            self.population = StructOpt.generate.Population()
             self.calc = None
             self.static_calc = None
 
@@ -81,9 +98,12 @@ class Optimizer():
         else:
             # Setup the output files
             self.logger.info('Initializing output for algorithm')
+            if self.output_async:
+                self.writer = StructOpt.fileio.OutputWriter()
             outdict = StructOpt.fileio.setup_output(self.filename, self.restart, self.nindiv,
                 self.indiv_defect_write, self.genealogy, self.allenergyfile,
-                self.fingerprinting, self.debug)
+                self.fingerprinting, self.debug, self.output_compression, self.writer,
+                self.timing)
             self.__dict__.update(outdict)
 
             # Set starting convergence and generation
@@ -100,8 +120,9 @@ class Optimizer():
             self.cxattempts = 0
             self.mutattempts = list()
 
-            # Initialize random number generator
-            random.seed(self.seed)
+            # Initialize random number generator, islands start from different seeds
+            random.seed(self.seed + self.island)
+            self.rng = StructOpt.generate.new_generator(self.seed + self.island)
 
             # Initialize swap list variable
             if self.swaplist == None:
@@ -114,10 +135,21 @@ class Optimizer():
             self.logger.info('Writing the input parameters to output file')
             StructOpt.fileio.write_parameters(self)
 
+        # Load evaluated individuals of a previous run
+        if (self.evaluation_cache_size and self.evaluation_cache_file
+            and os.path.exists(self.evaluation_cache_file)):
+            n = StructOpt.fileio.read_evaluation_cache(StructOpt.generate.evaluation_cache,
+                self.evaluation_cache_file)
+            self.logger.info('Loaded {0} evaluated individuals from {1}'.format(n, self.evaluation_cache_file))
+
 
     def algorithm_run(self):
-        comm = MPI.COMM_WORLD
-        rank = MPI.COMM_WORLD.Get_rank()
+        self.start_timings()
+        if self.steady_state:
+            return self.algorithm_run_steady_state()
+
+        comm = self.comm
+        rank = comm.Get_rank()
         if 'MA' in self.debug:
             debug = True
         else:
@@ -135,54 +167,277 @@ class Optimizer():
                 offspring = self.generation_set(pop)
                 # Identify the individuals with an invalid fitness
                 individuals = [ind for ind in offspring if ind.fitness == 0]
+                predicted = []
+                if self.surrogate is not None:
+                    with timers.timer('surrogate'):
+                        individuals, predicted = self.screen_offspring(pop, individuals)
                 # Evaluate the individuals with invalid fitness
                 self.output.write('\n--Evaluate Structures--\n')
+                self.logger.info('Individual fitnesses of Generation # {0}'.format(self.generation))
             else:
                 individuals = []
 
-            stro = ''
+            individuals, stro = self.evaluate_individuals(individuals)
+            ranks = self.gather_rank_timings()
+
             if rank == 0:
-                individuals, stro = StructOpt.tools.check_structures(self, individuals)
-
-            # Be careful here, the relaxations will update the indiv list
-            # If there are multiple relaxations, they should be run in order,
-            # so relaxation1 will run, update the structure, which will then
-            # get fed into relaxation2, etc.
-            # TODO Are these only run on rank0? If so, this code blockis fine.
-            # If not, it needs to be updated!
-            for m in range(len(self.relaxation_modules)):
-                stro += 'Relaxing structure using {}\n'.format(self.relaxations[m])
+                self.output.write(stro)
+                if self.surrogate is not None:
+                    with timers.timer('surrogate'):
+                        self.output.write(self.train_surrogate(individuals))
+                pop.extend(individuals)
+                pop.extend(predicted)
+                pop = self.generation_eval(pop)
+                if self.migration_comm is not None and not self.convergence and \
+                        self.generation % self.migration_intervals == 0:
+                    self.migrate()
+                with timers.timer('checkpoint'):
+                    self.write()
+                self.write_timings(ranks)
+            convergence = comm.bcast(self.convergence, root=0)
+
+        self.finish_timings()
+        if rank == 0:
+            if self.migration_comm is not None:
+                self.finish_migration()
+            self.logger.info('Run algorithm stats')
+            end_signal = self.algorithm_stats(self.population)
+        else:
+            end_signal = None
+        end_signal = comm.bcast(end_signal, root=0)
+
+        return end_signal
+
+
+    def evaluate_individuals(self, individuals):
+        """Runs check_structures, every relaxation module and every fitness
+        module on a list of individuals. Must be called on every rank since the
+        modules distribute the individuals themselves. Returns the updated
+        individuals and the output string on rank 0."""
+        rank = self.comm.Get_rank()
+
+        stro = ''
+        if rank == 0:
+            # Only structures missing from the evaluation cache are evaluated
+            offspring = individuals
+            keys = [self.evaluation_key(ind) for ind in offspring]
+            first = {}
+            hits = {}
+            evaluate = []
+            for i, key in enumerate(keys):
+                if key in first:
+                    # Repeated structure, copied from the first one below
+                    continue
+                hit = self.cached_evaluation(key, offspring[i])
+                if hit is None:
+                    evaluate.append(i)
+                else:
+                    hits[i] = hit
+                if key is not None:
+                    first[key] = i
+            individuals = [offspring[i] for i in evaluate]
+            if len(individuals) < len(offspring):
+                stro += '{0} of {1} structures found in the evaluation cache\n'.format(
+                    len(offspring) - len(individuals), len(offspring))
+            with timers.timer('check_structures'):
+                individuals, stri = StructOpt.tools.check_structures(self, individuals)
+            stro += stri
+
+        # Be careful here, the relaxations will update the indiv list
+        # If there are multiple relaxations, they should be run in order,
+        # so relaxation1 will run, update the structure, which will then
+        # get fed into relaxation2, etc.
+        for m in range(len(self.relaxation_modules)):
+            stro += 'Relaxing structure using {}\n'.format(self.relaxations[m])
+            with timers.timer('relaxation/' + self.relaxations[m]):
                 relax_out = self.relaxation_modules[m].evaluate_fitness(self, individuals, True)
 
-                if rank == 0:
-                    for i in range(len(individuals)):
-                        individuals[i] = relax_out[i][0]
-                        stro += relax_out[i][1]
+            if rank == 0:
+                for i in range(len(individuals)):
+                    individuals[i] = relax_out[i][0]
+                    stro += relax_out[i][1]
 
-            fits = []
-            for m in range(len(self.fitness_modules)):
-                stro += 'Evaluating fitness with module {}\n'.format(self.modules[m])
+        fits = []
+        for m in range(len(self.fitness_modules)):
+            stro += 'Evaluating fitness with module {}\n'.format(self.modules[m])
+            with timers.timer('fitness/' + self.modules[m]):
                 out_part = self.fitness_modules[m].evaluate_fitness(self, individuals)
-                fm = []
-                for i in range(len(out_part)):
-                    fm.append(out_part[i][0])
-                    stro += out_part[i][1]
-                fits.append(fm)
+            fm = []
+            for i in range(len(out_part)):
+                fm.append(out_part[i][0])
+                stro += out_part[i][1]
+            fits.append(fm)
+
+        if rank == 0:
+            for i in range(len(individuals)):
+                fi = [fits[m][i] for m in range(len(self.fitness_modules))]
+                self.set_fitness(individuals[i], fi)
+
+            evaluated = dict(zip(evaluate, individuals))
+            for i, ind in evaluated.items():
+                self.cache_evaluation(keys[i], ind)
+            evaluated.update(hits)
+            individuals = []
+            for i, ind in enumerate(offspring):
+                if i in evaluated:
+                    individuals.append(evaluated[i])
+                else:
+                    individuals.append(self.copy_evaluation(evaluated[first[keys[i]]], ind))
+
+        return individuals, stro
+
+
+    def screen_offspring(self, pop, offspring):
+        """Splits the offspring into the individuals sent to the fitness modules
+        and the individuals given the fitness predicted by the surrogate model.
+        The surrogate_fraction best predicted offspring and a random
+        surrogate_explore fraction of the rest are evaluated, as are members of
+        the population that survived with a predicted fitness."""
+        features = [self.surrogate_features(ind) for ind in offspring]
+        predictions = self.surrogate.predict(features)
+        if len(self.surrogate) < self.surrogate_min_train:
+            predictions.fill(numpy.nan)
+        order = [i for i in numpy.argsort(predictions) if not numpy.isnan(predictions[i])]
+        nkeep = int(math.ceil(self.surrogate_fraction*len(order)))
+        rest = order[nkeep:]
+        nexplore = int(round(self.surrogate_explore*len(rest)))
+        skipped = set(rest) - set(random.sample(rest, nexplore))
+
+        # A predicted fitness is never carried into the next selection
+        survivors = [ind for ind in pop if ind.predicted]
+        pop[:] = [ind for ind in pop if not ind.predicted]
+        self.surrogate_pending = [(self.surrogate_features(ind), ind.fitness) for ind in survivors]
+        individuals = survivors
+        predicted = []
+        for i, ind in enumerate(offspring):
+            if i in skipped:
+                ind.fitness = predictions[i]
+                ind.predicted = True
+                predicted.append(ind)
+            else:
+                self.surrogate_pending.append((features[i], predictions[i]))
+                individuals.append(ind)
+        for ind in individuals:
+            ind.fitness = 0
+            ind.predicted = False
+        if skipped:
+            self.output.write('Surrogate model predicted the fitness of {0} of {1} offspring\n'.format(
+                len(skipped), len(offspring)))
+        return individuals, predicted
+
+
+    def train_surrogate(self, individuals):
+        """Adds the evaluated individuals to the training set of the surrogate
+        model with the fingerprint of the structure they were created from.
+        Returns the output string with the error of the predictions."""
+        errors = []
+        for (x, prediction), ind in zip(self.surrogate_pending, individuals):
+            if ind.fitness == 0:
+                continue
+            self.surrogate.add(x, ind.fitness)
+            if not numpy.isnan(prediction):
+                errors.append(abs(prediction - ind.fitness))
+        self.surrogate_pending = []
+        if not errors:
+            return ''
+        return 'Surrogate model mean absolute error = {0} over {1} evaluated individuals\n'.format(
+            numpy.mean(errors), len(errors))
+
+
+    def surrogate_features(self, individ):
+        """Returns the fingerprint of an individual used by the surrogate model"""
+        return numpy.ravel(StructOpt.fingerprinting.get_fingerprint(self, individ,
+            self.fpbin, self.fpcutoff))
+
+
+    def evaluation_key(self, individ):
+        """Returns the key of an individual in the evaluation cache, None if the cache is off"""
+        if not self.evaluation_cache_size:
+            return None
+        return StructOpt.generate.canonical_hash(individ, self.evaluation_cache_tol)
+
+
+    def cache_evaluation(self, key, individ):
+        """Stores an evaluated individual in the evaluation cache, under the key
+        of the structure it was created from and the key of its relaxed structure"""
+        if key is None or individ.fitness == 0:
+            return
+        stored = individ.duplicate()
+        StructOpt.generate.evaluation_cache.set(key, stored)
+        StructOpt.generate.evaluation_cache.set(self.evaluation_key(stored), stored)
+
+
+    def cached_evaluation(self, key, individ):
+        """Returns the evaluated individual stored for key in the evaluation cache
+        as offspring individ, or None if there is none"""
+        if key is None:
+            return None
+        cached = StructOpt.generate.evaluation_cache.get(key)
+        if cached is None:
+            return None
+        return self.copy_evaluation(cached, individ)
+
+
+    def copy_evaluation(self, evaluated, individ):
+        """Returns a copy of an evaluated individual with the index, history and
+        swap list of the offspring individ"""
+        result = evaluated.duplicate()
+        result.index = individ.index
+        result.history_index = individ.history_index
+        result.swaplist = copy.deepcopy(individ.swaplist)
+        return result
+
+
+    def set_fitness(self, individual, fits):
+        """Combines the fitness of each module into the fitness of the individual"""
+        if None not in fits:
+            individual.fitness = self.objective_function(fits, self.weights)
+            self.logger.info('Individual {0}: {1}'.format(individual.history_index, individual.fitness))
+
+
+    def algorithm_run_steady_state(self):
+        """Asynchronous steady-state version of algorithm_run.
+        Rank 0 is a master that breeds one offspring at a time and hands it to
+        the first idle rank, merging each result into the population as soon as
+        it comes back. The predator is applied on every insertion and every
+        nindiv insertions are reported as one generation."""
+        comm = self.comm
+        rank = comm.Get_rank()
+        size = comm.Get_size()
+        if rank == 0:
+            self.algorithm_initialize()
+            self.logger.info('Beginning steady-state algorithm loop')
+            initialize = self.generation == 0
+        else:
+            initialize = None
+        initialize = comm.bcast(initialize, root=0)
 
+        # The starting population is evaluated in lockstep since all of it is needed to breed
+        if initialize:
+            if rank == 0:
+                offspring = self.generation_set(self.population)
+                individuals = [ind for ind in offspring if ind.fitness == 0]
+                self.output.write('\n--Evaluate Structures--\n')
+            else:
+                individuals = []
+            individuals, stro = self.evaluate_individuals(individuals)
+            ranks = self.gather_rank_timings()
             if rank == 0:
-                self.logger.info('Individual fitnesses of Generation # {0}'.format(self.generation))
-                for i in range(len(individuals)):
-                    fi = [fits[m][i] for m in range(len(self.fitness_modules))]
-                    if None not in fi:
-                        individuals[i].fitness = self.objective_function(fi, self.weights)
-                        self.logger.info('Individual {0}: {1}'.format(individuals[i].history_index, individuals[i].fitness))
                 self.output.write(stro)
-                pop.extend(individuals)
-                pop = self.generation_eval(pop)
-                self.write()
-            convergence = comm.bcast(self.convergence, root=0)
+                self.generation_eval(individuals)
+                with timers.timer('checkpoint'):
+                    self.write()
+                self.write_timings(ranks)
+
+        if rank == 0:
+            self.steady_state_master()
+        else:
+            self.steady_state_worker()
 
+        self.finish_timings()
         if rank == 0:
+            if self.migration_comm is not None:
+                self.finish_migration()
             self.logger.info('Run algorithm stats')
             end_signal = self.algorithm_stats(self.population)
         else:
@@ -192,6 +447,266 @@ class Optimizer():
         return end_signal
 
 
+    def steady_state_master(self):
+        """Keeps every worker rank busy with a freshly bred offspring until the
+        population converges, then drains the remaining results and releases
+        the workers. Without worker ranks the offspring are evaluated on rank 0."""
+        comm = self.comm
+        size = comm.Get_size()
+
+        self.steady_state_generation_start()
+        busy = 0
+        # Evaluation cache key of the offspring sent to each worker
+        keys = {}
+        for worker in range(1, size):
+            child, keys[worker] = self.breed_uncached_offspring()
+            if child is None:
+                break
+            comm.send(child, dest=worker, tag=STEADY_STATE_TAG)
+            busy += 1
+
+        while busy > 0 or not self.convergence:
+            if size > 1:
+                status = MPI.Status()
+                with timers.timer('idle'):
+                    child, stro = comm.recv(source=MPI.ANY_SOURCE, tag=STEADY_STATE_TAG, status=status)
+                worker = status.Get_source()
+                key = keys.pop(worker)
+                busy -= 1
+            else:
+                child, key = self.breed_uncached_offspring()
+                if child is None:
+                    continue
+                with timers.timer('busy'):
+                    child, stro = self.evaluate_offspring(child)
+            self.cache_evaluation(key, child)
+            self.steady_state_insert(child, stro)
+            if size > 1 and not self.convergence:
+                child, keys[worker] = self.breed_uncached_offspring()
+                if child is not None:
+                    comm.send(child, dest=worker, tag=STEADY_STATE_TAG)
+                    busy += 1
+
+        for worker in range(1, size):
+            comm.send(None, dest=worker, tag=STEADY_STATE_TAG)
+
+
+    def steady_state_worker(self):
+        """Evaluates the offspring sent by rank 0 until it sends None"""
+        comm = self.comm
+        while True:
+            with timers.timer('idle'):
+                child = comm.recv(source=0, tag=STEADY_STATE_TAG)
+            if child is None:
+                break
+            with timers.timer('busy'):
+                out = self.evaluate_offspring(child)
+            with timers.timer('idle'):
+                comm.send(out, dest=0, tag=STEADY_STATE_TAG)
+
+
+    def evaluate_offspring(self, child):
+        """Evaluates a single offspring on the calling rank with the
+        evaluate_indiv method of every relaxation and fitness module"""
+        rank = self.comm.Get_rank()
+        stro = ''
+        for m in range(len(self.relaxation_modules)):
+            stro += 'Relaxing structure using {}\n'.format(self.relaxations[m])
+            with timers.timer('relaxation/' + self.relaxations[m]):
+                child, signal = self.relaxation_modules[m].evaluate_indiv(self, child, rank, True)
+            stro += signal
+
+        fits = []
+        for m in range(len(self.fitness_modules)):
+            stro += 'Evaluating fitness with module {}\n'.format(self.modules[m])
+            with timers.timer('fitness/' + self.modules[m]):
+                fit, signal = self.fitness_modules[m].evaluate_indiv(self, child, rank)
+            fits.append(fit)
+            stro += signal
+        self.set_fitness(child, fits)
+
+        return child, stro
+
+
+    def breed_offspring(self):
+        """Breeds a single new offspring from the current population for the
+        steady-state algorithm. Pairs of children are produced by crossover,
+        so the second child is kept for the next call. With mutant_add the
+        mutants are bred as extra offspring next to the unmutated children."""
+        if not getattr(self, 'nursery', None):
+            self.nursery = []
+        attempts = 0
+        while len(self.nursery) == 0:
+            if attempts == BREED_ATTEMPTS:
+                # The moves keep failing, evaluate the unchanged clone rather than spin
+                self.logger.warning('No new offspring bred in {0} attempts, re-evaluating '
+                    'an unchanged individual'.format(BREED_ATTEMPTS))
+                child1.fitness = 0
+                self.nursery.append(child1)
+                break
+            attempts += 1
+            parents = StructOpt.switches.selection_switch(self.population, 2,
+                        self.selection_scheme, self)
+            child1, child2 = [parent.duplicate() for parent in parents[0:2]]
+            if random.random() < self.cxpb:
+                child1, child2 = StructOpt.switches.crossover_switch(child1, child2, self)
+                self.cxattempts += 2
+            for child in [child1, child2]:
+                mutant = None
+                # Every offspring sent for evaluation must be new, so unchanged clones are mutated
+                if random.random() < self.mutpb or child.fitness != 0:
+                    mutant = child.duplicate() if self.mutant_add else child
+                    mutant, optsel = StructOpt.switches.moves_switch(mutant, self)
+                    self.mutattempts.append([mutant.history_index, optsel])
+                    if not self.mutant_add:
+                        child, mutant = mutant, None
+                for one in [child, mutant]:
+                    if one is not None and one.fitness == 0:
+                        self.nursery.append(one)
+            with timers.timer('check_structures'):
+                self.nursery, stro = StructOpt.tools.check_structures(self, self.nursery)
+            self.output.write(stro)
+
+        return self.nursery.pop(0)
+
+
+    def breed_uncached_offspring(self):
+        """Breeds offspring for the steady-state algorithm until one is not in the
+        evaluation cache, the cached ones are inserted into the population directly.
+        Returns the offspring and its evaluation cache key, or None and None if
+        the population converged on cached offspring."""
+        while not self.convergence:
+            child = self.breed_offspring()
+            key = self.evaluation_key(child)
+            hit = self.cached_evaluation(key, child)
+            if hit is None:
+                return child, key
+            self.steady_state_insert(hit, 'Structure of {0} found in the evaluation cache\n'.format(
+                child.history_index))
+        return None, None
+
+
+    def steady_state_insert(self, child, stro):
+        """Merges an evaluated offspring into the population through the predator"""
+        self.output.write(stro)
+        pop = self.population
+        pop.append(child)
+        pop = StructOpt.switches.predator_switch(pop, self)
+        pop.reindex()
+        self.population = pop
+
+        self.steady_state_evaluations += 1
+        if self.steady_state_evaluations % self.nindiv == 0:
+            self.steady_state_generation_end()
+            if not self.convergence:
+                self.steady_state_generation_start()
+
+
+    def steady_state_generation_start(self):
+        self.output.write('\n-------- Generation {} --------\n'.format(repr(self.generation)))
+        self.files[self.nindiv].write('Generation {}\n'.format(str(self.generation)))
+        self.population.reset_history()
+        self.steady_state_evaluations = 0
+        self.cxattempts = 0
+        self.mutattempts = []
+
+
+    def steady_state_generation_end(self):
+        """Applies the per-generation bookkeeping of generation_eval to the
+        population after nindiv steady-state insertions"""
+        pop = self.population
+        if self.best_inds_list:
+            with timers.timer('bests'):
+                self.BESTS = StructOpt.tools.BestInds(pop, self.BESTS, self, writefile = True)
+        pop = StructOpt.tools.get_best(pop, len(pop))
+        self.logger.info('Checking population for convergence')
+        with timers.timer('output'):
+            self.check_pop(pop)
+        self.generation_stats(pop, self.nindiv)
+        self.generation += 1
+        pop.reindex()
+        self.population = pop
+        if self.migration_comm is not None and not self.convergence and \
+                self.generation % self.migration_intervals == 0:
+            self.migrate()
+        with timers.timer('checkpoint'):
+            self.write()
+        self.write_timings()
+
+
+    def setup_islands(self):
+        """Sets the communicator the population is bred and evaluated on.
+        With Island_Method in algorithm_type MPI.COMM_WORLD is split into
+        islands of island_size ranks, each running its own population, and
+        the first rank of every island joins migration_comm to exchange
+        migrants. Otherwise all ranks serve a single population."""
+        world = MPI.COMM_WORLD
+        rank = world.Get_rank()
+        if 'Island_Method' in self.algorithm_type:
+            self.island = rank // self.island_size
+            self.comm = world.Split(self.island, rank)
+            root = self.comm.Get_rank() == 0
+            self.migration_comm = world.Split(0 if root else MPI.UNDEFINED, rank)
+            if self.migration_comm == MPI.COMM_NULL:
+                self.migration_comm = None
+        else:
+            self.island = 0
+            self.comm = world
+            self.migration_comm = None
+        # World rank of the first rank of the island, which owns the output directory
+        self.island_root = rank - self.comm.Get_rank()
+        self.migration_requests = []
+        self.migrations_sent = 0
+        self.migrations_received = 0
+
+
+    def migrate(self):
+        """Exchanges the best individuals with the neighbouring islands on a
+        ring. The best migration_percent of the population is sent to the next
+        island without blocking and the migrants that have already arrived
+        from the previous island replace the worst individuals they beat, so
+        an island never waits on a slower one. Only called on island roots."""
+        comm = self.migration_comm
+        nislands = comm.Get_size()
+        if nislands == 1:
+            return
+        island = comm.Get_rank()
+        dest = (island + 1) % nislands
+        source = (island - 1) % nislands
+
+        pop = StructOpt.tools.get_best(self.population, len(self.population))
+        nmigrants = max(1, int(round(self.migration_percent*self.nindiv)))
+        self.migration_requests = [req for req in self.migration_requests if not req.Test()]
+        self.migration_requests.append(comm.isend(pop[0:nmigrants], dest=dest, tag=MIGRATION_TAG))
+        self.migrations_sent += 1
+
+        migrants = []
+        while comm.Iprobe(source=source, tag=MIGRATION_TAG):
+            migrants.extend(comm.recv(source=source, tag=MIGRATION_TAG))
+            self.migrations_received += 1
+        if migrants:
+            pop.extend(migrants)
+            pop = StructOpt.tools.get_best(pop, len(pop) - len(migrants))
+            pop.reindex()
+            self.population = pop
+        self.output.write('\n--Migration--\n{0} individuals sent to island {1}, {2} received from island {3}\n'.format(
+            nmigrants, dest, len(migrants), source))
+        self.logger.info('Migrated {0} individuals to island {1}'.format(nmigrants, dest))
+
+
+    def finish_migration(self):
+        """Receives the migrants still in flight once every island has
+        converged so that all nonblocking sends complete"""
+        comm = self.migration_comm
+        sent = comm.allgather(self.migrations_sent)
+        source = (comm.Get_rank() - 1) % comm.Get_size()
+        for i in range(sent[source] - self.migrations_received):
+            comm.recv(source=source, tag=MIGRATION_TAG)
+        self.migrations_received = sent[source]
+        MPI.Request.Waitall(self.migration_requests)
+        self.migration_requests = []
+
+
     def algorithm_stats(self, pop):
         self.output.write('\n----- Algorithm Stats -----\n')
         cxattempts = 0
@@ -246,15 +761,16 @@ class Optimizer():
 
 
     def check_pop(self, pop):
+        population = StructOpt.generate.as_population(pop, self.generation)
         # Gather all the energies/fitnesses
         if self.output_format == 'totalenergy':
-            complist = [ind.energy for ind in pop]
+            complist = population.energy
         elif self.output_format == 'formation_energy':
             complist = []
             for ind in pop:
                 solid = Atoms()
                 solid.extend(ind[0])
-                solid.extend(ind.bulki)
+                solid.extend(ind.view('bulki'))
                 energy = ind.energy
                 for sym, c, m, u in self.atomlist:
                     nc = len([atm for atm in solid if atm.symbol == sym])
@@ -265,7 +781,7 @@ class Optimizer():
             for ind in pop:
                 solid = Atoms()
                 solid.extend(ind[0])
-                solid.extend(ind.bulki)
+                solid.extend(ind.view('bulki'))
                 energy = ind.energy
                 for sym, c, m, u in self.atomlist:
                     nc = len([atm for atm in solid if atm.symbol == sym])
@@ -277,17 +793,16 @@ class Optimizer():
         elif self.output_format == 'energy_per_atom':
             complist = [ind.energy/(ind[0].get_number_of_atoms()+ind.bulki.get_number_of_atoms()) for ind in pop]
         else:
-            complist = [ind.fitness for ind in pop]
+            complist = population.fitness
 
         # Calcluate and print the Stats
-        length = len(pop)
-        mean = sum(complist) / length
-        complist.sort()
-        medium = complist[length/2]
-        sum2 = sum(x*x for x in complist)
-        std = abs(sum2 / length - mean**2)**0.5
-        mine = min(complist)
-        maxe = max(complist)
+        complist = numpy.sort(numpy.asarray(complist, dtype=float))
+        length = len(complist)
+        mean = float(complist.sum() / length)
+        medium = float(complist[length//2])
+        std = float(abs(numpy.dot(complist, complist) / length - mean**2)**0.5)
+        mine = float(complist[0])
+        maxe = float(complist[-1])
 
         self.output.write('\n----Stats----\n')
         self.output.write('  Min '+repr(mine)+'\n')
@@ -299,19 +814,9 @@ class Optimizer():
         self.summary.write("{0: <10} {1:<10.4f} {2:<10.4f} {3:<10.4f} {4:<10.4f} {5:<10.4f} {6: <25}\n".format(
                 self.generation, mine, mean, medium, maxe, std, time.asctime(time.localtime(time.time()))))
 
-        outputlist = []
-        for ind in pop:
-            outputlist.append([ind.fitness, ind.energy/ind[0].get_number_of_atoms()])
-        fitness_min = min([fitness for fitness, eatom in outputlist])
-        eatom_min = [one[1] for one in outputlist if one[0] == fitness_min][0]
-        # print 'Gen, fitness, eatom, chi2', self.generation, fitness_min, eatom_min, fitness_min-eatom_min
-
         # Set new index values and write population
-        index1 = 0
-        for ind in pop:
-            ind.index = index1
-            index1 += 1
-        StructOpt.fileio.write_pop(self, pop)
+        population.reindex()
+        StructOpt.fileio.write_pop(self, population)
 
         if self.allenergyfile:
             for ind in pop:
@@ -319,11 +824,10 @@ class Optimizer():
             self.tenergyfile.write('\n')
 
         # Check Convergence of population based on fitness
-        fitnesses = [ind.fitness for ind in pop]
-        popmin = min(fitnesses)
-        popmean = sum(fitnesses) / len(fitnesses)
-        sum2 = sum(x*x for x in fitnesses)
-        popstd = abs(sum2 / len(fitnesses) - popmean**2)**0.5
+        fitnesses = population.fitness
+        popmin = float(fitnesses.min())
+        popmean = float(fitnesses.sum() / len(fitnesses))
+        popstd = float(abs(numpy.dot(fitnesses, fitnesses) / len(fitnesses) - popmean**2)**0.5)
         convergence = False
         if self.convergence_scheme == 'gen_rep_min':
             if self.generation < self.maxgen:
@@ -374,9 +878,25 @@ class Optimizer():
         if self.fingerprinting:
             self.fpfile.flush()
             self.fpminfile.flush()
+        if (self.postprocessing and self.postprocessing_interval
+            and self.generation % self.postprocessing_interval == 0):
+            self.update_postprocessing()
         return self
 
 
+    def update_postprocessing(self):
+        """Updates the post-processing plots with the output written since the last update"""
+        with timers.timer('postprocessing'):
+            if getattr(self, 'monitor', None) is None:
+                path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(self.filename, self.island_root))
+                self.monitor = StructOpt.post_processing.OutputMonitor(path, self.natoms, plotdir=path)
+            if self.writer is not None:
+                # Wait for the queued output and flushes to reach the files read by the monitor
+                self.writer.sync()
+            self.monitor.update()
+            self.monitor.plot()
+
+
     def close_output(self):
         localtime = time.asctime( time.localtime(time.time()) )
         for ind in self.files:
@@ -391,6 +911,11 @@ class Optimizer():
         if self.fingerprinting:
             self.fpfile.close()
             self.fpminfile.close()
+        if getattr(self, 'timingsfile', None) is not None:
+            self.timingsfile.close()
+        if self.writer is not None:
+            # Wait for the background writer to finish writing all files
+            self.writer.close()
 
 
     def generation_eval(self, pop):
@@ -412,17 +937,20 @@ class Optimizer():
             self.logger.info('Initializing Bests list')
             self.BESTS = list()
         if self.best_inds_list:
-            self.BESTS = StructOpt.tools.BestInds(pop, self.BESTS, self, writefile = True)
+            with timers.timer('bests'):
+                self.BESTS = StructOpt.tools.BestInds(pop, self.BESTS, self, writefile = True)
 
         # Determine survival based on fitness predator
         if 'lambda, mu' not in self.algorithm_type:
             pop = StructOpt.tools.get_best(pop, len(pop))
         if self.fingerprinting:
             self.logger.info('Writing fingerprint files')
+            for one in pop:
+                one.fingerprint = StructOpt.fingerprinting.get_fingerprint(self, one, self.fpbin, self.fpcutoff)
             for one in pop:
                 self.fpfile.write(repr(StructOpt.fingerprinting.fingerprint_dist(pop[0].fingerprint, one.fingerprint))+' '+repr(one.energy)+' ')  # TODO Fix this
             self.fpfile.write('\n')
-            self.fpminfile.write(repr(pop[0].fingerprint)+'\n')
+            self.fpminfile.write(repr(numpy.asarray(pop[0].fingerprint).tolist())+'\n')
             self.fpminfile.write(repr(pop[0].energy)+'\n')
         nevals = len(pop)/2
         if self.generation != 0:
@@ -434,52 +962,126 @@ class Optimizer():
 
         # Evaluate population
         self.logger.info('Checking population for convergence')
-        self.check_pop(pop)
+        with timers.timer('output'):
+            self.check_pop(pop)
 
         # Update general output tracking
         if self.generation != 0:
-            histlist = []
-            for ind in pop:
-                histlist.append(ind.history_index)
-            self.Runtimes.append(time.time())
-            self.Evaluations.append(nevals)
-            cxsuccess = 0
-            mutsuccess = []
-            for one in histlist:
-                if '+' in one:
-                    cxsuccess += 1
-                if 'm' in one:
-                    mutsuccess.append(one)
-            self.CXs.append((self.cxattempts, cxsuccess))
-            mutslist = [[0, 0] for one in self.mutation_options]
-            for one in mutsuccess:
-                for two, opt in self.mutattempts:
-                    if one == two:
-                        index = [ind for ind, value in enumerate(
-                            self.mutation_options) if value == opt][0]
-                        mutslist[index][1] += 1
-            for one, opt in self.mutattempts:
-                index = [ind for ind, value in enumerate(
-                self.mutation_options) if value == opt][0]
-                mutslist[index][0] += 1
-            self.Muts.append(mutslist)
-            self.output.write('\n----- Generation Stats -----\n')
-            self.output.write('Attempted Crossovers: {}\n'.format(repr(self.cxattempts)))
-            self.output.write('Successful Crossovers: {}\n'.format(repr(cxsuccess)))
-            self.output.write('Mutations:\n')
-            for i, opt in enumerate(self.mutation_options):
-                self.output.write('    Attempted {} : {}\n'.format(opt, repr(mutslist[i][0])))
-                self.output.write('    Successful {} : {}\n'.format(opt, repr(mutslist[i][1])))
+            self.generation_stats(pop, nevals)
         self.generation += 1
 
         # Set new index values
-        for index1, ind in enumerate(pop):
-            ind.index = index1
+        pop = StructOpt.generate.as_population(pop, self.generation)
+        pop.reindex()
 
         self.population = pop
         return pop
 
 
+    def generation_stats(self, pop, nevals):
+        """Records the runtime, evaluations, crossover and mutation
+        statistics of the finished generation"""
+        histlist = []
+        for ind in pop:
+            histlist.append(ind.history_index)
+        self.Runtimes.append(time.time())
+        self.Evaluations.append(nevals)
+        cxsuccess = 0
+        mutsuccess = []
+        for one in histlist:
+            if '+' in one:
+                cxsuccess += 1
+            if 'm' in one:
+                mutsuccess.append(one)
+        self.CXs.append((self.cxattempts, cxsuccess))
+        mutslist = [[0, 0] for one in self.mutation_options]
+        for one in mutsuccess:
+            for two, opt in self.mutattempts:
+                if one == two:
+                    index = [ind for ind, value in enumerate(
+                        self.mutation_options) if value == opt][0]
+                    mutslist[index][1] += 1
+        for one, opt in self.mutattempts:
+            index = [ind for ind, value in enumerate(
+            self.mutation_options) if value == opt][0]
+            mutslist[index][0] += 1
+        self.Muts.append(mutslist)
+        self.output.write('\n----- Generation Stats -----\n')
+        self.output.write('Attempted Crossovers: {}\n'.format(repr(self.cxattempts)))
+        self.output.write('Successful Crossovers: {}\n'.format(repr(cxsuccess)))
+        self.output.write('Mutations:\n')
+        for i, opt in enumerate(self.mutation_options):
+            self.output.write('    Attempted {} : {}\n'.format(opt, repr(mutslist[i][0])))
+            self.output.write('    Successful {} : {}\n'.format(opt, repr(mutslist[i][1])))
+
+
+    def start_timings(self):
+        self.timings_start = self.timings_begin = clock()
+        self.timings_total = {}
+        self.timings_ranks = []
+
+
+    def gather_rank_timings(self):
+        """Collects the busy and idle time of every rank in the evaluation
+        loops on rank 0, must be called on every rank. The worker ranks start
+        their timers over after each call. Returns the list of [busy, idle]
+        seconds of each rank on rank 0 and None on the other ranks."""
+        if not self.timing:
+            return None
+        phases = timers.phases
+        if self.comm.Get_rank() != 0:
+            timers.pop()
+        return self.comm.gather(rank_timings(phases), root=0)
+
+
+    def write_timings(self, ranks=None, generation=None):
+        """Writes the phases timed on rank 0 since the last call as one JSON
+        line of the timings file and starts the timers over.
+        ranks is the output of gather_rank_timings, the entry of rank 0 is
+        taken from its own phases."""
+        if not self.timing:
+            return
+        phases = timers.pop()
+        now = clock()
+        if generation is None:
+            # Called after the generation counter moved on to the next generation
+            generation = self.generation - 1
+        record = {'generation': generation,
+                  'time': time.time(), 'wall': now - self.timings_start, 'phases': phases}
+        self.timings_start = now
+        for name, (seconds, count) in phases.items():
+            total = self.timings_total.setdefault(name, [0.0, 0])
+            total[0] += seconds
+            total[1] += count
+        if ranks is None:
+            totals = [rank_timings(phases)]
+        else:
+            ranks[0] = rank_timings(phases)
+            record['ranks'] = totals = ranks
+        while len(self.timings_ranks) < len(totals):
+            self.timings_ranks.append([0.0, 0.0])
+        for total, (busy, idle) in zip(self.timings_ranks, totals):
+            total[0] += busy
+            total[1] += idle
+        if self.timingsfile is not None:
+            self.timingsfile.write(json.dumps(record, sort_keys=True) + '\n')
+            self.timingsfile.flush()
+
+
+    def finish_timings(self):
+        """Writes the phases timed since the last generation and the totals
+        of the run to the timings file, must be called on every rank.
+        The steady-state worker ranks only report their busy and idle time here."""
+        ranks = self.gather_rank_timings()
+        if self.comm.Get_rank() == 0:
+            self.write_timings(ranks, 'end')
+            if self.timing and self.timingsfile is not None:
+                record = {'generation': 'total', 'time': time.time(),
+                          'wall': clock() - self.timings_begin,
+                          'phases': self.timings_total, 'ranks': self.timings_ranks}
+                self.timingsfile.write(json.dumps(record, sort_keys=True) + '\n')
+
+
     def generation_set(self, pop):
         # # Setting up energy calculators from relaxation methods
         # self.calc = StructOpt.tools.setup_energy_calculator(self.relaxations, True)
@@ -493,11 +1095,11 @@ class Optimizer():
         if self.generation == 0:
             self.logger.info('Initializing structures')
             offspring = self.initialize_structures()
-            self.population = offspring
+            self.population = StructOpt.generate.Population(offspring, self.generation)
         else:
-            for i in range(len(pop)):
-                # Reset History index
-                pop[i].history_index = repr(pop[i].index)
+            # Reset History index
+            pop = StructOpt.generate.as_population(pop, self.generation)
+            pop.reset_history()
 
             # Select the next generation individuals
             offspring = StructOpt.switches.selection_switch(pop, self.nindiv,
@@ -592,26 +1194,39 @@ class Optimizer():
     def run(self):
         cwd = os.getcwd()
 
-        self.algorithm_run()
+        if self.profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.runcall(self.algorithm_run)
+            profiler.dump_stats(os.path.join(cwd, '{0}-rank{1}.prof'.format(self.filename,
+                MPI.COMM_WORLD.Get_rank())))
+        else:
+            self.algorithm_run()
 
-        if self.postprocessing:
+        # Every island root post-processes the output of its own island
+        root = self.comm.Get_rank() == 0
+        if self.postprocessing and root:
             self.logger.info('Running Post-processing')
-            path = os.path.join(os.getcwd(), '{0}-rank0'.format(self.filename))
+            path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(self.filename, self.island_root))
             os.chdir(path)
-            if self.genealogytree:
+            if getattr(self, 'monitor', None) is not None:
+                # Only the output since the last update is read
+                self.monitor.update()
+                self.monitor.plot(self.genealogytree)
+            elif self.genealogytree:
                 StructOpt.post_processing.read_output(os.getcwd(), genealogytree=True, natoms=self.natoms)
             else:
                 StructOpt.post_processing.read_output(os.getcwd(), genealogytree=False, natoms=self.natoms)
             os.chdir(cwd)
-        if self.lattice_concentration:
+        if self.lattice_concentration and root:
             if self.structure == 'Defect':
                 self.logger.info('Running lattice concentration check')
-                path = os.path.join(os.getcwd(), '{0}-rank0'.format(self.filename))
+                path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(self.filename, self.island_root))
                 os.chdir(path)
                 if self.best_inds_list:
                     StructOpt.post_processing.get_lattice_concentration(os.path.join(os.getcwd(), 'Bulkfile.xyz'), os.path.join(os.getcwd(), 'Bests-{}.xyz'.format(self.filename)))
                 else:
-                    StructOpt.post_processing.get_lattice_concentration(os.path.join(os.getcwd(), 'Bulkfile.xyz'), os.path.join(os.getcwd(), 'indiv00.xyz'))
+                    StructOpt.post_processing.get_lattice_concentration(os.path.join(os.getcwd(), 'Bulkfile.xyz'), self.files[0].name)
                 os.chdir(cwd)
 
 
@@ -620,18 +1235,9 @@ class Optimizer():
         self.__dict__.update(parameters)
         outdict = StructOpt.fileio.restart_output.restart_output(self)
         self.__dict__.update(outdict)
-        poplist = []
-
-        for indfile in self.population:
-            ind = StructOpt.fileio.read_individual(indfile)
-            poplist.append(ind)
-        self.population = poplist
-        bestlist = []
-
-        for bestfile in self.BESTS:
-            ind = StructOpt.fileio.read_individual(bestfile)
-            bestlist.append(ind)
-        self.BESTS = bestlist
+        self.population = StructOpt.generate.Population(
+            StructOpt.fileio.read_population(self.population), self.generation)
+        self.BESTS = StructOpt.fileio.read_population(self.BESTS)
         self.restart = True
         return self
 
@@ -645,6 +1251,11 @@ class Optimizer():
 
 
 
+def rank_timings(phases):
+    """Returns the [busy, idle] seconds in the phases of a rank"""
+    return [phases.get(name, [0.0, 0])[0] for name in ('busy', 'idle')]
+
+
 if __name__ == "__main__":
     import sys
     input = sys.argv[1]
@@ -0,0 +1,414 @@
+"""Timings of the hot paths of StructOpt on synthetic structures of increasing
+size, saved as JSON so performance changes can be compared between versions.
+Only the Random fitness module and the mock LAMMPS binary are used, so no
+energy code is needed.
+
+Usage:
+    python -m StructOpt.benchmarks.benchmark_suite [-o results.json]
+        [--sizes 50 500 5000] [--repeat 5] [--only name ...] [--compare old.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import traceback
+import subprocess
+from importlib import import_module
+import numpy
+import ase
+from ase import Atoms
+from ase.data import atomic_numbers, reference_states
+
+import StructOpt
+from StructOpt._version import __version__
+from StructOpt.tools.timing import clock
+from StructOpt.tools.mock_lammps import mock_lammps_command
+
+__all__ = ['BENCHMARKS', 'benchmark', 'run_benchmarks', 'compare_results', 'synthetic_atoms']
+
+DEFAULT_SIZES = [50, 500, 5000]
+# Elements of the synthetic alloys, the lattice constant is the one of the first
+SYMBOLS = ['Au', 'Cu']
+# Stop calling a benchmark in a loop once the loop takes this many seconds
+MIN_TIME = 0.05
+# Relative slowdown reported as a regression by compare_results
+THRESHOLD = 0.1
+# lammps_inp.json of the generation with the mock LAMMPS binary, a few
+# minimization steps of a Lennard-Jones potential
+MOCK_LAMMPS_INPUT = {'pair_style': 'lj/cut 6.5', 'pair_coeff': '* * 0.4 2.6',
+    'keep_files': False, 'library': False, 'min_style': 'cg',
+    'minimize': '1e-8 1e-8 20 40', 'thermo_steps': 0}
+
+BENCHMARKS = []
+
+def benchmark(name, max_natoms=None):
+    """Decorator registering a benchmark. The decorated function is called
+    as function(Optimizer, natoms) and returns the function to time, called
+    without arguments. max_natoms is the largest size the benchmark runs at."""
+    def register(function):
+        BENCHMARKS.append((name, function, max_natoms))
+        return function
+    return register
+
+
+def fcc_lattice(natoms):
+    """Returns the smallest periodic cube of fcc cells of the first of SYMBOLS
+    with at least natoms sites"""
+    a = reference_states[atomic_numbers[SYMBOLS[0]]]['a']
+    ncells = int(numpy.ceil((natoms/4.0)**(1.0/3.0)))
+    basis = numpy.array([[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]])
+    cells = numpy.array([[i, j, k] for i in range(ncells) for j in range(ncells)
+        for k in range(ncells)], dtype=float)
+    sites = (cells[:, None, :] + basis[None, :, :]).reshape(-1, 3)*a
+    return Atoms(symbols=[SYMBOLS[0]]*len(sites), positions=sites, cell=[ncells*a]*3, pbc=True)
+
+
+def synthetic_atoms(natoms, seed=0, pbc=False):
+    """Returns natoms atoms on randomly chosen sites of fcc_lattice(natoms)
+    with randomly assigned SYMBOLS, rattled off the sites by 0.05 Angstroms.
+    With pbc the lattice cell is kept, else the structure is a cluster."""
+    rng = numpy.random.RandomState(seed)
+    lattice = fcc_lattice(natoms)
+    positions = lattice.positions[numpy.sort(rng.permutation(len(lattice))[:natoms])]
+    positions += rng.normal(scale=0.05, size=positions.shape)
+    symbols = [SYMBOLS[i] for i in rng.randint(len(SYMBOLS), size=natoms)]
+    atms = Atoms(symbols=symbols, positions=positions, cell=lattice.cell, pbc=pbc)
+    if not pbc:
+        atms.center(vacuum=5.0)
+    return atms
+
+
+def synthetic_individual(natoms, seed=0, pbc=False):
+    individ = StructOpt.generate.Individual(synthetic_atoms(natoms, seed, pbc))
+    individ.history_index = repr(seed)
+    return individ
+
+
+def make_optimizer(natoms, seed=0, **parameters):
+    """Returns an initialized Optimizer for a cluster of natoms atoms of
+    SYMBOLS using the Random fitness module, writing its output in the
+    working directory"""
+    from StructOpt.Optimizer import Optimizer
+    counts = [natoms//len(SYMBOLS) for sym in SYMBOLS]
+    counts[0] += natoms - sum(counts)
+    inp = {'structure': 'Cluster', 'natoms': natoms, 'seed': seed,
+        'atomlist': [[sym, c, 1.0, 0.0] for sym, c in zip(SYMBOLS, counts)],
+        'modules': ['Random'], 'relaxations': [], 'nindiv': 10, 'maxgen': 0,
+        'convergence_scheme': 'max_gen', 'filename': 'Benchmark-{0}'.format(natoms),
+        'logging_level': 'warning', 'genealogy': False, 'best_inds_list': False,
+        'cx_scheme': 'cxtp', 'mutation_options': ['rattle', 'swap', 'permutation'],
+        'selection_scheme': 'tournament2', 'predator': 'mutation_dups'}
+    inp.update(parameters)
+    # StructOpt.setup adds new log file handlers on every call
+    for name in ['default', 'by-rank']:
+        logger = logging.getLogger(name)
+        for handler in logger.handlers[:]:
+            handler.close()
+            logger.removeHandler(handler)
+    StructOpt.setup(inp)
+    optimizer = Optimizer()
+    optimizer.algorithm_initialize()
+    return optimizer
+
+
+@benchmark('get_fingerprint')
+def bench_fingerprint(Optimizer, natoms):
+    from StructOpt.fingerprinting.get_fingerprint import calc_fingerprint
+    individ = synthetic_individual(natoms)
+    # calc_fingerprint, since get_fingerprint returns the cached fingerprint after the first call
+    return lambda: calc_fingerprint(Optimizer, individ, 0.1, 7.0)
+
+
+@benchmark('find_defects')
+def bench_find_defects(Optimizer, natoms):
+    from StructOpt.tools.find_defects import find_defects
+    # Vacancies, swaps and rattled atoms on the sites of the perfect lattice
+    bulk = fcc_lattice(natoms)
+    solid = synthetic_atoms(natoms, pbc=True)
+    return lambda: find_defects(solid, bulk, 2.0, trackvacs=True, trackswaps=True)
+
+
+@benchmark('check_min_dist/Crystal')
+def bench_check_min_dist_crystal(Optimizer, natoms):
+    from StructOpt.tools.check_structures import check_min_dist
+    atms = synthetic_atoms(natoms, pbc=True)
+    return lambda: check_min_dist(Optimizer, atms.copy(), 'Crystal', natoms)
+
+
+@benchmark('check_min_dist/Cluster', max_natoms=500)
+def bench_check_min_dist_cluster(Optimizer, natoms):
+    # Pairwise loop over the atoms of clusters not evaluated with LAMMPS
+    from StructOpt.tools.check_structures import check_min_dist
+    atms = synthetic_atoms(natoms)
+    return lambda: check_min_dist(Optimizer, atms.copy(), 'Cluster', natoms)
+
+
+def crossover_names():
+    directory = os.path.dirname(StructOpt.crossover.__file__)
+    return sorted(name[:-3] for name in os.listdir(directory)
+        if name.endswith('.py') and not name.startswith('__'))
+
+
+# Crossovers taking time quadratic in the number of atoms
+SLOW_CROSSOVERS = {'newclus': 500}
+
+def bench_crossover(name):
+    def bench(Optimizer, natoms):
+        cx = getattr(import_module('StructOpt.crossover.{0}'.format(name)), name)
+        ind1 = synthetic_individual(natoms, seed=1)
+        ind2 = synthetic_individual(natoms, seed=2)
+        return lambda: cx(ind1.duplicate(), ind2.duplicate(), Optimizer)
+    return bench
+
+for name in crossover_names():
+    benchmark('crossover/' + name, SLOW_CROSSOVERS.get(name))(bench_crossover(name))
+
+
+def bench_move(name):
+    def bench(Optimizer, natoms):
+        move = getattr(import_module('StructOpt.moves.{0}'.format(name)), name)
+        individ = synthetic_individual(natoms)
+        return lambda: move(individ.duplicate(), Optimizer)
+    return bench
+
+for name in ['rattle', 'rotation', 'swap', 'permutation', 'lattice_alteration', 'scale_size']:
+    benchmark('move/' + name)(bench_move(name))
+
+
+def stem_calculator(pixels):
+    """Returns a STEM_eval with a gaussian probe of pixels x pixels and the
+    real FFT, without reading stem_inp.json"""
+    from StructOpt.fitness.STEM.STEM_eval import STEM_eval
+    calc = STEM_eval.__new__(STEM_eval)
+    calc.rfft = True
+    x = numpy.arange(pixels) - pixels/2.0
+    calc.psf = numpy.fft.ifftshift(numpy.exp(-(x[:, None]**2 + x[None, :]**2)/8.0))
+    calc.psf_spectrum = calc.fft(calc.psf)
+    return calc
+
+
+@benchmark('STEM_eval.get_image')
+def bench_stem_image(Optimizer, natoms):
+    calc = stem_calculator(256)
+    atms = synthetic_atoms(natoms)
+    rmax = max(atms.cell[0, 0], atms.cell[1, 1])
+    return lambda: calc.get_image(calc.psf, atms, rmax, 256)
+
+
+@benchmark('STEM_eval.compare_functions')
+def bench_stem_compare(Optimizer, natoms):
+    calc = stem_calculator(256)
+    atms = synthetic_atoms(natoms)
+    rmax = max(atms.cell[0, 0], atms.cell[1, 1])
+    # Reference image and mask prepared once, as in STEM_eval.__init__
+    calc.expfun = calc.get_image(calc.psf, synthetic_atoms(natoms, seed=1), rmax, 256)
+    calc.expmask = calc.expfun > -1000
+    simfun = calc.get_image(calc.psf, atms, rmax, 256)
+    return lambda: calc.compare_functions(calc.expfun, simfun)
+
+
+@benchmark('write_xyz')
+def bench_write_xyz(Optimizer, natoms):
+    from StructOpt.fileio.write_xyz import write_xyz
+    atms = synthetic_atoms(natoms)
+    filename = 'write-{0}.xyz'.format(natoms)
+    def write():
+        with open(filename, 'w') as f:
+            write_xyz(f, atms, 'Benchmark')
+    return write
+
+
+@benchmark('read_xyz')
+def bench_read_xyz(Optimizer, natoms):
+    from StructOpt.fileio.read_xyz import read_xyz
+    from StructOpt.fileio.write_xyz import write_xyz
+    filename = 'read-{0}.xyz'.format(natoms)
+    with open(filename, 'w') as f:
+        for seed in range(10):
+            write_xyz(f, synthetic_atoms(natoms, seed), 'Benchmark')
+    return lambda: read_xyz(filename, 'All')
+
+
+@benchmark('remove_duplicates')
+def bench_remove_duplicates(Optimizer, natoms):
+    # natoms is used as the number of fitness values
+    from StructOpt.tools.remove_duplicates import remove_duplicates
+    fits = list(numpy.round(numpy.random.RandomState(0).normal(size=natoms), 3))
+    return lambda: remove_duplicates(fits, 1e-3)
+
+
+@benchmark('generation', max_natoms=500)
+def bench_generation(Optimizer, natoms):
+    # Generates and evaluates a population of 10 individuals and runs one generation.
+    # Limited in size by check_min_dist/Cluster on every offspring.
+    # Without the evaluation cache, since every call generates the same structures.
+    def run():
+        optimizer = make_optimizer(natoms, evaluation_cache_size=0)
+        optimizer.algorithm_run()
+    return run
+
+
+@benchmark('generation/LAMMPS', max_natoms=500)
+def bench_generation_lammps(Optimizer, natoms):
+    # As generation, relaxing and evaluating with the LAMMPS module through
+    # the mock LAMMPS binary, so the calculator round trips are included.
+    with open('lammps_inp.json', 'w') as f:
+        json.dump(MOCK_LAMMPS_INPUT, f)
+    def run():
+        command = os.environ.get('LAMMPS_COMMAND')
+        os.environ['LAMMPS_COMMAND'] = mock_lammps_command()
+        try:
+            optimizer = make_optimizer(natoms, evaluation_cache_size=0,
+                modules=['LAMMPS'], relaxations=['LAMMPS'])
+            optimizer.algorithm_run()
+            for module in optimizer.relaxation_modules + optimizer.fitness_modules:
+                module.clean_calculators()
+        finally:
+            if command is None:
+                del os.environ['LAMMPS_COMMAND']
+            else:
+                os.environ['LAMMPS_COMMAND'] = command
+    return run
+
+
+def measure(function, repeat=5):
+    """Returns the best, median and mean seconds per call of function over
+    repeat loops, each calling function enough times to last MIN_TIME"""
+    function()
+    number = 1
+    while True:
+        start = clock()
+        for i in range(number):
+            function()
+        seconds = clock() - start
+        if seconds >= MIN_TIME or number >= 1000:
+            break
+        number *= 10
+    samples = [seconds/number]
+    for r in range(repeat - 1):
+        start = clock()
+        for i in range(number):
+            function()
+        samples.append((clock() - start)/number)
+    return {'best': min(samples), 'median': float(numpy.median(samples)),
+        'mean': float(numpy.mean(samples)), 'number': number, 'repeat': repeat}
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=5, only=None, seed=0, verbose=True):
+    """Runs the benchmarks whose name starts with one of the strings in only,
+    or all benchmarks, at every size. Benchmarks are run in a temporary
+    working directory. Failed benchmarks are recorded with their error.
+    Outputs:
+        results = dictionary with the 'metadata' of the run and the list of 'results'
+    """
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix='structopt-benchmark-')
+    results = []
+    try:
+        os.chdir(workdir)
+        with open('inputs.json', 'w') as f:
+            json.dump({'seed': seed}, f)
+        for natoms in sizes:
+            optimizer = make_optimizer(natoms, seed)
+            for name, function, max_natoms in BENCHMARKS:
+                if only and not any(name.startswith(one) for one in only):
+                    continue
+                result = {'name': name, 'natoms': natoms}
+                if max_natoms is not None and natoms > max_natoms:
+                    result['skipped'] = 'more than {0} atoms'.format(max_natoms)
+                else:
+                    random.seed(seed)
+                    numpy.random.seed(seed)
+                    try:
+                        result.update(measure(function(optimizer, natoms), repeat))
+                    except Exception as e:
+                        result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+                        if verbose:
+                            traceback.print_exc()
+                results.append(result)
+                if verbose:
+                    print(format_result(result))
+                    sys.stdout.flush()
+            optimizer.close_output()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {'metadata': metadata(sizes, repeat, seed), 'results': results}
+
+
+def metadata(sizes, repeat, seed):
+    try:
+        with open(os.devnull, 'w') as null:
+            commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                cwd=os.path.dirname(os.path.abspath(__file__)), stderr=null)
+        commit = commit.decode().strip()
+    except Exception:
+        commit = None
+    return {'structopt': __version__, 'commit': commit, 'python': platform.python_version(),
+        'numpy': numpy.__version__, 'ase': ase.__version__, 'platform': platform.platform(),
+        'processor': platform.processor(), 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'sizes': list(sizes), 'repeat': repeat, 'seed': seed}
+
+
+def format_result(result):
+    label = '{0:<36} {1:>6}'.format(result['name'], result['natoms'])
+    if 'error' in result:
+        return label + '  ERROR ' + result['error']
+    if 'skipped' in result:
+        return label + '  skipped, ' + result['skipped']
+    return label + '  {0:>12.6f} s'.format(result['best'])
+
+
+def compare_results(old, new, threshold=THRESHOLD, verbose=True):
+    """Compares the best times of two result dictionaries of run_benchmarks.
+    Returns the list of (name, natoms, ratio) of the benchmarks more than
+    threshold slower in new than in old."""
+    timings = dict(((r['name'], r['natoms']), r['best']) for r in old['results'] if 'best' in r)
+    regressions = []
+    for r in new['results']:
+        key = (r['name'], r['natoms'])
+        if 'best' not in r or key not in timings:
+            continue
+        ratio = r['best']/timings[key]
+        if ratio > 1 + threshold:
+            regressions.append((r['name'], r['natoms'], ratio))
+        if verbose:
+            print('{0:<36} {1:>6}  {2:>12.6f} {3:>12.6f}  x{4:.2f}{5}'.format(r['name'], r['natoms'],
+                timings[key], r['best'], ratio, '  SLOWER' if ratio > 1 + threshold else ''))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the StructOpt benchmark suite')
+    parser.add_argument('-o', '--output', default='benchmark-results.json',
+        help='JSON file the results are written to')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+        help='numbers of atoms of the synthetic structures')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timing loops')
+    parser.add_argument('--only', nargs='+', help='run only the benchmarks starting with these names')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare to')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+        help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.only, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = compare_results(old, results, args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
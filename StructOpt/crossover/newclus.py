@@ -164,9 +164,9 @@ def newclus(ind1, ind2, Optimizer):
     for sym, c, m, u in Optimizer.atomlist:
         if Optimizer.structure == 'Defect':
             nc = len([atm for atm in nsolid1 if atm.symbol == sym])
-            nc += len([atm for atm in ind1.bulki if atm.symbol == sym])
+            nc += len([atm for atm in ind1.view('bulki') if atm.symbol == sym])
             oc = len([atm for atm in solid1 if atm.symbol == sym])
-            oc += len([atm for atm in ind1.bulki if atm.symbol == sym])
+            oc += len([atm for atm in ind1.view('bulki') if atm.symbol == sym])
         else:
             nc = len([atm for atm in nsolid1 if atm.symbol == sym])
             oc = len([atm for atm in solid1 if atm.symbol == sym])
@@ -181,9 +181,9 @@ def newclus(ind1, ind2, Optimizer):
     for sym, c, m, u in Optimizer.atomlist:
         if Optimizer.structure == 'Defect':
             nc = len([atm for atm in nsolid2 if atm.symbol == sym])
-            nc += len([atm for atm in ind2.bulki if atm.symbol == sym])
+            nc += len([atm for atm in ind2.view('bulki') if atm.symbol == sym])
             oc = len([atm for atm in solid2 if atm.symbol == sym])
-            oc += len([atm for atm in ind2.bulki if atm.symbol == sym])
+            oc += len([atm for atm in ind2.view('bulki') if atm.symbol == sym])
         else:
             nc = len([atm for atm in nsolid2 if atm.symbol == sym])
             oc = len([atm for atm in solid2 if atm.symbol == sym])
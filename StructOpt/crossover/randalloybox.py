@@ -29,9 +29,9 @@ def randalloybox(ind1, ind2, Optimizer):
 
         # Build solids
         solid1 = indi1.copy()
-        solid1.extend(ind1.bulki.copy())
+        solid1.extend(ind1.view('bulki'))
         solid2 = indi2.copy()
-        solid2.extend(ind2.bulki.copy())
+        solid2.extend(ind2.view('bulki'))
 
         # Get starting concentrations and number of atoms
         nat1 = len(solid1)
@@ -171,10 +171,10 @@ def rotct(ind1, ind2, Optimizer):
     if Optimizer.structure == 'Defect':
         solid1 = Atoms()
         solid1.extend(ind1[0])
-        solid1.extend(ind1.bulki)
+        solid1.extend(ind1.view('bulki'))
         solid2 = Atoms()
         solid2.extend(ind1[0])
-        solid2.extend(ind2.bulki)
+        solid2.extend(ind2.view('bulki'))
         for sym, c, m, u in Optimizer.atomlist:
                 nc = len([atm for atm in solid1 if atm.symbol == sym])
                 Optimizer.output.write('CX ROTCT: CIBS 1 configuration contains '+repr(nc)+' '+repr(sym)+' atoms\n')
@@ -1,7 +1,7 @@
 import random
 import numpy
 from ase import Atom, Atoms
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 from StructOpt.structoptio import write_xyz
 
 def rotct_rand_clus(ind1, ind2, Optimizer):
@@ -25,8 +25,8 @@ def rotct_rand_clus(ind1, ind2, Optimizer):
     indi1 = ind1[0].copy()
     indi2 =ind2[0].copy()
 
-    indi1c,indi1b,vacant1,swap1,stro1 = find_defects(indi1,Optimizer.solidbulk,0)
-    indi2c,indi2b,vacant2,swap2,stro2 = find_defects(indi2,Optimizer.solidbulk,0)
+    indi1c,indi1b,vacant1,swap1,stro1 = get_defects(ind1,Optimizer.solidbulk,0)
+    indi2c,indi2b,vacant2,swap2,stro2 = get_defects(ind2,Optimizer.solidbulk,0)
 
     if len(indi1c) !=0 and len(indi2c) != 0:
         #Translate individuals so COM is at (0,0,0)
@@ -172,10 +172,10 @@ def rotct_rand_clus(ind1, ind2, Optimizer):
         if Optimizer.structure=='Defect':
             solid1=Atoms()
             solid1.extend(indi1)
-            solid1.extend(ind1.bulki)
+            solid1.extend(ind1.view('bulki'))
             solid2=Atoms()
             solid2.extend(indi2)
-            solid2.extend(ind2.bulki)
+            solid2.extend(ind2.view('bulki'))
             for sym,c,m,u in Optimizer.atomlist:
                 nc=len([atm for atm in solid1 if atm.symbol==sym])
                 Optimizer.output.write('CX RANDROTCT: Defect 1 configuration contains '+repr(nc)+' '+repr(sym)+' atoms\n')
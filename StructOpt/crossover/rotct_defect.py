@@ -1,7 +1,7 @@
 import random
 import numpy
 from ase import Atom, Atoms
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 from StructOpt.tools.position_average import position_average
 from StructOpt.tools.shift_atoms import shift_atoms
 from StructOpt.fileio import write_xyz
@@ -28,13 +28,13 @@ def rotct_defect(ind1, ind2, Optimizer):
     # Translate individuals so COP is at (0, 0, 0)
     if Optimizer.structure == 'Defect':
         # Identify center of positions for defect structure
-        indi1c, indi1b, vacant1, swap1, stro1 = find_defects(indi1, Optimizer.solidbulk, 0)
+        indi1c, indi1b, vacant1, swap1, stro1 = get_defects(ind1, Optimizer.solidbulk, 0)
         com1 = position_average(indi1c)
         indi1 = shift_atoms(indi1, com1)
         trans = [-p for p in numpy.maximum.reduce(indi1.get_cell())]
         indi1.translate(trans)
         # Do the same for second individual
-        indi2c, indi2b, vacant2, swap2, stro2 = find_defects(indi2, Optimizer.solidbulk, 0)
+        indi2c, indi2b, vacant2, swap2, stro2 = get_defects(ind2, Optimizer.solidbulk, 0)
         com2 = position_average(indi2c)
         indi2 = shift_atoms(indi2, com2)
         indi2.translate(trans)
@@ -184,10 +184,10 @@ def rotct_defect(ind1, ind2, Optimizer):
         if Optimizer.structure == 'Defect':
             solid1 = Atoms()
             solid1.extend(indi1)
-            solid1.extend(ind1.bulki)
+            solid1.extend(ind1.view('bulki'))
             solid2 = Atoms()
             solid2.extend(indi2)
-            solid2.extend(ind2.bulki)
+            solid2.extend(ind2.view('bulki'))
             for sym, c, m, u in Optimizer.atomlist:
                 nc = len([atm for atm in solid1 if atm.symbol == sym])
                 Optimizer.output.write('CX ROTCT_Defect: Defect 1 configuration contains {} {} atoms\n'.format(repr(nc), repr(sym)))
@@ -162,10 +162,10 @@ def rotct_rand(ind1, ind2, Optimizer):
     if Optimizer.structure == 'Defect':
         solid1 = Atoms()
         solid1.extend(indi1)
-        solid1.extend(ind1.bulki)
+        solid1.extend(ind1.view('bulki'))
         solid2 = Atoms()
         solid2.extend(indi2)
-        solid2.extend(ind2.bulki)
+        solid2.extend(ind2.view('bulki'))
         for sym, c, m, u in Optimizer.atomlist:
             nc = len([atm for atm in solid1 if atm.symbol == sym])
             Optimizer.output.write('CX RANDROTCT: Defect 1 configuration contains {} {} atoms\n'.format(repr(nc), repr(sym)))
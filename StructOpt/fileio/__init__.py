@@ -1,6 +1,8 @@
 """General functions for input/output use in structopt"""
 
+from checkpoint import *
 from logger_utils import *
+from output_writer import *
 from read_individual import *
 from read_Ltraj_file import *
 from read_parameter_input import *
@@ -8,6 +10,7 @@ from read_xyz import *
 from restart_output import *
 from setup_output import *
 from setup_par_output import *
+from trajectory import *
 from write_individual import *
 from write_lammps_data import *
 from write_optimizer import *
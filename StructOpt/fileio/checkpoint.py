@@ -0,0 +1,166 @@
+import os
+import json
+import numpy
+from ase import Atoms
+from StructOpt.fileio.read_individual import read_individual
+from StructOpt.generate.Individual import Individual
+
+# Structures of an individual stored in a checkpoint, 'structure' is individ[0]
+CHECKPOINT_ATOMS = ['structure', 'bulki', 'bulko', 'box', 'vacancies', 'swaps']
+# Numeric attributes of an individual stored in a checkpoint
+CHECKPOINT_SCALARS = ['fitness', 'energy', 'tenergymx', 'tenergymin', 'pressure',
+    'volume', 'force', 'purebulkenpa', 'natomsbulk']
+
+def write_checkpoint(individuals, filename, extra=None):
+    """Function to write a list of individuals to a single binary NPZ archive
+    The structures are stored as packed arrays of atomic numbers and positions with the
+    number of atoms, cell and pbc of each individual. The archive is written to a
+    temporary file and renamed, so filename always holds a complete checkpoint.
+    Input:
+        individuals = list of Individual class objects to be written
+        filename = String name of the checkpoint file
+        extra = Optional dictionary of additional arrays to store in the archive
+    Output:
+        No output returned.  Information is written to file
+    """
+    arrays = dict(extra or {})
+    for name in CHECKPOINT_ATOMS:
+        atomslist = [get_checkpoint_atoms(ind, name) for ind in individuals]
+        arrays[name+'_natoms'] = numpy.array([len(atoms) for atoms in atomslist], dtype=int)
+        arrays[name+'_numbers'] = numpy.concatenate([numpy.zeros(0, dtype=int)] +
+            [atoms.get_atomic_numbers() for atoms in atomslist])
+        arrays[name+'_positions'] = numpy.concatenate([numpy.zeros((0, 3))] +
+            [atoms.get_positions() for atoms in atomslist])
+        arrays[name+'_cell'] = numpy.array([atoms.get_cell() for atoms in atomslist], dtype=float).reshape(-1, 3, 3)
+        arrays[name+'_pbc'] = numpy.array([atoms.get_pbc() for atoms in atomslist], dtype=bool).reshape(-1, 3)
+    for name in CHECKPOINT_SCALARS:
+        arrays[name] = numpy.array([numpy.nan if getattr(ind, name) is None else getattr(ind, name)
+            for ind in individuals], dtype=float)
+    arrays['index'] = numpy.array([ind.index for ind in individuals], dtype=int)
+    arrays['history_index'] = numpy.array([str(ind.history_index) for ind in individuals], dtype=str)
+    fingerprints = [numpy.ravel(numpy.asarray(ind.fingerprint, dtype=float)) if numpy.size(ind.fingerprint) > 1
+        else numpy.zeros(0) for ind in individuals]
+    arrays['fingerprint_length'] = numpy.array([len(fp) for fp in fingerprints], dtype=int)
+    arrays['fingerprint'] = numpy.concatenate([numpy.zeros(0)] + fingerprints)
+    arrays['swaplist'] = numpy.array([json.dumps(ind.swaplist) for ind in individuals], dtype=str)
+    arrays['predicted'] = numpy.array([ind.predicted for ind in individuals], dtype=bool)
+
+    tmpname = '{0}.tmp'.format(filename)
+    with open(tmpname, 'wb') as f:
+        numpy.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(tmpname, filename)
+    return
+
+
+def read_checkpoint(filename):
+    """Function to read the individuals of a checkpoint written by write_checkpoint
+    Input:
+        filename = String name of the checkpoint file
+    Output:
+        returns a list of Individual class objects
+    """
+    data = numpy.load(filename)
+    try:
+        n = len(data['fitness'])
+        atoms = {}
+        for name in CHECKPOINT_ATOMS:
+            bounds = numpy.concatenate([[0], numpy.cumsum(data[name+'_natoms'])])
+            numbers = data[name+'_numbers']
+            positions = data[name+'_positions']
+            cells = data[name+'_cell']
+            pbcs = data[name+'_pbc']
+            atoms[name] = [Atoms(numbers=numbers[bounds[i]:bounds[i+1]], positions=positions[bounds[i]:bounds[i+1]],
+                cell=cells[i], pbc=pbcs[i]) for i in range(n)]
+        scalars = dict([(name, data[name].tolist()) for name in CHECKPOINT_SCALARS])
+        fpbounds = numpy.concatenate([[0], numpy.cumsum(data['fingerprint_length'])])
+        fingerprint = data['fingerprint']
+        index = data['index'].tolist()
+        history_index = data['history_index'].tolist()
+        swaplist = data['swaplist'].tolist()
+        if 'predicted' in data.files:
+            predicted = data['predicted'].tolist()
+        else:
+            predicted = [False]*n
+    finally:
+        data.close()
+
+    individuals = []
+    for i in range(n):
+        individ = Individual(atoms['structure'][i])
+        for name in CHECKPOINT_ATOMS[1:]:
+            setattr(individ, name, atoms[name][i])
+        for name in CHECKPOINT_SCALARS:
+            setattr(individ, name, scalars[name][i])
+        individ.index = index[i]
+        individ.history_index = str(history_index[i])
+        if fpbounds[i+1] > fpbounds[i]:
+            individ.fingerprint = fingerprint[fpbounds[i]:fpbounds[i+1]].copy()
+        individ.swaplist = json.loads(swaplist[i])
+        individ.predicted = predicted[i]
+        individuals.append(individ)
+    return individuals
+
+
+def read_population(files):
+    """Function to read the individuals of a population saved for restart
+    Input:
+        files = String name of a checkpoint file or list of files written by write_individual
+    Output:
+        returns a list of Individual class objects
+    """
+    if isinstance(files, str):
+        return read_checkpoint(files)
+    return [read_individual(indfile) for indfile in files]
+
+
+def write_evaluation_cache(cache, filename):
+    """Function to write the individuals of an evaluation cache with their keys
+    Input:
+        cache = StructureCache object holding evaluated individuals
+        filename = String name of the checkpoint file
+    Output:
+        No output returned.  Information is written to file
+    """
+    keys = list(cache.data.keys())
+    # Individuals stored under several keys are written once
+    individuals = []
+    positions = {}
+    index = []
+    for key in keys:
+        individ = cache.data[key]
+        if id(individ) not in positions:
+            positions[id(individ)] = len(individuals)
+            individuals.append(individ)
+        index.append(positions[id(individ)])
+    write_checkpoint(individuals, filename, extra={'cache_keys': numpy.array(keys, dtype=str),
+        'cache_index': numpy.array(index, dtype=int)})
+    return
+
+
+def read_evaluation_cache(cache, filename):
+    """Function to add the individuals of a checkpoint written by write_evaluation_cache
+    to an evaluation cache
+    Input:
+        cache = StructureCache object the individuals are added to
+        filename = String name of the checkpoint file
+    Output:
+        returns the number of individuals read
+    """
+    individuals = read_checkpoint(filename)
+    data = numpy.load(filename)
+    try:
+        keys = [str(key) for key in data['cache_keys']]
+        index = data['cache_index'].tolist()
+    finally:
+        data.close()
+    for key, i in zip(keys, index):
+        cache.set(key, individuals[i])
+    return len(individuals)
+
+
+def get_checkpoint_atoms(individ, name):
+    if name == 'structure':
+        return individ[0]
+    return individ.view(name)
@@ -0,0 +1,154 @@
+import atexit
+import gzip
+import threading
+import traceback
+try:
+    from Queue import Queue, Empty
+except ImportError:
+    from queue import Queue, Empty
+from ase.data import chemical_symbols
+from StructOpt.fileio.write_xyz import format_xyz
+
+# Maximum number of records formatted and written as one batch
+MAX_BATCH = 10000
+
+def open_output(name, mode='a'):
+    """Function to open an output file, names ending in .gz are gzip compressed
+    Input:
+        name = String name of the file
+        mode = String mode to open the file with
+    Output:
+        returns the file object
+    """
+    if name.endswith('.gz'):
+        if 'b' not in mode:
+            mode += 't'
+        return gzip.open(name, mode)
+    return open(name, mode)
+
+
+class OutputFile(object):
+    """File-like handle to an output file written by an OutputWriter.
+    Calls to write, flush and close only queue a record for the writer thread."""
+
+    def __init__(self, writer, name):
+        self.writer = writer
+        self.name = name
+
+    def write(self, text):
+        self.writer.put(('text', self, text))
+
+    def write_atoms(self, atms, data=0, precision=15):
+        """Queues an xyz frame, formatting is done by the writer thread"""
+        self.writer.put(('xyz', self, atms.get_atomic_numbers(), atms.get_positions(),
+            str(data), precision))
+
+    def flush(self):
+        self.writer.put(('flush', self))
+
+    def close(self):
+        self.writer.put(('close', self))
+
+
+class OutputWriter(object):
+    """Background thread writing the output files of the optimizer.
+    Records queued by OutputFile handles are collected in batches, each file
+    receives one write per batch and flushes are only done by the writer
+    thread, so the algorithm never waits on the file system."""
+
+    def __init__(self):
+        self.queue = Queue()
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name='StructOpt-output')
+        self.thread.daemon = True
+        self.thread.start()
+        atexit.register(self.close)
+
+    def open(self, name):
+        """Returns an OutputFile handle for the file name"""
+        return OutputFile(self, name)
+
+    def put(self, record):
+        if self.error is not None:
+            raise RuntimeError('Output writer failed', self.error)
+        if self.closed:
+            raise RuntimeError('Output writer is closed', record[1].name)
+        self.queue.put(record)
+
+    def sync(self):
+        """Waits until all queued records are written"""
+        self.queue.join()
+        if self.error is not None:
+            raise RuntimeError('Output writer failed', self.error)
+
+    def close(self):
+        """Writes all queued records, closes the files and stops the thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise RuntimeError('Output writer failed', self.error)
+
+    def run(self):
+        handles = {}
+        stop = False
+        while not stop:
+            records = [self.queue.get()]
+            try:
+                while len(records) < MAX_BATCH:
+                    records.append(self.queue.get_nowait())
+            except Empty:
+                pass
+            try:
+                stop = self.write_batch(records, handles)
+            except Exception:
+                # Keep draining the queue so the algorithm is never blocked,
+                # the error is raised on the next call from the main thread
+                if self.error is None:
+                    self.error = traceback.format_exc()
+                stop = None in records
+            for record in records:
+                self.queue.task_done()
+        for f in handles.values():
+            f.close()
+
+    def write_batch(self, records, handles):
+        """Writes a batch of records, returns True if the writer was closed"""
+        order = []
+        chunks = {}
+        flushes = []
+        closes = []
+        stop = False
+        for record in records:
+            if record is None:
+                stop = True
+                continue
+            kind, outfile = record[0], record[1]
+            if kind == 'text' or kind == 'xyz':
+                if outfile not in chunks:
+                    order.append(outfile)
+                    chunks[outfile] = []
+                if kind == 'text':
+                    chunks[outfile].append(record[2])
+                else:
+                    numbers, positions, data, precision = record[2:]
+                    symbols = [chemical_symbols[z] for z in numbers]
+                    chunks[outfile].append(format_xyz(symbols, positions, data, precision))
+            elif kind == 'flush':
+                flushes.append(outfile)
+            elif kind == 'close':
+                closes.append(outfile)
+        for outfile in order:
+            if outfile not in handles:
+                handles[outfile] = open_output(outfile.name)
+            handles[outfile].write(''.join(chunks[outfile]))
+        for outfile in set(flushes):
+            if outfile in handles:
+                handles[outfile].flush()
+        for outfile in set(closes):
+            if outfile in handles:
+                handles.pop(outfile).close()
+        return stop
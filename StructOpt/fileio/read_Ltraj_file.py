@@ -1,6 +1,75 @@
 import random
 import numpy
 from ase import Atom, Atoms
+from ase.data import chemical_symbols
+from StructOpt.fileio.trajectory import Trajectory, read_header, read_block, skip_lines
+from StructOpt.fileio.write_xyz import write_xyz
+
+
+class LammpsTrajectory(Trajectory):
+    """Streaming reader for LAMMPS dump files written with the columns
+    id type x y z vx vy vz fx fy fz. Iterating or indexing returns
+    (Atoms, velocities, forces) tuples.
+    atomlist is the list of element strings corresponding to the LAMMPS types,
+    without it every new type is given a random element."""
+
+    def __init__(self, fileobj, atomlist=False):
+        Trajectory.__init__(self, fileobj)
+        self.atomlist = atomlist
+        self.types = {}
+
+    def read_frame(self, f):
+        return self.read_items(f, skip=False)
+
+    def skip_frame(self, f):
+        return self.read_items(f, skip=True) is not None
+
+    def read_items(self, f, skip):
+        header = read_header(f)
+        if header is None:
+            return None
+        natoms = 0
+        cell = None
+        pbc = [False, False, False]
+        while not header.startswith('ITEM: ATOMS'):
+            if header.startswith('ITEM: TIMESTEP'):
+                skip_lines(f, 1)
+            elif header.startswith('ITEM: NUMBER OF ATOMS'):
+                natoms = int(f.readline())
+            elif header.startswith('ITEM: BOX'):
+                pbc = [one == 'pp' for one in header.split()[3:6]]
+                cell = [float(f.readline().split()[1]) for i in range(3)]
+            else:
+                raise ValueError('Unknown LAMMPS dump item', header)
+            header = read_header(f)
+            if header is None:
+                raise ValueError('Unexpected end of file')
+        if skip:
+            skip_lines(f, natoms)
+            return True
+        block = read_block(f, natoms, 5)
+        numbers = [self.get_number(t) for t in block[:, 1]]
+        atms = Atoms(numbers=numbers, positions=block[:, 2:5].astype(float), cell=cell, pbc=pbc)
+        return atms, block[:, 5:8].astype(float), block[:, 8:11].astype(float)
+
+    def get_number(self, t):
+        """Returns the atomic number of the LAMMPS type t"""
+        if t not in self.types:
+            if self.atomlist:
+                self.types[t] = chemical_symbols.index(self.atomlist[int(t)-1])
+            else:
+                self.types[t] = random.choice(range(1,100))
+        return self.types[t]
+
+    def get_atomlist(self):
+        """Returns the element strings corresponding to the LAMMPS types read"""
+        if self.atomlist:
+            return self.atomlist
+        atomlist = list(numpy.zeros(len(self.types)))
+        for t, number in self.types.items():
+            atomlist[int(t)-1] = chemical_symbols[number]
+        return atomlist
+
 
 def read_Ltraj_file(filename,atomlist=False,timestep=-1,ratomlist=False,writefile=False):
     """Function to convert LAMMPS Trajectory file to ASE atoms object
@@ -15,95 +84,22 @@ def read_Ltraj_file(filename,atomlist=False,timestep=-1,ratomlist=False,writefil
     Ouput:
         ASE atoms object containing structure from timestep specified
         if ratomlist: list containing element strings applied to structure corresponding to LAMMPS number
-        vlist = list of velocities for each atom in structure at timestep
-        flist = list of forcer for each atom in structure at timestep
+        vlist = array of velocities for each atom in structure at timestep
+        flist = array of forces for each atom in structure at timestep
     """
-    f = open(filename,'r')
-    if atomlist==False:
-        atnum = []
-        attype = []
-    alist = []
-    vlist = []
-    flist = []
-    timeflag = False
-    numberflag = False
-    boxflag = False
-    atomsflag = False
-    for line in f.readlines():
-        sp = line.split()
-        if timeflag == True:
-            timeflag = False
-        elif numberflag == True:
-            noa = float(sp[0])
-            numberflag = False
-        elif boxflag == True:
-            if boxcount <= 2:
-                box.append(float(sp[1]))
-                boxcount += 1
-            if boxcount > 2:
-                boxflag = False
-        elif atomsflag == True:
-            if na < noa:
-                if atomlist:
-                    sym = atomlist[[i for i,sym in enumerate(atomlist) if str(i+1)==sp[1]][0]]
-                    at = Atom(symbol=sym, position=[float(sp[2]),float(sp[3]),float(sp[4])])
-                    a.append(at)
-                    v = [float(sp[i]) for i in range(5,8)]
-                    vs.append(v)
-                    f1 = [float(sp[i]) for i in range(8,11)]
-                    fs.append(f1)
-                    na += 1
-                else:
-                    if sp[1] in atnum:
-                        sym = attype[[i for i,num in enumerate(atnum) if num==sp[1]][0]]
-                        at=Atom(symbol=sym,position=[float(sp[2]),float(sp[3]),float(sp[4])])
-                        a.append(at)
-                    else:
-                        symn = random.choice(range(1,100))
-                        at=Atom(symbol=symn,position=[float(sp[2]),float(sp[3]),float(sp[4])])
-                        a.append(at)
-                        atnum.append(sp[1])
-                        attype.append(at.symbol)
-                    v = [float(sp[i]) for i in range(5,8)]
-                    vs.append(v)
-                    f1 = [float(sp[i]) for i in range(8,11)]
-                    fs.append(f1)
-                    na += 1
-            if na >= noa:
-                atomsflag = False
-                if atomlist==False:
-                    atomlist=list(numpy.zeros(len(attype)))
-                    for i in range(len(atnum)):
-                        atomlist[int(atnum[i])-1]=attype[i]
-                alist.append(a)
-                vlist.append(vs)
-                flist.append(fs)
-        elif sp[1] == 'TIMESTEP':
-            timeflag = True
-        elif sp[1] == 'NUMBER':
-            numberflag = True
-        elif sp[1] == 'BOX':
-            boxflag = True
-            box = []
-            boxcount = 0
-            pbcc = [False,False,False]
-            if sp[3] == 'pp':
-                pbcc[0] = True
-            if sp[4] == 'pp':
-                pbcc[1] = True
-            if sp[5] == 'pp':
-                pbcc[2] = True
-        elif sp[1] == 'ATOMS':
-            atomsflag = True
-            na = 0
-            a = Atoms(cell=box,pbc=pbcc)
-            vs = []
-            fs = []
-    f.close()
+    with LammpsTrajectory(filename, atomlist) as traj:
+        if timestep == 'all':
+            frames = list(traj)
+        else:
+            frames = [traj[timestep]]
+        atomlist = traj.get_atomlist()
+    alist = [a for a, v, f in frames]
+    vlist = [v for a, v, f in frames]
+    flist = [f for a, v, f in frames]
     if timestep == 'all':
         writefile=False
     if writefile == True:
-        write_xyz(filename+'.xyz',alist[timestep],'xyz')
+        write_xyz(filename+'.xyz',alist[0],'xyz')
     if timestep == 'all':
         if ratomlist:
             return alist, atomlist, vlist, flist
@@ -111,7 +107,6 @@ def read_Ltraj_file(filename,atomlist=False,timestep=-1,ratomlist=False,writefil
             return alist, vlist, flist
     else:
         if ratomlist:
-            return alist[timestep], atomlist, vlist[timestep], flist[timestep]
+            return alist[0], atomlist, vlist[0], flist[0]
         else:
-            return alist[timestep], vlist[timestep], flist[timestep]
-
+            return alist[0], vlist[0], flist[0]
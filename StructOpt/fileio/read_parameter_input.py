@@ -9,6 +9,9 @@ from StructOpt.fileio.logger_utils import initialize_logger
 from StructOpt.tools.check_atomlist_concentration import check_atomlist_concentration
 import pdb
 
+# Modules with an evaluate_indiv method that evaluates one individual on the calling rank
+STEADY_STATE_MODULES = ['LAMMPS', 'Random', 'STEM']
+
 def read_parameter_input(input):
     """Sets StructOpt parameters from a dictionary or filename"""
 
@@ -130,6 +133,9 @@ def set_default_parameters(parameters):
     if 'number_of_bests' not in parameters:
         parameters['number_of_bests'] = nbests
         logger.info('Setting number_of_bests = {0}'.format(parameters['number_of_bests']))
+    if 'best_inds_fptol' not in parameters:
+        parameters['best_inds_fptol'] = False
+        logger.info('Setting best_inds_fptol = {0}'.format(parameters['best_inds_fptol']))
     if 'indiv_defect_write' not in parameters:
         parameters['indiv_defect_write'] = False
         logger.info('Setting indiv_defect_write = {0}'.format(parameters['indiv_defect_write']))
@@ -141,9 +147,24 @@ def set_default_parameters(parameters):
     if 'restart_files' not in parameters:
         parameters['restart_files'] = True
         logger.info('Setting restart_files = {0}'.format(parameters['restart_files']))
+    if 'checkpoint_format' not in parameters:
+        parameters['checkpoint_format'] = 'npz'
+        logger.info('Setting checkpoint_format = {0}'.format(parameters['checkpoint_format']))
     if 'indiv_write' not in parameters:
         parameters['indiv_write'] = 'all'
         logger.info('Setting indiv_write = {0}'.format(parameters['indiv_write']))
+    if 'output_async' not in parameters:
+        parameters['output_async'] = True
+        logger.info('Setting output_async = {0}'.format(parameters['output_async']))
+    if 'output_precision' not in parameters:
+        parameters['output_precision'] = 15
+        logger.info('Setting output_precision = {0}'.format(parameters['output_precision']))
+    if 'output_interval' not in parameters:
+        parameters['output_interval'] = 1
+        logger.info('Setting output_interval = {0}'.format(parameters['output_interval']))
+    if 'output_compression' not in parameters:
+        parameters['output_compression'] = False
+        logger.info('Setting output_compression = {0}'.format(parameters['output_compression']))
 
     # Parameters for post-processing
     if 'lattice_concentration' not in parameters:
@@ -152,6 +173,9 @@ def set_default_parameters(parameters):
     if 'postprocessing' not in parameters:
         parameters['postprocessing'] = False
         logger.info('Setting postprocessing = {0}'.format(parameters['postprocessing']))
+    if 'postprocessing_interval' not in parameters:
+        parameters['postprocessing_interval'] = 0
+        logger.info('Setting postprocessing_interval = {0}'.format(parameters['postprocessing_interval']))
     if 'genealogytree' not in parameters:
         parameters['genealogytree'] = False
         logger.info('Setting genealogytree = {0}'.format(parameters['genealogytree']))
@@ -169,12 +193,25 @@ def set_default_parameters(parameters):
     if 'algorithm_type' not in parameters:
         parameters['algorithm_type'] = algtype
         logger.info('Setting algorithm type = {0}'.format(parameters['algorithm_type']))
+    if 'steady_state' not in parameters:
+        parameters['steady_state'] = False
+        logger.info('Setting steady_state = {0}'.format(parameters['steady_state']))
+    if parameters['steady_state']:
+        # Steady-state workers evaluate alone through evaluate_indiv(Optimizer, indiv, rank)
+        unsupported = [m for m in parameters['modules'] + parameters['relaxations'] if m not in STEADY_STATE_MODULES]
+        if unsupported:
+            logger.critical('steady_state is not supported by the modules {0}'.format(unsupported))
+            raise RuntimeError('steady_state requires modules and relaxations from {0}, found {1}'.format(
+                STEADY_STATE_MODULES, unsupported))
     if 'migration_intervals' not in parameters:
         parameters['migration_intervals'] = 5
-        logger.info('Setting migration_intervals = '.format(parameters['migration_intervals']))
+        logger.info('Setting migration_intervals = {0}'.format(parameters['migration_intervals']))
     if 'migration_percent' not in parameters:
         parameters['migration_percent'] = 0.05
         logger.info('Setting migration_percent = {0}'.format(parameters['migration_percent']))
+    if 'island_size' not in parameters:
+        parameters['island_size'] = 1
+        logger.info('Setting island_size = {0}'.format(parameters['island_size']))
     if 'fingerprinting' not in parameters:
         parameters['fingerprinting'] = False
         logger.info('Setting fingerprinting = {0}'.format(parameters['fingerprinting']))
@@ -184,6 +221,44 @@ def set_default_parameters(parameters):
     if 'fpcutoff' not in parameters:
         parameters['fpcutoff'] = 15.0
         logger.info('Setting fingerprint cutoff distance to {0}'.format(parameters['fpcutoff']))
+    if 'descriptor_cache_size' not in parameters:
+        parameters['descriptor_cache_size'] = 1000
+        logger.info('Setting descriptor_cache_size = {0}'.format(parameters['descriptor_cache_size']))
+    if 'evaluation_cache_size' not in parameters:
+        parameters['evaluation_cache_size'] = 1000
+        logger.info('Setting evaluation_cache_size = {0}'.format(parameters['evaluation_cache_size']))
+    if 'evaluation_cache_tol' not in parameters:
+        parameters['evaluation_cache_tol'] = 1e-4
+        logger.info('Setting evaluation_cache_tol = {0}'.format(parameters['evaluation_cache_tol']))
+    if 'evaluation_cache_file' not in parameters:
+        parameters['evaluation_cache_file'] = None
+        logger.info('Setting evaluation_cache_file = {0}'.format(parameters['evaluation_cache_file']))
+    if 'surrogate_screening' not in parameters:
+        parameters['surrogate_screening'] = False
+        logger.info('Setting surrogate_screening = {0}'.format(parameters['surrogate_screening']))
+    if 'surrogate_fraction' not in parameters:
+        parameters['surrogate_fraction'] = 0.5
+        logger.info('Setting surrogate_fraction = {0}'.format(parameters['surrogate_fraction']))
+    if 'surrogate_explore' not in parameters:
+        parameters['surrogate_explore'] = 0.1
+        logger.info('Setting surrogate_explore = {0}'.format(parameters['surrogate_explore']))
+    if 'surrogate_min_train' not in parameters:
+        parameters['surrogate_min_train'] = 20
+        logger.info('Setting surrogate_min_train = {0}'.format(parameters['surrogate_min_train']))
+    if 'surrogate_train_size' not in parameters:
+        parameters['surrogate_train_size'] = 500
+        logger.info('Setting surrogate_train_size = {0}'.format(parameters['surrogate_train_size']))
+    if 'surrogate_alpha' not in parameters:
+        parameters['surrogate_alpha'] = 1e-3
+        logger.info('Setting surrogate_alpha = {0}'.format(parameters['surrogate_alpha']))
+    if parameters['surrogate_screening'] and parameters['steady_state']:
+        logger.warning('surrogate_screening is only applied by the generational algorithm')
+    if 'timing' not in parameters:
+        parameters['timing'] = True
+        logger.info('Setting timing = {0}'.format(parameters['timing']))
+    if 'profile' not in parameters:
+        parameters['profile'] = False
+        logger.info('Setting profile = {0}'.format(parameters['profile']))
     parameters['bulkfp'] = None
     if 'fixed_region' not in parameters:
         parameters['fixed_region'] = False
@@ -1,4 +1,28 @@
 from ase import Atom, Atoms
+from StructOpt.fileio.trajectory import Trajectory, read_header, read_block, skip_lines, decode
+
+
+class XYZTrajectory(Trajectory):
+    """Streaming reader for multi-frame xyz files. Iterating or indexing
+    returns (Atoms, data) tuples with the comment line of the frame as data."""
+
+    def read_frame(self, f):
+        header = read_header(f)
+        if header is None:
+            return None
+        natoms = int(header)
+        data = decode(f.readline())
+        block = read_block(f, natoms, 4)
+        symbols = [decode(s) for s in block[:, 0]]
+        atms = Atoms(symbols=symbols, positions=block[:, 1:4].astype(float))
+        return atms, data
+
+    def skip_frame(self, f):
+        header = read_header(f)
+        if header is None:
+            return False
+        skip_lines(f, int(header) + 1)
+        return True
 
 
 def read_xyz(fileobj,n=-1,data=False):
@@ -9,47 +33,42 @@ def read_xyz(fileobj,n=-1,data=False):
         n = Integer indicating number for structure from xyz file
             to read. Default is last structure in file.
             Or String=='All' which will output all structures in file
-        data = True/False boolean indicating whether or not to output 
+        data = True/False boolean indicating whether or not to output
             any data strings read from xyz file
     Outputs:
         atmslist = ASE Atoms class object containing structure from file
             or list of Atoms objects if n=='All'
-        datalist(Optional) = String of data read from xyz file or list 
+        datalist(Optional) = String of data read from xyz file or list
             of data strings read from xyz file
     """
     try:
-        from pymatgen.io.vaspio import Poscar
-        mystructure = Poscar.from_file(fileobj).structure
-        from pymatgen.io.aseio import AseAtomsAdaptor
-        myatoms = AseAtomsAdaptor.get_atoms(mystructure)
-        return myatoms
-    except:
-        if isinstance(fileobj, str):
-            fileobj = open(fileobj,'r')
-        lines = fileobj.readlines()
-        atmslist = []
-        datalist = []
-        while len(lines)>0:
-            natoms = int(lines[0])
-            datalist.append(lines[1])
-            atm1 = Atoms()
-            i =- 1
-            for i in range(natoms):
-                a = lines[i+2].split()
-                sym = a[0]
-                position = [float(a[1]),float(a[2]),float(a[3])]
-                atm1.append(Atom(symbol=sym,position=position))
-            atmslist.append(atm1)
-            lines = lines[i+3::]
-        if n == 'All':
-            if data == True:
-                return atmslist, datalist
+        traj = XYZTrajectory(fileobj)
+        try:
+            if n == 'All':
+                frames = list(traj)
             else:
-                return atmslist
+                frames = [traj[n]]
+        finally:
+            if isinstance(fileobj, str):
+                traj.close()
+    except ValueError:
+        # Not an xyz file, try reading it as a POSCAR
+        try:
+            from pymatgen.io.vaspio import Poscar
+            from pymatgen.io.aseio import AseAtomsAdaptor
+        except ImportError:
+            raise ValueError('Cannot read structure file', fileobj)
+        mystructure = Poscar.from_file(fileobj).structure
+        return AseAtomsAdaptor.get_atoms(mystructure)
+    atmslist = [atms for atms, d in frames]
+    datalist = [d for atms, d in frames]
+    if n == 'All':
+        if data == True:
+            return atmslist, datalist
         else:
-            if data == True:
-                return atmslist[n],datalist[n]
-            else:
-                return atmslist[n]
-
-
+            return atmslist
+    else:
+        if data == True:
+            return atmslist[0],datalist[0]
+        else:
+            return atmslist[0]
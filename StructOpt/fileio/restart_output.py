@@ -1,17 +1,16 @@
-def ofile(name):
-    l=open(name,'a')
-    return l
+from StructOpt.fileio.setup_output import ofile
 
 def restart_output(Optimizer):
-    outputoptions = ['output', 'summary','Genealogyfile', 'tenergyfile', 'debugfile','fpfile', 'fpminfile']
+    writer = getattr(Optimizer, 'writer', None)
+    outputoptions = ['output', 'summary','Genealogyfile', 'tenergyfile', 'debugfile','fpfile', 'fpminfile', 'timingsfile']
     outfiles = {'files':None, 'ifiles':None, 'output':None, 'summary':None,
         'Genealogyfile':None, 'tenergyfile':None, 'debugfile':None,
-        'fpfile':None, 'fpminfile':None}
+        'fpfile':None, 'fpminfile':None, 'timingsfile':None}
     for one in outputoptions:
-        outpar = eval('Optimizer.{0}'.format(one))
+        outpar = getattr(Optimizer, one, None)
         if outpar:
-            outfiles[one] = eval("open({0},'a')".format(repr(outpar)))
-    outfiles['files'] = map(ofile,Optimizer.files)
+            outfiles[one] = ofile(outpar, writer)
+    outfiles['files'] = [ofile(name, writer) for name in Optimizer.files]
     if Optimizer.indiv_defect_write:
-        outfiles['ifiles'] = map(ofile,Optimizer.ifiles)
+        outfiles['ifiles'] = [ofile(name, writer) for name in Optimizer.ifiles]
     return outfiles
@@ -1,15 +1,18 @@
 import os
+from StructOpt.fileio.output_writer import open_output
 try:
     from mpi4py import MPI
 except:
     pass
 
-def ofile(name):
-    l=open(name,'a')
+def ofile(name, writer=None):
+    if writer is not None:
+        return writer.open(name)
+    l=open_output(name,'a')
     return l
 
 def setup_output(filename, restart, nindiv, indiv_defect_write, genealogy, 
-    allenergyfile, fingerprinting, debug):
+    allenergyfile, fingerprinting, debug, compression=False, writer=None, timing=False):
     """
         Subprogram to set up the directories and file outputs for the optimizer.
         Inputs:
@@ -28,6 +31,12 @@ def setup_output(filename, restart, nindiv, indiv_defect_write, genealogy,
                 minimum fingerprint by generation
             debug - List of strings.  If debug !=['None'], then a debug 
                 file will be created
+            compression - False or 'gzip'.  If 'gzip' the structure files 
+                of the individuals are gzip compressed
+            writer - OutputWriter object.  If given the files are written by 
+                its background thread, else they are opened directly
+            timing - True/False boolean to determine whether or not to create
+                the output file for the timings of each generation
         Output:
             Dictionary containing output files where the key describes the file 
             structure. Keys include:
@@ -41,6 +50,7 @@ def setup_output(filename, restart, nindiv, indiv_defect_write, genealogy,
                 debugfile = File object for debug file or None
                 fpfile = File object for fingerprint distance data or None
                 fpminfile = File object for minimum fingerprint data or None
+                timingsfile = File object for timing data or None
             Note that with the exception of the general output file, all files will
             be stored in a folder under the filename input given
     """
@@ -53,38 +63,43 @@ def setup_output(filename, restart, nindiv, indiv_defect_write, genealogy,
         os.mkdir(path)
         if restart:
             raise RuntimeError('Cannot find directory for restart', path)
-    flist = [os.path.join(path,'indiv{0:02d}.xyz'.format(x)) for x in range(nindiv)]
+    ext = '.xyz.gz' if compression == 'gzip' else '.xyz'
+    flist = [os.path.join(path,'indiv{0:02d}{1}'.format(x,ext)) for x in range(nindiv)]
     flist.append(os.path.join(path,'StructureSummary.txt'))
-    files = map(ofile,flist)
+    files = [ofile(name,writer) for name in flist]
     if indiv_defect_write:
-        iflist = [os.path.join(path,'indiv{0:02d}-iso.xyz'.format(x)) for x in range(nindiv)]
-        ifiles = map(ofile,iflist)
+        iflist = [os.path.join(path,'indiv{0:02d}-iso{1}'.format(x,ext)) for x in range(nindiv)]
+        ifiles = [ofile(name,writer) for name in iflist]
     else:
         ifiles = None
     outname =  os.path.join(os.getcwd(),'{0}-rank{1}.txt'.format(filename,rank))
-    output = open(outname,'a')
-    summary = open(os.path.join(path,'Summary-{0}.txt'.format(filename)),'a')
+    output = ofile(outname,writer)
+    summary = ofile(os.path.join(path,'Summary-{0}.txt'.format(filename)),writer)
     optifile = os.path.join(path,'Optimizer-restart-file.txt')
     if genealogy:
-        Genealogyfile = open(os.path.join(path,'Genealogy-{0}.txt'.format(filename)),'a')
+        Genealogyfile = ofile(os.path.join(path,'Genealogy-{0}.txt'.format(filename)),writer)
     else:
         Genealogyfile = None
     if allenergyfile: 
-        tenergyfile = open(os.path.join(path,'All_Energies-{0}.txt'.format(filename)),'a')
+        tenergyfile = ofile(os.path.join(path,'All_Energies-{0}.txt'.format(filename)),writer)
     else:
         tenergyfile = None
     if debug != ['None']:
-        debugfile = open(os.path.join(path,'Debug.xyz'),'a')
+        debugfile = ofile(os.path.join(path,'Debug.xyz'),writer)
     else:
         debugfile = None
     if fingerprinting: 
-        fpfile=open(os.path.join(path,'Fingerprints-{0}.txt'.format(filename)),'a')
-        fpminfile=open(os.path.join(path,'FingerprintMin-{0}.txt'.format(filename)),'a')
+        fpfile=ofile(os.path.join(path,'Fingerprints-{0}.txt'.format(filename)),writer)
+        fpminfile=ofile(os.path.join(path,'FingerprintMin-{0}.txt'.format(filename)),writer)
     else:
         fpfile = None
         fpminfile = None
+    if timing:
+        timingsfile = ofile(os.path.join(path,'Timings-{0}.jsonl'.format(filename)),writer)
+    else:
+        timingsfile = None
     outfiles = {'files':files, 'ifiles':ifiles, 'output':output, 'summary':summary,
                 'Genealogyfile':Genealogyfile, 'tenergyfile':tenergyfile,
                 'debugfile':debugfile, 'fpfile':fpfile, 'fpminfile':fpminfile,
-                'optimizerfile':optifile}
+                'timingsfile':timingsfile, 'optimizerfile':optifile}
     return outfiles
@@ -0,0 +1,120 @@
+import numpy
+from StructOpt.fileio.output_writer import open_output
+
+__all__ = ['Trajectory']
+
+class Trajectory(object):
+    """Streaming reader for multi-frame structure files.
+    Frames are read one at a time when iterating, and an index of the byte
+    offset of every frame gives random access with traj[n]. Subclasses define
+    read_frame and skip_frame for a file format."""
+
+    def __init__(self, fileobj):
+        if isinstance(fileobj, str):
+            self.name = fileobj
+            self.fileobj = open_output(fileobj, 'rb')
+        else:
+            self.name = getattr(fileobj, 'name', None)
+            self.fileobj = fileobj
+        self.offsets = None
+
+    def read_frame(self, f):
+        """Reads the frame at the current position of f, None at the end of the file"""
+        raise NotImplementedError
+
+    def skip_frame(self, f):
+        """Moves f past the frame at its current position, False at the end of the file"""
+        raise NotImplementedError
+
+    def build_index(self):
+        """Scans the file once and stores the byte offset of every frame"""
+        f = self.fileobj
+        f.seek(0)
+        offsets = []
+        while True:
+            offset = f.tell()
+            if not self.skip_frame(f):
+                break
+            offsets.append(offset)
+        self.offsets = offsets
+        return offsets
+
+    def __len__(self):
+        if self.offsets is None:
+            self.build_index()
+        return len(self.offsets)
+
+    def __iter__(self):
+        f = self.fileobj
+        f.seek(0)
+        while True:
+            frame = self.read_frame(f)
+            if frame is None:
+                return
+            offset = f.tell()
+            yield frame
+            # Random access in between may have moved the position
+            f.seek(offset)
+
+    def __getitem__(self, n):
+        f = self.fileobj
+        if self.offsets is None and n >= 0:
+            # Skipping the leading frames is cheaper than indexing the whole file
+            f.seek(0)
+            for i in range(n):
+                if not self.skip_frame(f):
+                    raise IndexError('Frame {0} not in {1}'.format(n, self.name))
+            frame = self.read_frame(f)
+            if frame is None:
+                raise IndexError('Frame {0} not in {1}'.format(n, self.name))
+            return frame
+        if self.offsets is None:
+            self.build_index()
+        f.seek(self.offsets[n])
+        return self.read_frame(f)
+
+    def close(self):
+        self.fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_header(f):
+    """Returns the next non-blank line of f as a string, None at the end of the file"""
+    while True:
+        line = f.readline()
+        if not line:
+            return None
+        if line.strip():
+            return decode(line)
+
+
+def read_block(f, nlines, ncolumns):
+    """Reads nlines lines of whitespace separated columns into an array of strings
+    with at least ncolumns columns"""
+    if nlines == 0:
+        return numpy.zeros((0, ncolumns), dtype=str)
+    lines = [f.readline() for i in range(nlines)]
+    if not lines[-1]:
+        raise ValueError('Unexpected end of file')
+    columns = numpy.array(lines[0][:0].join(lines).split())
+    if columns.size % nlines or columns.size < nlines * ncolumns:
+        raise ValueError('Wrong number of columns in block')
+    return columns.reshape(nlines, -1)
+
+
+def skip_lines(f, nlines):
+    """Moves f past nlines lines"""
+    for i in range(nlines):
+        if not f.readline():
+            raise ValueError('Unexpected end of file')
+
+
+def decode(s):
+    if isinstance(s, str):
+        return s
+    return s.decode('ascii')
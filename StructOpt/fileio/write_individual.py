@@ -1,3 +1,4 @@
+import numpy
 from StructOpt.fileio.write_xyz import write_xyz
 
 def write_individual(individ, indivfile):
@@ -28,24 +29,24 @@ def write_individual(individ, indivfile):
     indivfile.write('force = {0}\n'.format(individ.force))
     indivfile.write('purebulkenpa = {0}\n'.format(individ.purebulkenpa))
     indivfile.write('natomsbulk = {0}\n'.format(individ.natomsbulk))
-    indivfile.write('fingerprint = {0}\n'.format(individ.fingerprint))
+    indivfile.write('fingerprint = {0}\n'.format(numpy.asarray(individ.fingerprint).tolist()))
     indivfile.write('swaplist = {0}\n'.format(individ.swaplist))
     #Write additional structure information
     indivfile.write('bulki\n')
-    write_xyz(indivfile, individ.bulki)
-    indivfile.write('bulki cell = {0}\n'.format(get_atom_cell(individ.bulki)))
+    write_xyz(indivfile, individ.view('bulki'))
+    indivfile.write('bulki cell = {0}\n'.format(get_atom_cell(individ.view('bulki'))))
     indivfile.write('bulko\n')
-    write_xyz(indivfile, individ.bulko)
-    indivfile.write('bulko cell = {0}\n'.format(get_atom_cell(individ.bulko)))
+    write_xyz(indivfile, individ.view('bulko'))
+    indivfile.write('bulko cell = {0}\n'.format(get_atom_cell(individ.view('bulko'))))
     indivfile.write('box\n')
-    write_xyz(indivfile, individ.box)
-    indivfile.write('box cell = {0}\n'.format(get_atom_cell(individ.box)))
+    write_xyz(indivfile, individ.view('box'))
+    indivfile.write('box cell = {0}\n'.format(get_atom_cell(individ.view('box'))))
     indivfile.write('vacancies\n')
-    write_xyz(indivfile, individ.vacancies)
-    indivfile.write('vacancies cell = {0}\n'.format(get_atom_cell(individ.vacancies)))
+    write_xyz(indivfile, individ.view('vacancies'))
+    indivfile.write('vacancies cell = {0}\n'.format(get_atom_cell(individ.view('vacancies'))))
     indivfile.write('swaps\n')
-    write_xyz(indivfile, individ.swaps)
-    indivfile.write('swaps cell = {0}\n'.format(get_atom_cell(individ.swaps)))
+    write_xyz(indivfile, individ.view('swaps'))
+    indivfile.write('swaps cell = {0}\n'.format(get_atom_cell(individ.view('swaps'))))
     indivfile.write('Finish')
     indivfile.close()
     return
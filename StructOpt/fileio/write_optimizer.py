@@ -4,6 +4,8 @@ try:
 except:
     pass
 from StructOpt.fileio import write_individual
+from StructOpt.fileio.checkpoint import write_checkpoint, write_evaluation_cache
+from StructOpt.generate.structure_cache import evaluation_cache
 
 def write_optimizer(Optimizer, optfile, restart=True):
     """Function to write out an Optimizer class object
@@ -33,25 +35,45 @@ def write_optimizer(Optimizer, optfile, restart=True):
         'allenergyfile',
         'best_inds_list',
         'number_of_bests',
+        'best_inds_fptol',
         'indiv_defect_write',
         'vacancy_output',
+        'output_async',
+        'output_precision',
+        'output_interval',
+        'output_compression',
         'lattice_concentration',
         'postprocessing',
+        'postprocessing_interval',
         'genealogytree',
         'seed',
         'forcing',
         'debug',
         'algorithm_type',
+        'steady_state',
         'migration_intervals',
         'migration_percent',
+        'island_size',
         'fingerprinting',
         'fpbin',
         'fpcutoff',
+        'descriptor_cache_size',
+        'evaluation_cache_size',
+        'evaluation_cache_tol',
+        'surrogate_screening',
+        'surrogate_fraction',
+        'surrogate_explore',
+        'surrogate_min_train',
+        'surrogate_train_size',
+        'surrogate_alpha',
+        'timing',
+        'profile',
         'bulkfp',
         'fixed_region',
         'rattle_atoms',
         'constrain_position',
         'restart_ints',
+        'checkpoint_format',
         'restart',
         'r_ab',
         'size',
@@ -226,7 +248,7 @@ def write_optimizer(Optimizer, optfile, restart=True):
     except:
         iflist = None
     optfile.write("'ifiles':{0},\n".format(iflist))
-    outputfiles = ['tenergyfile','fpfile','fpminfile','debugfile','Genealogyfile','output','summary']
+    outputfiles = ['tenergyfile','fpfile','fpminfile','timingsfile','debugfile','Genealogyfile','output','summary']
     for one in outputfiles:
         try:
             optfile.write("'{0}':'{1}',\n".format(one,eval('Optimizer.{0}.name'.format(one))))
@@ -238,37 +260,51 @@ def write_optimizer(Optimizer, optfile, restart=True):
         rank = MPI.COMM_WORLD.Get_rank()
     except:
         rank = 0
+    if (len(evaluation_cache) > 0 and Optimizer.restart_files == True):
+        path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename,rank), 'Restart-files')
+        if not os.path.exists(path):
+            os.mkdir(path)
+        Optimizer.evaluation_cache_file = os.path.join(path, 'EvaluationCache.npz')
+        write_evaluation_cache(evaluation_cache, Optimizer.evaluation_cache_file)
+    optfile.write("'evaluation_cache_file':{0},\n".format(repr(Optimizer.evaluation_cache_file)))
     if (len(Optimizer.population) > 0 and Optimizer.restart_files == True):
-        if isinstance(Optimizer.population[0], str):
-            optfile.write("'population':{0},\n".format(Optimizer.population))
-        else:
-            fpath = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename,rank))
-            path = os.path.join(fpath,'Restart-files')
-            if not os.path.exists(path):
-                os.mkdir(path)
-            popfiles = []
-            for index in range(len(Optimizer.population)):
-                fname = os.path.join(path,'Reload-indiv{0:02d}.txt'.format(index))
-                write_individual(Optimizer.population[index],fname)
-                popfiles.append(fname)
-            optfile.write("'population':{0},\n".format(popfiles))
+        optfile.write("'population':{0},\n".format(repr(write_restart_population(Optimizer,
+            Optimizer.population, 'Population', 'Reload-indiv', rank))))
     else:
         optfile.write("'population':{0},\n".format([]))
     if (len(Optimizer.BESTS) > 0 and Optimizer.restart_files == True):
-        if isinstance(Optimizer.population[0], str):
-            optfile.write("'BESTS':{0}".format(Optimizer.BESTS))
-        else:
-            fpath = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename,rank))
-            path = os.path.join(fpath,'Restart-files')
-            if not os.path.exists(path):
-                os.mkdir(path)
-            bestfiles = []
-            for index in range(len(Optimizer.BESTS)):
-                fname = os.path.join(path,'Reload-bests{0:02d}.txt'.format(index))
-                write_individual(Optimizer.BESTS[index],fname)
-                bestfiles.append(fname)
-            optfile.write("'BESTS':{0}".format(bestfiles))
+        optfile.write("'BESTS':{0}".format(repr(write_restart_population(Optimizer,
+            Optimizer.BESTS, 'Bests', 'Reload-bests', rank))))
     else:
         optfile.write("'BESTS':{0}".format([]))
     optfile.close()
     return
+
+
+def write_restart_population(Optimizer, individuals, name, prefix, rank):
+    """Function to save a list of individuals for restart
+    Input:
+        Optimizer = Optimizer class object
+        individuals = list of Individual class objects, or the files they were read from
+        name = name of the NPZ checkpoint for checkpoint_format 'npz'
+        prefix = prefix of the individual files for checkpoint_format 'text'
+        rank = rank of the output directory
+    Output:
+        String name of the checkpoint file or list of individual files
+    """
+    if isinstance(individuals, str) or isinstance(individuals[0], str):
+        return individuals
+    fpath = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename,rank))
+    path = os.path.join(fpath,'Restart-files')
+    if not os.path.exists(path):
+        os.mkdir(path)
+    if Optimizer.checkpoint_format == 'npz':
+        fname = os.path.join(path,'{0}.npz'.format(name))
+        write_checkpoint(individuals, fname)
+        return fname
+    files = []
+    for index in range(len(individuals)):
+        fname = os.path.join(path,'{0}{1:02d}.txt'.format(prefix,index))
+        write_individual(individuals[index],fname)
+        files.append(fname)
+    return files
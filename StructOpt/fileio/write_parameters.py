@@ -23,9 +23,12 @@ def write_parameters(Optimizer):
     else:
         Optimizer.output.write('Algorithm Performed in serial\n')
     Optimizer.output.write('Algorithm type : ' + Optimizer.algorithm_type + '\n')
+    if Optimizer.steady_state:
+        Optimizer.output.write('    Asynchronous steady-state evaluation (steady_state) : ' + repr(Optimizer.steady_state) + '\n')
     if 'Island_Method' in Optimizer.algorithm_type:
         Optimizer.output.write('    Migration Intervals : ' + repr(Optimizer.migration_intervals) + '\n')
         Optimizer.output.write('    Migration Percent : ' + repr(Optimizer.migration_percent) + '\n')
+        Optimizer.output.write('    Ranks per island (island_size) : ' + repr(Optimizer.island_size) + '\n')
     Optimizer.output.write('Type of structure to optimize (structure) = ' + repr(Optimizer.structure) + '\n')
     Optimizer.output.write('Random number seed = ' + repr(Optimizer.seed) + '\n')
     if Optimizer.forcing=='Concentration':
@@ -40,6 +43,21 @@ def write_parameters(Optimizer):
     if Optimizer.fingerprinting:
         Optimizer.output.write('Fingerprint bin size (fpbin) : ' + repr(Optimizer.fpbin) + '\n')
         Optimizer.output.write('Fingerprint cutoff distance (fpcutoff) : ' + repr(Optimizer.fpcutoff) + '\n')
+    Optimizer.output.write('Descriptor cache size (descriptor_cache_size) : ' + repr(Optimizer.descriptor_cache_size) + '\n')
+    Optimizer.output.write('Evaluation cache size (evaluation_cache_size) : ' + repr(Optimizer.evaluation_cache_size) + '\n')
+    Optimizer.output.write('Evaluation cache position tolerance (evaluation_cache_tol) : ' + repr(Optimizer.evaluation_cache_tol) + '\n')
+    if Optimizer.evaluation_cache_file:
+        Optimizer.output.write('Evaluation cache loaded from (evaluation_cache_file) : ' + repr(Optimizer.evaluation_cache_file) + '\n')
+    Optimizer.output.write('Surrogate model screening of offspring (surrogate_screening) : ' + repr(Optimizer.surrogate_screening) + '\n')
+    if Optimizer.surrogate_screening:
+        Optimizer.output.write('Fraction of best predicted offspring evaluated (surrogate_fraction) : ' + repr(Optimizer.surrogate_fraction) + '\n')
+        Optimizer.output.write('Fraction of other offspring evaluated (surrogate_explore) : ' + repr(Optimizer.surrogate_explore) + '\n')
+        Optimizer.output.write('Minimum surrogate training set size (surrogate_min_train) : ' + repr(Optimizer.surrogate_min_train) + '\n')
+        Optimizer.output.write('Maximum surrogate training set size (surrogate_train_size) : ' + repr(Optimizer.surrogate_train_size) + '\n')
+        Optimizer.output.write('Surrogate ridge regularization (surrogate_alpha) : ' + repr(Optimizer.surrogate_alpha) + '\n')
+    Optimizer.output.write('Record timings of each generation (timing) : ' + repr(Optimizer.timing) + '\n')
+    Optimizer.output.write('Write cProfile statistics of each rank (profile) : ' + repr(Optimizer.profile) + '\n')
+    Optimizer.output.write('Restart checkpoint format (checkpoint_format) : ' + repr(Optimizer.checkpoint_format) + '\n')
     if Optimizer.fixed_region: Optimizer.output.write('Fixed Bulk calculation \n')
     if Optimizer.constrain_position: Optimizer.output.write('Constrained position calculation \n')
 
@@ -160,6 +178,8 @@ def write_parameters(Optimizer):
         Optimizer.output.write('Energy cutoff for repetition (tolerance) : ' + repr(Optimizer.tolerance) + '\n')
     Optimizer.output.write('Duplicate structure convergence control scheme (predator) '+ repr(Optimizer.predator) + '\n')
     Optimizer.output.write('Minimum energy difference for duplicate consideration (demin) : ' + repr(Optimizer.demin) + '\n')
+    if Optimizer.best_inds_fptol:
+        Optimizer.output.write('Maximum fingerprint distance for duplicates in best list (best_inds_fptol) : ' + repr(Optimizer.best_inds_fptol) + '\n')
     if Optimizer.predator=='adapting':
         Optimizer.output.write('Fraction of repeated generations at which to begin adaptation (adaptbegin) : ' + repr(Optimizer.adaptbegin) + '\n')
         Optimizer.output.write('Multiplier for adaptation exponential (adaptmultiplier) : ' + repr(Optimizer.adaptmultiplier) + '\n')
@@ -171,8 +191,14 @@ def write_parameters(Optimizer):
     if Optimizer.genealogy: Optimizer.output.write('Genealogy File name : ' + repr(Optimizer.Genealogyfile.name) + '\n')
     if Optimizer.allenergyfile: Optimizer.output.write('All Energy file written \n')
     if Optimizer.lattice_concentration: Optimizer.output.write('Lattice Concentration File written \n')
+    if Optimizer.postprocessing and Optimizer.postprocessing_interval:
+        Optimizer.output.write('Generations between post-processing updates (postprocessing_interval) : ' + repr(Optimizer.postprocessing_interval) + '\n')
     if Optimizer.indiv_defect_write: Optimizer.output.write('Individual cluster files will also be written \n')
     Optimizer.output.write('Vacancies output to final structures : ' + repr(Optimizer.vacancy_output) + '\n')
+    Optimizer.output.write('Background output writer (output_async) : ' + repr(Optimizer.output_async) + '\n')
+    Optimizer.output.write('Decimals of written positions (output_precision) : ' + repr(Optimizer.output_precision) + '\n')
+    Optimizer.output.write('Generations between structure outputs (output_interval) : ' + repr(Optimizer.output_interval) + '\n')
+    Optimizer.output.write('Structure file compression (output_compression) : ' + repr(Optimizer.output_compression) + '\n')
     Optimizer.summary.write(Optimizer.filename+'\n')
 
     Optimizer.output.flush()
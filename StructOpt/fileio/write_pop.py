@@ -11,6 +11,8 @@ def write_pop(Optimizer,pop):
         None. Data is written to output files provided by Optimizer class object
     """
     Optimizer.output.write('\n--New Population--\n')
+    # Structure files are only written every output_interval generations
+    writestructs = Optimizer.generation % Optimizer.output_interval == 0
     #Write structures
     for ind in pop:
         update_outfile(ind, Optimizer.output)
@@ -18,13 +20,12 @@ def write_pop(Optimizer,pop):
             update_genealogy(ind, Optimizer.Genealogyfile)
         if Optimizer.swaplist:
             swaplist_check(ind,Optimizer.structure,Optimizer.output)
-        if Optimizer.indiv_defect_write:
-            write_xyz(Optimizer.ifiles[ind.index],ind[0],ind.energy)
+        if Optimizer.indiv_defect_write and writestructs:
+            write_xyz(Optimizer.ifiles[ind.index],ind[0],ind.energy,Optimizer.output_precision)
         update_structsumfile(ind, Optimizer.files[Optimizer.nindiv])
-        if (Optimizer.indiv_write.lower() == 'all'
+        if writestructs and (Optimizer.indiv_write.lower() == 'all'
             or (Optimizer.indiv_write.lower() == 'best' and ind.index == 0)):
-            positions = update_structfile(ind, Optimizer.files[ind.index], Optimizer)
-        Optimizer.output.write('Number of positions = {0}\n'.format(len(positions)))
+            update_structfile(ind, Optimizer.files[ind.index], Optimizer)
     if Optimizer.genealogy:
         Optimizer.Genealogyfile.write('\n')
     return
@@ -35,12 +36,16 @@ def update_outfile(ind, outfile):
     outfile.write('    Genealogy = {0}\n'.format(ind.history_index))
     outfile.write('    Energy = {0}\n'.format(ind.energy))
     outfile.write('    Fitness = {0}\n'.format(ind.fitness))
+    if ind.predicted:
+        outfile.write('    Fitness predicted by surrogate model\n')
     outfile.write('    Swaplist = {0}\n'.format(ind.swaplist))
 
 def update_structsumfile(ind, structsumfile):
     structsumfile.write(' Index = {0}\n'.format(ind.index))
     structsumfile.write('    Energy = {0}\n'.format(ind.energy))
     structsumfile.write('    Fitness = {0}\n'.format(ind.fitness))
+    if ind.predicted:
+        structsumfile.write('    Fitness predicted by surrogate model\n')
     structsumfile.write('    Cell = {0}\n'.format(ind[0].get_cell()))
     structsumfile.write('    Pressure = {0}\n'.format(ind.pressure))
     structsumfile.write('    Genealogy = {0}\n'.format(ind.history_index))
@@ -50,17 +55,17 @@ def update_structfile(ind, structfile, Optimizer):
     if Optimizer.structure == 'Defect' or Optimizer.structure == 'Surface':
         sols = Atoms()
         sols.extend(ind[0])
-        sols.extend(ind.bulki)
+        sols.extend(ind.view('bulki'))
     elif Optimizer.structure == 'Crystal':
         sols = ind[0].repeat((3,3,3))
     else:
         sols = ind[0].copy()
     positions = sols.get_positions()
     if Optimizer.vacancy_output:
-        for one in ind.vacancies:
+        for one in ind.view('vacancies'):
             sols.append(Atom(symbol='X',position=one.position))
     Optimizer.output.write('Number of positions = {0}\n'.format(len(positions)))
-    write_xyz(structfile, sols, ind.energy)
+    write_xyz(structfile, sols, ind.energy, Optimizer.output_precision)
     return positions
 
 def update_genealogy(ind, genefile):
@@ -70,7 +75,7 @@ def swaplist_check(ind, structype, outfile):
     sanchn = [[sym,0] for sym,c,m,u in Optimizer.atomlist]
     if structype=='Defect':
         solid = ind[0].copy()
-        solid.extend(ind.bulki)
+        solid.extend(ind.view('bulki'))
     else:
         solid = ind[0].copy()
     for i in range(len(sanchn)):
@@ -1,14 +1,28 @@
 from ase import Atom, Atoms
 
-def write_xyz(fileobj,atms,data=0):
+def write_xyz(fileobj,atms,data=0,precision=15):
     """Function to write xyz file with some data
     adapted from ase.io.xyz"""
     if isinstance(fileobj, str):
         fileobj=open(fileobj, 'a')
-    symbols = atms.get_chemical_symbols()
-    natoms = len(symbols)
-    fileobj.write('%d\n' % natoms)
-    fileobj.write(str(data)+'\n')
-    for s, (x, y, z) in zip(symbols, atms.get_positions()):
-        fileobj.write('%-2s %22.15f %22.15f %22.15f\n' % (s, x, y, z))
+    if hasattr(fileobj, 'write_atoms'):
+        # Output handled by the background writer, formatted there
+        fileobj.write_atoms(atms, data, precision)
+        return
+    fileobj.write(format_xyz(atms.get_chemical_symbols(), atms.get_positions(), data, precision))
     return
+
+def format_xyz(symbols, positions, data=0, precision=15):
+    """Function to format a frame of an xyz file
+    Input:
+        symbols = List of chemical symbols
+        positions = Array of atomic positions
+        data = Data written to the comment line
+        precision = Integer number of decimals for the positions
+    Output:
+        returns the frame as a string
+    """
+    fmt = '%-2s' + ' %{0}.{1}f'.format(precision + 7, precision) * 3 + '\n'
+    lines = ['%d\n' % len(symbols), str(data)+'\n']
+    lines.extend(fmt % (s, x, y, z) for s, (x, y, z) in zip(symbols, positions))
+    return ''.join(lines)
@@ -1,55 +1,75 @@
 import numpy
 import math
 from ase import Atom, Atoms
-from StructOpt.fingerprinting import dirac
+try:
+    from ase.neighborlist import neighbor_list
+except ImportError:
+    pass
+
+# Width of the gaussian used to smear each pair distance, as in dirac
+FINGERPRINT_SIGMA = 0.02
+
 
 def get_fingerprint(Optimizer, indiv, binsize, cutoffdist):
-    """Function to calculate the fingerprint of a structure"""
+    """Function to get the fingerprint of a structure. The fingerprint is only
+    calculated if it is not cached for the current structure of indiv."""
+    name = ('fingerprint', Optimizer.structure, binsize, cutoffdist)
+    return indiv.get_descriptor(name, calc_fingerprint, Optimizer, indiv, binsize, cutoffdist)
+
+
+def calc_fingerprint(Optimizer, indiv, binsize, cutoffdist):
+    """Function to calculate the fingerprint of a structure.
+    All pair distances up to cutoffdist are found once with a cell list over the
+    periodic images and smeared onto the bins with a gaussian for each species pair.
+    Inputs:
+        Optimizer = structopt Optimizer class object
+        indiv = Individual class object
+        binsize = spacing of the fingerprint bins
+        cutoffdist = maximum distance of the fingerprint
+    Outputs:
+        fpt = numpy array with the fingerprint of each species pair (i <= j)
+            concatenated in alphabetical order of the species
+    """
 
-    rs = numpy.linspace(0.0, cutoffdist, cutoffdist/binsize)
+    rs = numpy.linspace(0.0, cutoffdist, int(cutoffdist/binsize))
     indi = indiv[0]
     Vuc = indi.get_volume()
     if Optimizer.structure == 'Defect':
-        solid = Atoms()
+        solid = Atoms(cell=indi.get_cell(), pbc=True)
         solid.extend(indi)
-        solid.extend(indiv.bulki)
-    elif Optimizer.structure == 'Crystal':
-        solid = indi.repeat([3, 3, 3])
+        solid.extend(indiv.view('bulki'))
+    elif Optimizer.structure == 'Cluster':
+        solid = indi.copy()
+        solid.set_pbc(False)
     else:
+        # Periodic images replace the explicit 3x3x3 repeat used for crystals
         solid = indi.copy()
 
-    syms = sorted(list(set([atm.symbol for atm in solid])))
+    # Distances from every atom of the individual to every atom of the solid
+    i, j, d = neighbor_list('ijd', solid, cutoffdist + 5*FINGERPRINT_SIGMA)
+    inside = i < len(indi)
+    i, j, d = i[inside], j[inside], d[inside]
+
+    symbols = numpy.array(solid.get_chemical_symbols())
+    syms = sorted(set(symbols))
     fingerprints = []
-    for i in range(len(syms)):
-        for j in range(i, len(syms)):
-            indl = [atm for atm in indi if atm.symbol == syms[i]]
-            ind = Atoms()
-            for one in indl:
-                ind.append(one)
-            soll = [atm for atm in solid if atm.symbol == syms[j]]
-            sol = Atoms()
-            for one in soll:
-                sol.append(one)
-            soli = [atm for atm in solid if atm.symbol == syms[i]]
-            value = []
-            for R in rs:
-                value2 = []
-                for k in range(len(ind)):
-                    value1 = []
-                    for m in range(len(sol)):
-                        if k != m:
-                            rij = sol.get_distance(k, m, mic = True)
-                            if rij == 0:
-                                pass
-                                #pdb.set_trace()
-                            value1.append(dirac(R, a=rij, sig=0.02) * 1. / (4*math.pi * rij** 2*binsize * len(soli) * len(sol) / Vuc))
-                    value2.append(sum(value1))
-                value.append(sum(value2))
-            fingerprints.append(value)
-
-    fpt = []
-    for one in fingerprints:
-        fpt.extend(one)
-
-    return fpt
+    for si in range(len(syms)):
+        for sj in range(si, len(syms)):
+            nsoli = numpy.sum(symbols == syms[si])
+            nsolj = numpy.sum(symbols == syms[sj])
+            pair = (symbols[i] == syms[si]) & (symbols[j] == syms[sj])
+            fingerprints.append(smear_distances(rs, d[pair], binsize, nsoli*nsolj/Vuc))
+
+    return numpy.concatenate(fingerprints)
+
 
+def smear_distances(rs, dists, binsize, density, chunk=20000):
+    """Sums the normalized gaussians of the pair distances dists on the bins rs"""
+    value = numpy.zeros(len(rs))
+    sig = FINGERPRINT_SIGMA
+    for start in range(0, len(dists), chunk):
+        rij = dists[start:start+chunk]
+        weight = 1.0 / (4*math.pi * rij**2 * binsize * density)
+        gauss = numpy.exp(-(rs[numpy.newaxis, :] - rij[:, numpy.newaxis])**2 / sig**2) / (sig * math.pi**0.5)
+        value += numpy.dot(weight, gauss)
+    return value
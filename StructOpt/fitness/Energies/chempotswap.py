@@ -27,7 +27,7 @@ def chempotswap(indiv, Optimzier):
         os.chdir(cwd)
         f=open('problem-structures.xyz','a')
         totalsol = indiv[0].copy()
-        totalsol.extend(indiv.bulki)
+        totalsol.extend(indiv.view('bulki'))
         write_xyz(f,totalsol,data='Starting structure hindex={0}'.format(indiv.history_index))
         indiv.energy = 10000
         f.close()
@@ -55,7 +55,7 @@ def chempotswap(indiv, Optimzier):
         if Optimizer.structure=='Defect':
             solid=Atoms()
             solid.extend(indiv[0])
-            solid.extend(indiv.bulki)
+            solid.extend(indiv.view('bulki'))
         else:
             solid = indiv[0]
         for sym,c,m,u in Optimizer.atomlist:
@@ -26,7 +26,7 @@ def enpafit(indiv,Optimizer):
         os.chdir(cwd)
         f=open('problem-structures.xyz','a')
         totalsol = indiv[0].copy()
-        totalsol.extend(indiv.bulki)
+        totalsol.extend(indiv.view('bulki'))
         write_xyz(f,totalsol,data='Starting structure hindex={0}'.format(indiv.history_index))
         indiv.energy = 10000
         f.close()
@@ -53,7 +53,7 @@ def enpafit(indiv,Optimizer):
         indiv.energy = 10000
     if passflag:
         if Optimizer.structure == 'Defect' or Optimizer.structure=='Surface':
-            indiv.fitness = indiv.energy/(indiv[0].get_number_of_atoms()+indiv.bulki.get_number_of_atoms())
+            indiv.fitness = indiv.energy/(indiv[0].get_number_of_atoms()+indiv.view('bulki').get_number_of_atoms())
         else:
             indiv.fitness = indiv.energy/indiv[0].get_number_of_atoms()
     else:
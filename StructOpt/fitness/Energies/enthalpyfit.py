@@ -27,7 +27,7 @@ def enthalpyfit(indiv,Optimizer):
         os.chdir(cwd)
         f=open('problem-structures.xyz','a')
         totalsol = indiv[0].copy()
-        totalsol.extend(indiv.bulki)
+        totalsol.extend(indiv.view('bulki'))
         write_xyz(f,totalsol,data='Starting structure hindex={0}'.format(indiv.history_index))
         indiv.energy = 10000
         f.close()
@@ -34,7 +34,7 @@ def formationenergy(indiv, Optimizer):
             os.chdir(cwd)
             f=open('problem-structures.xyz','a')
             totalsol = indiv[0].copy()
-            totalsol.extend(indiv.bulki)
+            totalsol.extend(indiv.view('bulki'))
             write_xyz(f,totalsol,data='Starting structure hindex={0}'.format(indiv.history_index))
             indiv.energy = 10000
             f.close()
@@ -47,7 +47,7 @@ def formationenergy(indiv, Optimizer):
         #fit = (indiv.purebulkenpa*(indiv[0].get_number_of_atoms()+indiv.bulki.get_number_of_atoms()) - indiv.energy)/(indiv[0].get_number_of_atoms()+indiv.bulki.get_number_of_atoms()-indiv.natomsbulk)
         solid=Atoms()
         solid.extend(indiv[0])
-        solid.extend(indiv.bulki)
+        solid.extend(indiv.view('bulki'))
         fit=indiv.energy
         passflag = True
         if abs(fit) > Optimizer.energy_cutoff_factor*(len(indiv[0])+len(indiv.bulki)):
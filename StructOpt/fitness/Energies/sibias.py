@@ -3,7 +3,7 @@ from StructOpt.fileio.write_xyz import write_xyz
 import logging
 import math
 import os
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def sibias(indiv, Optimizer):
     """Function to calculate total energy fitness of individual and bias away
@@ -28,7 +28,7 @@ def sibias(indiv, Optimizer):
         os.chdir(cwd)
         f=open('problem-structures.xyz','a')
         totalsol = indiv[0].copy()
-        totalsol.extend(indiv.bulki)
+        totalsol.extend(indiv.view('bulki'))
         write_xyz(f,totalsol,data='Starting structure hindex={0}'.format(indiv.history_index))
         indiv.energy = 10000
         f.close()
@@ -51,7 +51,7 @@ def sibias(indiv, Optimizer):
         logger.warn('Found NAN energy structure HI={0}'.format(indiv.history_index))
         indiv.fitness=10000
         indiv.energy = 10000
-    indc,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+    indc,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
     syms = indc.get_chemical_symbols()
     for sym in syms:
         if sym=='Si':
@@ -3,7 +3,7 @@ from StructOpt.fileio.write_xyz import write_xyz
 import logging
 import math
 import os
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 from ase import Atom, Atoms
 
 def sibias2(indiv, Optimizer):
@@ -29,7 +29,7 @@ def sibias2(indiv, Optimizer):
         os.chdir(cwd)
         f=open('problem-structures.xyz','a')
         totalsol = indiv[0].copy()
-        totalsol.extend(indiv.bulki)
+        totalsol.extend(indiv.view('bulki'))
         write_xyz(f,totalsol,data='Starting structure hindex={0}'.format(indiv.history_index))
         indiv.energy = 10000
         f.close()
@@ -52,7 +52,7 @@ def sibias2(indiv, Optimizer):
         logger.warn('Found NAN energy structure HI={0}'.format(indiv.history_index))
         indiv.fitness=10000
         indiv.energy = 10000
-    indc,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+    indc,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
     syms = indc.get_chemical_symbols()
     for sym in syms:
         if sym=='Si':
@@ -62,7 +62,7 @@ def sibias2(indiv, Optimizer):
             indiv.fitness+=50
             indiv.energy+=50
     nindiv = Atoms(cell=indiv[0].get_cell(),pbc=True)
-    nbulk = indiv.bulki.copy()
+    nbulk = indiv.view('bulki').copy()
     for at in indiv[0]:
         if at.symbol=='Si':
             nbulk.append(at)
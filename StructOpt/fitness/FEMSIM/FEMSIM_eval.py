@@ -44,10 +44,10 @@ class FEMSIM_eval(object):
 
     def evaluate_fitness(self, Optimizer, individ):
         logger = logging.getLogger('by-rank')
-        rank = MPI.COMM_WORLD.Get_rank()
+        rank = Optimizer.comm.Get_rank()
         out = []
         if rank==0:
-            femsimfiles = '{filename}-rank0/FEMSIMFiles'.format(filename=Optimizer.filename)
+            femsimfiles = '{filename}-rank{root}/FEMSIMFiles'.format(filename=Optimizer.filename, root=Optimizer.island_root)
             if not os.path.exists(femsimfiles):
                 os.mkdir(femsimfiles)
 
@@ -71,7 +71,7 @@ class FEMSIM_eval(object):
             out = [(chisq, '') for chisq in chisqs]
             print(chisqs)
 
-        out = MPI.COMM_WORLD.bcast(out, root=0)
+        out = Optimizer.comm.bcast(out, root=0)
         return out
 
     def setup_individual_evaluation(self, Optimizer, individ, i):
@@ -81,7 +81,7 @@ class FEMSIM_eval(object):
         logger.info('Received individual HI = {0} for FEMSIM evaluation'.format(individ.history_index))
 
         # Make individual folder and copy files there
-        indiv_folder = '{filename}-rank0/FEMSIMFiles/Individual{i}'.format(filename=Optimizer.filename, i=i)
+        indiv_folder = '{filename}-rank{root}/FEMSIMFiles/Individual{i}'.format(filename=Optimizer.filename, root=Optimizer.island_root, i=i)
         if not os.path.exists(indiv_folder):
             os.mkdir(indiv_folder)
         if not os.path.isfile(os.path.join(indiv_folder, self.args['vk_data_filename'])):
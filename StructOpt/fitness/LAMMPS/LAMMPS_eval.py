@@ -1,4 +1,6 @@
 import os
+import copy
+import atexit
 try:
     from ase import Atom, Atoms
     from ase.optimize import BFGS
@@ -8,10 +10,10 @@ except ImportError:
     pass
 from StructOpt.fileio.write_xyz import write_xyz
 from StructOpt.fingerprinting import get_fingerprint
-from StructOpt.tools.lammps import LAMMPS
 from StructOpt.tools.setup_energy_calculator import setup_energy_calculator
 from StructOpt.tools.compose_structure import compose_structure
 from StructOpt.tools.decompose_structure import decompose_structure
+from StructOpt.tools.work_queue import work_queue
 import numpy
 import math
 import json
@@ -34,6 +36,9 @@ class LAMMPS_eval(object):
         self.args = self.read_inputs()
         for k,v in self.args.items():
             setattr(self,k,v)
+        # Per-rank calculator pool, see get_calculators
+        self.calculators = {}
+        atexit.register(self.clean_calculators)
 
     def read_inputs(self):
         args = dict()
@@ -42,45 +47,9 @@ class LAMMPS_eval(object):
         return args
 
     def evaluate_fitness(self, Optimizer, individ, relax=False):
-        comm = MPI.COMM_WORLD
-        rank = MPI.COMM_WORLD.Get_rank()
-
-        if rank==0:
-            ntimes=int(math.ceil(1.*len(individ)/comm.Get_size()))
-
-            nadd=int(ntimes*comm.Get_size()-len(individ))
-            maplist=[[] for n in range(ntimes)]
-            strt=0
-            for i in range(len(maplist)):
-                maplist[i]=[indi for indi in individ[strt:comm.Get_size()+strt]]
-                strt+=comm.Get_size()
-            for i in range(nadd):
-                maplist[len(maplist)-1].append(None)
-        else:
-            ntimes=None
-        ntimes = comm.bcast(ntimes,root=0)
-        outs=[]
-
-        for i in range(ntimes):
-            if rank==0:
-                one=maplist[i]
-            else:
-                one=None
-            ind = comm.scatter(one,root=0)
-
-            if ind == None:
-                rank = MPI.COMM_WORLD.Get_rank()
-                stro = 'Evaluated none individual on {0}\n'.format(rank)
-                out = (None, stro)
-            else:
-                out = self.evaluate_indiv(Optimizer, ind, rank, relax)
+        return work_queue(individ, self.evaluate_indiv, Optimizer, relax)
 
-            outt = comm.gather(out,root=0)
-            if rank == 0:
-                outs.extend(outt)
-        return outs
-
-    def evaluate_indiv(self, Optimizer, individ, rank, relax):
+    def evaluate_indiv(self, Optimizer, individ, rank, relax=False):
 
         logger = logging.getLogger('by-rank')
         if relax:
@@ -106,24 +75,10 @@ class LAMMPS_eval(object):
 
         # Set calculator to use to get forces/energies
         if Optimizer.parallel:
-            calc = self.setup_lammps(Optimizer, self.args, relax)
-            if Optimizer.fixed_region:
-                if debug:
-                    logger.info('Setting up fixed region calculator')
-                pms=copy.deepcopy(calc.parameters)
-                try:
-                    pms['mass'][len(pms['mass'])-1] += '\ngroup RO id >= {0}\nfix freeze RO setforce 0.0 0.0 0.0\n'.format(nat)
-                except KeyError:
-                    pms['pair_coeff'][0] += '\ngroup RO id >= {0}\nfix freeze RO setforce 0.0 0.0 0.0\n'.format(nat)
-                calc = LAMMPS(parameters=pms, files=calc.files, keep_tmp_files=calc.keep_tmp_files, tmp_dir=calc.tmp_dir)
-                lmin = copy.copy(self.args['minimize'])
-                if debug:
-                    logger.info('Setting up no local minimization calculator')
-                self.args['minimize'] = None
-                self.args['static_calc'] = self.setup_lammps(Optimizer, self.args, relax)
-                self.args['minimize'] = lmin
+            calc, static_calc = self.get_calculators(Optimizer, relax)
         else:
-            calc=Optimizer.calc
+            calc = Optimizer.calc
+            static_calc = Optimizer.static_calc
         totalsol.set_calculator(calc)
         totalsol.set_pbc(True)
 
@@ -137,7 +92,7 @@ class LAMMPS_eval(object):
             if debug:
                 logger.info('Running local energy calculator')
             if Optimizer.fixed_region:
-                totalsol, pea, energy, pressure, volume, STR = self.run_energy_eval(totalsol, Optimizer.fixed_region, STR, self.args['static_calc'])
+                totalsol, pea, energy, pressure, volume, STR = self.run_energy_eval(totalsol, Optimizer.fixed_region, STR, static_calc)
             else:
                 totalsol, pea, energy, pressure, volume, STR = self.run_energy_eval(totalsol, False, STR)
                 logger.info('M:finish run_energy_eval, energy = {0} @ rank ={1}'.format(energy,rank))
@@ -146,15 +101,14 @@ class LAMMPS_eval(object):
             path = os.path.join(cwd,'TroubledLammps')
             if not os.path.exists(path):
                 os.mkdir(path)
-            #Copy files over
-            shutil.copyfile(calc.trajfile,
-                            os.path.join(path,os.path.basename(calc.trajfile)))
-            shutil.copyfile(calc.infile,
-                            os.path.join(path,os.path.basename(calc.infile)))
-            shutil.copyfile(calc.logfile,
-                            os.path.join(path,os.path.basename(calc.logfile)))
-            shutil.copyfile(calc.datafile,
-                            os.path.join(path,os.path.basename(calc.datafile)))
+            #Copy files over, the library calculator only keeps the input and log
+            for name in ['trajfile', 'infile', 'logfile', 'datafile']:
+                fname = getattr(calc, name, None)
+                if fname is not None and os.path.exists(fname):
+                    shutil.copyfile(fname, os.path.join(path,os.path.basename(fname)))
+            if Optimizer.parallel:
+                # The calculator may be left without its LAMMPS process or tmp directory
+                self.drop_calculators(relax)
             raise RuntimeError('{0}:{1}'.format(Exception,e))
         if not Optimizer.parallel:
             if debug:
@@ -187,7 +141,6 @@ class LAMMPS_eval(object):
             energy=(energy+factor)/totalsol.get_number_of_atoms()
             STR+='Energy with Chemical Potential = {0}\n'.format(energy)
 
-        individ.buli = bul
         individ.energy = energy
         individ.pressure = pressure
         individ.volume = volume
@@ -202,7 +155,6 @@ class LAMMPS_eval(object):
                 logger.info('Identifying fingerprint of new structure')
             individ.fingerprint=get_fingerprint(Optimizer,individ,Optimizer.fpbin,Optimizer.fpcutoff)
 
-        calc.clean()
         if relax:
             signal = 'Relaxed structure of individual {0} on {1}\n'.format(individ.index,rank)
         else:
@@ -220,14 +172,59 @@ class LAMMPS_eval(object):
             return individ.energy, signal
 
     def setup_lammps(self, Optimizer, args, relax):
-        return setup_energy_calculator(Optimizer,'LAMMPS',relax)
+        return setup_energy_calculator(Optimizer,'LAMMPS',relax,args)
+
+    def get_calculators(self, Optimizer, relax):
+        """Returns the (calc, static_calc) pair of this rank for relax in
+        parallel runs. The calculators are created on first use and kept for
+        the whole run, so the tmp directory and potential files are only set up
+        once per rank. An entry whose tmp directory was removed, as LAMMPS.run
+        does when it fails to start, is created again. static_calc is None
+        unless Optimizer.fixed_region is set."""
+        if relax in self.calculators:
+            if all([c is None or os.path.isdir(c.tmp_dir) for c in self.calculators[relax]]):
+                return self.calculators[relax]
+            self.drop_calculators(relax)
+        logger = logging.getLogger('by-rank')
+        logger.info('Setting up LAMMPS calculator pool entry for relax = {0}'.format(relax))
+        calc = self.setup_lammps(Optimizer, self.args, relax)
+        static_calc = None
+        if Optimizer.fixed_region:
+            nat = sum([c for sym, c, m, mu in Optimizer.atomlist])
+            pms = copy.deepcopy(calc.parameters)
+            try:
+                pms['mass'][len(pms['mass'])-1] += '\ngroup RO id >= {0}\nfix freeze RO setforce 0.0 0.0 0.0\n'.format(nat)
+            except KeyError:
+                pms['pair_coeff'][0] += '\ngroup RO id >= {0}\nfix freeze RO setforce 0.0 0.0 0.0\n'.format(nat)
+            calc.parameters = pms
+            # No local minimization for the static calculator
+            args = copy.copy(self.args)
+            args['minimize'] = None
+            static_calc = self.setup_lammps(Optimizer, args, relax)
+        self.calculators[relax] = (calc, static_calc)
+        return self.calculators[relax]
+
+    def drop_calculators(self, relax):
+        """Shuts down the calculators pooled for relax and removes their tmp
+        directories if they are still there"""
+        for calc in self.calculators.pop(relax, ()):
+            if calc is None:
+                continue
+            if os.path.isdir(calc.tmp_dir):
+                calc.clean()
+            else:
+                calc._lmp_end()
 
+    def clean_calculators(self):
+        """Shuts down the pooled calculators and removes their tmp directories"""
+        for relax in list(self.calculators):
+            self.drop_calculators(relax)
 
     def update_parameters(self, **kwargs):
-        # TODO
-        #self.args['pair_coeff'] = 'eam'
         for key, value in kwargs.items():
             self.args[key] = value
+        # Rebuild the calculators with the new settings on next use
+        self.clean_calculators()
 
 
     def sort_pealist(self, Optimizer,individ,pea):
@@ -1,16 +1,23 @@
+import os
 import json
 import random
+from StructOpt.tools.work_queue import work_queue
 
 
 class Random_eval(object):
+    """Fitness module giving every individual a random fitness, for driving
+    the algorithm without an energy code. Reads the seed from inputs.json in
+    the working directory if it exists."""
     def __init__(self):
         self.step_number = 0
 
         self.args = self.read_inputs()
-        random.seed(self.args.get('seed', None))
+        self.random = random.Random(self.args.get('seed', None))
 
 
     def read_inputs(self):
+        if not os.path.exists('inputs.json'):
+            return {}
         args = json.load(open('inputs.json'))
         return args
 
@@ -21,5 +28,10 @@ class Random_eval(object):
             self.args[key] = value
 
 
-    def evaluate_fitness(self, individuals):
-        return [random.random() for _ in individuals]
+    def evaluate_fitness(self, Optimizer, individ):
+        return work_queue(individ, self.evaluate_indiv, Optimizer)
+
+
+    def evaluate_indiv(self, Optimizer, individ, rank):
+        fitness = self.random.random()
+        return fitness, 'Evaluated individual {0} on {1}\n'.format(individ.index, rank)
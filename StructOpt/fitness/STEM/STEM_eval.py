@@ -13,7 +13,11 @@ from PIL import Image, ImageChops
 from ase.io import write
 from ase import Atom, Atoms
 import StructOpt.fileio
-from StructOpt.tools.eval_energy import eval_energy
+try:
+    from StructOpt.tools.eval_energy import eval_energy
+except ImportError:
+    pass
+from StructOpt.tools.work_queue import work_queue
 import scipy.interpolate
 import scipy.special
 import scipy.misc
@@ -33,6 +37,21 @@ class STEM_eval(object):
         self.args = self.read_inputs()
         for k,v in self.args.items():
             setattr(self,k,v)
+        # Inputs that stay the same for the whole run are prepared once:
+        # the PSF spectrum, the reference image and its mask of valid pixels
+        self.rfft = self.args.get('rfft', False)
+        self.psf_spectrum = self.fft(self.psf)
+        self.expfun = self.calculate_simp_function(self.stemref2image(str(self.stem_ref)))
+        self.expmask = self.expfun > -1000
+        # Spectrum of the valid reference pixels for the phase correlation alignment
+        self.expspectrum = numpy.fft.fft2(numpy.where(self.expmask, self.expfun, 0.0))
+        # Largest alignment shift in Angstroms, the extent of the old 3x3 shift grid by default
+        self.max_pixelshift = self.args.get('max_pixelshift', 0.5993457/2)
+        # Step in degrees of the search over rotations about z, 0 to turn it off
+        self.rotation_step = self.args.get('rotation_step', 0)
+        # Score whole populations on rank 0 in stacks of batch_size images
+        self.batch = self.args.get('batch', False)
+        self.batch_size = self.args.get('batch_size', 64)
 
     def read_inputs(self):
         args = json.load(open('stem_inp.json'))
@@ -42,40 +61,38 @@ class STEM_eval(object):
         return args
 
     def evaluate_fitness(self, Optimizer, individ):
-        comm = MPI.COMM_WORLD
-        rank = MPI.COMM_WORLD.Get_rank()
-
-        if rank==0:
-            ntimes=int(math.ceil(1.*len(individ)/comm.Get_size()))
-            nadd=int(ntimes*comm.Get_size()-len(individ))
-            maplist=[[] for n in range(ntimes)]
-            strt=0
-            for i in range(len(maplist)):
-                maplist[i]=[indi for indi in individ[strt:comm.Get_size()+strt]]
-                strt+=comm.Get_size()
-            for i in range(nadd):
-                maplist[len(maplist)-1].append(None)
-        else:
-            ntimes=None
-        ntimes = comm.bcast(ntimes,root=0)
-        outs=[]
-        for i in range(ntimes):
-            if rank==0:
-                one=maplist[i]
-            else:
-                one=None
-            ind = comm.scatter(one,root=0)
+        if self.batch:
+            return self.evaluate_batch(Optimizer, individ)
+        return work_queue(individ, self.evaluate_indiv, Optimizer)
+
+    def evaluate_batch(self, Optimizer, individ):
+        """Evaluates all individuals on rank 0, simulating and scoring
+        batch_size images at a time as one stack.
+        Outputs:
+            outs = list of (chisq, signal) in the order of individ on rank 0,
+                empty list on all other ranks
+        """
+        try:
+            rank = getattr(Optimizer, 'comm', MPI.COMM_WORLD).Get_rank()
+        except:
+            rank = 0
+        if rank != 0:
+            return []
 
-            if ind == None:
-                rank = MPI.COMM_WORLD.Get_rank()
-                stro = 'Evaluated none individual on {0}\n'.format(rank)
-                out = (None, stro)
+        logger = logging.getLogger('by-rank')
+        outs = []
+        for start in range(0, len(individ), self.batch_size):
+            batch = individ[start:start+self.batch_size]
+            logger.info('Received {0} individuals for batched STEM evaluation'.format(len(batch)))
+            atms_list = [ind[0] for ind in batch]
+            if self.pixelshift == True or self.rotation_step:
+                chisqs = [chisq for chisq, angle, shift in self.get_aligned_chisqs(atms_list)]
             else:
-                out = self.evaluate_indiv(Optimizer, ind, rank)
-
-            outt = comm.gather(out,root=0)
-            if rank == 0:
-                outs.extend(outt)
+                simstack = self.get_images(self.psf, atms_list, self.slice_size, self.pixels)
+                chisqs = self.compare_stack(self.expfun, self.resize_to_grid(simstack))
+            for ind, chisq in zip(batch, chisqs):
+                logger.info('M:finish chi2 evaluation, chi2 = {0} @ rank ={1}'.format(chisq,rank))
+                outs.append((chisq, 'Evaluated individual {0} on {1}\n'.format(ind.index,rank)))
         return outs
 
     def evaluate_indiv(self, Optimizer, individ, rank):
@@ -85,41 +102,38 @@ class STEM_eval(object):
         logger.info('Received individual HI = {0} for STEM evaluation'.format(
             individ.history_index))
         atms = individ[0]
-        expfun = self.calculate_simp_function(self.stemref2image(str(self.stem_ref)))
+        expfun = self.expfun
         #Get the image from ConvStem
-        try:
-           Grid_sim2exp = self.grid_sim2exp
-        except:
-           Grid_sim2exp = 1
-        if self.pixelshift == True:
-            points = [-0.5993457/2,0,0.5993457/2]
-            chisq = []
-            for x in points:
-                for y in points:
-                    pixelshift = [x,y,0]
-                    simfun=self.get_image(self.psf,atms,self.slice_size,self.pixels,pixelshift)
-                    simfun_resize = simfun
-                    chisq.append(self.compare_functions(expfun,simfun_resize))
-            return min(chisq)
-
+        if self.pixelshift == True or self.rotation_step:
+            chisq, angle, shift = self.get_aligned_chisq(atms)
+            logger.info('Best alignment of HI = {0}: rotation = {1} degrees, shift = {2} Angstroms'.format(
+                individ.history_index, angle, shift))
         else:
             simfun=self.get_image(self.psf,atms,self.slice_size,self.pixels)
-            if Grid_sim2exp > 1:
-                 #simfun_resize = numpy.zeros([150,150],dtype=float)       
-                simfun_resize = numpy.zeros([self.pixels,self.pixels],dtype=float)
-                for x in range(len(simfun)):
-                    for y in range(len(simfun[0])):
-                        simfun_resize[x/Grid_sim2exp][y/Grid_sim2exp]+=simfun[x][y]
-                simfun_resize /= 0.5993457**2
-                simfun_resize *= 0.12**2
-            else:
-                simfun_resize = simfun
+            simfun_resize = self.resize_to_grid(simfun)
 
             chisq=self.compare_functions(expfun,simfun_resize)
         logger.info('M:finish chi2 evaluation, chi2 = {0} @ rank ={1}'.format(chisq,rank))
         signal = 'Evaluated individual {0} on {1}\n'.format(individ.index,rank)
         return chisq, signal
 
+    def resize_to_grid(self, simfun):
+        """Sums each grid_sim2exp x grid_sim2exp block of pixels of a simulated
+        image, or of each image of a stack, into one pixel of the experimental
+        grid and rescales it by the ratio of the pixel areas. Images are
+        returned unchanged when grid_sim2exp is not above 1."""
+        Grid_sim2exp = getattr(self, 'grid_sim2exp', 1)
+        if Grid_sim2exp <= 1:
+            return simfun
+        simfun = numpy.asarray(simfun)
+        rows = numpy.arange(simfun.shape[-2])//Grid_sim2exp
+        cols = numpy.arange(simfun.shape[-1])//Grid_sim2exp
+        simfun_resize = numpy.zeros(simfun.shape[:-2] + (self.pixels,self.pixels), dtype=float)
+        numpy.add.at(simfun_resize, (Ellipsis, rows[:,None], cols[None,:]), simfun)
+        simfun_resize /= 0.5993457**2
+        simfun_resize *= 0.12**2
+        return simfun_resize
+
     def calculate_simp_function(self,image):
         return image
 
@@ -179,22 +193,109 @@ class STEM_eval(object):
         return gfuntot
 
     def compare_functions(self, expfun, simfun):
-        """Function compares two matrices and calculates chisq.  Matrices must be same size"""
-        try:
-          Grid_sim2exp = self.grid_sim2exp
-        except:
-          Grid_sim2exp = 1
-        #if self.args['Pixelshift'] == True:
-        chisq = 0.0
-        for i in range(len(expfun)):
-              for j in range(len(expfun[0])):
-                 if expfun[i][j] > -1000:
-                    chisq +=(simfun[i][j]-expfun[i][j])**2
-        #else:
-        #   chisq = abs(sum(sum((simfun-expfun)**2)))
+        """Function compares two matrices and calculates chisq.  Matrices must be same size.
+        Pixels of expfun at or below -1000 are excluded."""
+        mask = self.get_mask(expfun)
+        chisq = numpy.sum((simfun - expfun)[mask]**2)
         chisq = chisq/len(simfun)/len(simfun[0])
         return chisq
 
+    def get_mask(self, expfun):
+        """Returns the mask of the pixels of expfun above -1000, the mask
+        prepared in __init__ if expfun is the reference image"""
+        if expfun is getattr(self, 'expfun', None):
+            return self.expmask
+        return expfun > -1000
+
+    def compare_stack(self, expfun, simstack):
+        """Returns the chisq of expfun with each image of the stack simstack,
+        as compare_functions does for a single image"""
+        mask = self.get_mask(expfun)
+        chisqs = numpy.sum(((simstack - expfun)*mask)**2, axis=(-2,-1))
+        return chisqs/simstack.shape[-2]/simstack.shape[-1]
+
+    def get_aligned_chisq(self, atms):
+        """Returns the lowest chisq of atms against the reference image over the
+        rotations about z given by rotation_step, each image aligned to the
+        reference by phase correlation if pixelshift is set.
+        Outputs:
+            chisq = lowest chisq
+            angle = rotation in degrees giving chisq
+            shift = [x, y] shift in Angstroms giving chisq
+        """
+        return self.get_aligned_chisqs([atms])[0]
+
+    def get_aligned_chisqs(self, atms_list):
+        """get_aligned_chisq for a list of structures, simulated as one stack per rotation"""
+        if self.rotation_step:
+            angles = numpy.arange(0.0, 360.0, self.rotation_step)
+        else:
+            angles = [0.0]
+        best = [None for atms in atms_list]
+        for angle in angles:
+            rotated = [self.rotate_atoms(atms, angle) for atms in atms_list]
+            simstack = self.get_images(self.psf, rotated, self.slice_size, self.pixels)
+            shifts = numpy.zeros((len(atms_list), 2))
+            if self.pixelshift == True:
+                for i, simfun in enumerate(simstack):
+                    simstack[i], shifts[i] = self.align_image(simfun)
+            chisqs = self.compare_stack(self.expfun, simstack)
+            for i, chisq in enumerate(chisqs):
+                if best[i] is None or chisq < best[i][0]:
+                    best[i] = (chisq, angle, list(shifts[i]*self.slice_size/self.pixels))
+        return best
+
+    def align_image(self, simfun, upsample=20):
+        """Shifts simfun onto the reference image with sub-pixel resolution.
+        The shift is the peak of the phase correlation of the two images within
+        max_pixelshift, refined to 1/upsample of a pixel by evaluating the
+        correlation on a finer grid around the peak, and is applied with the
+        Fourier shift theorem.
+        Outputs:
+            shifted = shifted simulated image
+            shift = shift in pixels along both axes
+        """
+        simspectrum = numpy.fft.fft2(simfun)
+        cross = self.expspectrum*simspectrum.conj()
+        cross /= numpy.maximum(numpy.abs(cross), 1e-12)
+        corr = numpy.fft.ifft2(cross).real
+
+        # Pixel shift of each point of corr, wrapped to [-n/2, n/2)
+        k0 = numpy.fft.fftfreq(corr.shape[0])
+        k1 = numpy.fft.fftfreq(corr.shape[1])
+        s0 = k0*corr.shape[0]
+        s1 = k1*corr.shape[1]
+        maxshift = max(self.max_pixelshift*self.pixels/self.slice_size, 0.5)
+        window = (numpy.abs(s0)[:,numpy.newaxis] <= maxshift) & (numpy.abs(s1)[numpy.newaxis,:] <= maxshift)
+        i, j = numpy.unravel_index(numpy.argmax(numpy.where(window, corr, -numpy.inf)), corr.shape)
+
+        # Correlation within a pixel of the peak on a grid refined by upsample
+        offsets = numpy.arange(-upsample, upsample+1)/float(upsample)
+        p0 = numpy.clip(s0[i] + offsets, -maxshift, maxshift)
+        p1 = numpy.clip(s1[j] + offsets, -maxshift, maxshift)
+        e0 = numpy.exp(2j*math.pi*numpy.outer(p0, k0))
+        e1 = numpy.exp(2j*math.pi*numpy.outer(k1, p1))
+        fine = numpy.dot(numpy.dot(e0, cross), e1).real
+        fi, fj = numpy.unravel_index(numpy.argmax(fine), fine.shape)
+        shift = numpy.array([p0[fi], p1[fj]])
+
+        phase = numpy.exp(-2j*math.pi*(k0[:,numpy.newaxis]*shift[0] + k1[numpy.newaxis,:]*shift[1]))
+        shifted = numpy.fft.ifft2(simspectrum*phase).real
+        return shifted, shift
+
+    def rotate_atoms(self, atms, angle):
+        """Returns a copy of atms rotated by angle degrees about z through the center of mass"""
+        if angle == 0:
+            return atms
+        atms = atms.copy()
+        com = atms.get_center_of_mass()
+        theta = math.radians(angle)
+        rot = numpy.array([[math.cos(theta), -math.sin(theta), 0.0],
+                           [math.sin(theta), math.cos(theta), 0.0],
+                           [0.0, 0.0, 1.0]])
+        atms.set_positions(numpy.dot(atms.get_positions() - com, rot.T) + com)
+        return atms
+
     def stemref2image(self,stemref):
         if stemref.split('/')[-1].endswith('xyz'): # xyz coordinates mean a phantom
             atoms_ref = StructOpt.fileio.read_xyz(stemref,0)
@@ -231,22 +332,44 @@ class STEM_eval(object):
         rmax=Size of slice in Angstoms
         nx=number of pixels in slice"""
 
-        try:
-            rank = MPI.COMM_WORLD.Get_rank()
-        except:
-            rank = 0
+        pot = self.stempot(rmax,rmax,len(psf),len(psf[0]),atms,pixelshift,scalefactor)
 
-        psf2d = numpy.fft.fft2(psf)
+        potm = self.fft(pot)*self.get_psf_spectrum(psf)
 
-        pot = self.stempot(rmax,rmax,len(psf),len(psf[0]),atms,pixelshift,scalefactor)
+        zcon_im = self.ifft(potm, pot.shape)
 
-        potft = numpy.fft.fft2(pot)
+        return zcon_im
 
-        potm = potft*psf2d
+    def get_psf_spectrum(self, psf):
+        """Returns the Fourier transform of psf, reusing the one prepared at
+        construction for the PSF of the run"""
+        if psf is self.psf:
+            return self.psf_spectrum
+        return self.fft(psf)
+
+    def fft(self, image):
+        """Fourier transform of a real image, using the real FFT if rfft is set"""
+        if self.rfft:
+            return numpy.fft.rfft2(image)
+        return numpy.fft.fft2(image)
+
+    def ifft(self, spectrum, shape):
+        """Real image of shape shape from a spectrum returned by fft. Both work
+        on the last two axes, so stacks of images are transformed in one call."""
+        if self.rfft:
+            return numpy.fft.irfft2(spectrum, s=shape[-2:])
+        return numpy.fft.ifft2(spectrum).real
+
+    def get_images(self, psf, atms_list, rmax, nx):
+        """Function to get the images of a list of structures as one stack
+        with a single batched FFT convolution with the point spread function
+        rmax=Size of slice in Angstoms
+        nx=number of pixels in slice"""
+        pots = numpy.array([self.stempot(rmax,rmax,len(psf),len(psf[0]),atms,[0,0,0],1.0) for atms in atms_list])
 
-        zcon_im = numpy.fft.ifft2(potm,axes=(0,1)).real
+        potm = self.fft(pots)*self.get_psf_spectrum(psf)
 
-        return zcon_im
+        return self.ifft(potm, pots.shape)
 
     def get_atom_pos(self, data):
         """Function to identify the location of the atom columns
@@ -345,39 +468,22 @@ class STEM_eval(object):
         return psf2D
 
     def STEMPSF2DCoh(self, aber, keV, ap, nk,rmax):
+        nk = int(nk)
         kmax = 0.001*ap / self.wavlen(keV)
         phase = self.ChiPhase2D(aber, keV, ap, nk/10)
         xp=numpy.linspace(-kmax*2.0,(kmax*2.0),nk/10)
         yp=numpy.linspace(-kmax*2.0,(kmax*2.0),nk/10)
         phasef = scipy.interpolate.RectBivariateSpline(xp,yp,phase)
-        #print "M:kmax",kmax
-        #print phasef
 
         kbound = nk/4.0/(rmax/2.0)
-        # need to pad the phase with zeros here.
-        probe2DCoh = numpy.zeros((nk,nk),dtype=complex)
+        # Phase inside the objective aperture, padded with zeros outside
         x=numpy.linspace(-kbound,kbound,nk)
         y=numpy.linspace(-kbound,kbound,nk)
+        aperture = (x[:,numpy.newaxis]**2 + y[numpy.newaxis,:]**2) < kmax**2
+        probe2DCoh = numpy.where(aperture, 1.0 + 1.0j*phasef(x,y), 0.0)
 
-        #SetScale/I x -20*kmax, 40*kmax, "", probe2DCoh
-        #SetScale/I y -20*kmax, 40*kmax, "", probe2DCoh
-        for i in range(len(x)):
-            for j in range(len(y)):
-                if x[i]**2 + y[j]**2 < kmax**2:
-                    probe2DCoh[i][j] = complex(1, phasef(x[i],y[j]))
-                else:
-                    probe2DCoh[i][j] = complex(0, 0)
-        #probe2DCoh = ( (x^2 + y^2 < kmax^2) ?  p2rect(cmplx(1, phase(x)(y)))  : cmplx(0, 0))
-
-        p2dcf = numpy.fft.fft2(probe2DCoh)
-        for i in range(len(x)):
-            for j in range(len(y)):
-                probe2DCoh[i][j] = complex((abs(p2dcf[i][j]))**2, 0)
-        probe2DCoh = numpy.real(probe2DCoh)
-        #print "M:probe2DCoh" 
-        #print probe2DCoh[0]
-        #print "M:sum:probe2DCoh",sum(sum(probe2DCoh)) 
-        probe2DCoh /= sum(sum(probe2DCoh))
+        probe2DCoh = numpy.abs(numpy.fft.fft2(probe2DCoh))**2
+        probe2DCoh /= numpy.sum(probe2DCoh)
         return probe2DCoh
 
     def STEMPSF2DIncoh(self, aber, keV, Cc, dE, ds, ap, nk, rmax):
@@ -392,13 +498,9 @@ class STEM_eval(object):
             #print aber_step
             probe2DCoh = self.STEMPSF2DCoh(aber, keV, ap, nk, rmax)
             if i==0:
-               # probe2DIncoh = copy.deepcopy(probe2DCoh)
-                probe2DIncoh = numpy.copy(probe2DCoh)
-                probe2DIncoh *= defocus_distribution[0]
+                probe2DIncoh = defocus_distribution[0]*probe2DCoh
             else:
-                for j in range(len(probe2DIncoh)):
-                    for k in range(len(probe2DIncoh[0])):
-                        probe2DIncoh[j][k] += defocus_distribution[i]*probe2DCoh[j][k]
+                probe2DIncoh += defocus_distribution[i]*probe2DCoh
             #print i
             #print probe2DIncoh
 
@@ -423,12 +525,8 @@ class STEM_eval(object):
             #xs = numpy.linspace(leftend, rightend, num=len(probe2DSS))
             #print 'len',len(probe2DSS),xs[0],xs[1],xs[len(probe2DSS)-1]
             #print 'Gauss',xs[124],Gauss2D(xs[124],0.0,fds,xs[124],0.0,fds)
-            Gaussfunction = numpy.zeros((nk,nk),dtype=complex)
-            for j in range(len(probe2DSS)):
-                    for k in range(len(probe2DSS[0])):
-                        Gaussfunction[j][k]=complex(self.Gauss2D(xs[j],0.0,fds,xs[k],0.0,fds),0.0)
-                       # if Gaussfunction[j][k] > 0.1:
-                      #     print j,k, Gaussfunction[j][k]
+            gauss = numpy.exp(-0.5*(xs/fds)**2)/(fds*(2.0*math.pi)**0.5)
+            Gaussfunction = numpy.outer(gauss, gauss).astype(complex)
             #probe2DSS *= complex(Gauss(x, 0.0, fds, y, 0.0, fds), 0.0)
             Gaussft = numpy.fft.fft2(Gaussfunction)
             probe2DSS *= Gaussft
@@ -450,34 +548,33 @@ class STEM_eval(object):
         kmax = (0.001*ap / wl)  # maximum k through aperture
         x=numpy.linspace(-kmax*2.0,(kmax*2.0),nk)
         y=numpy.linspace(-kmax*2.0,(kmax*2.0),nk)
-        astack = [numpy.zeros((len(x),len(y))) for one in range(12)]
+        X, Y = numpy.meshgrid(x, y, indexing='ij')
         # Evaluate the phase shifts from the various aberrations
-        for i in range(len(x)):
-            for j in range(len(y)):
-                #C1, defocus
-                astack[0][i][j] = (1.0/2.0)*wl*aber[0][0]*(x[i]**2.0 + y[j]**2.0)
-                #A1, 2-fold astigmatism
-                astack[1][i][j] = (1.0/2.0)*wl*aber[1][0]*(x[i]**2.0 - y[j]**2.0)
-                #A2, 3-fold astigmatism
-                astack[2][i][j] = (1.0/3.0)*wl**2.0*aber[2][0]*(x[i]**3.0 - 3.0*x[i]*y[j]**2.0)
-                #B2, axial coma
-                astack[3][i][j] = wl**2.0*aber[3][0]*(x[i]**3.0 + x[i]*y[j]**2.0)
-                #C3, primary spherical aberration
-                astack[4][i][j] = (1.0/4.0)*wl**3.0*aber[4][0]*(x[i]**4.0 + 2.0*x[i]**2.0*y[j]**2.0 + y[j]**4.0)
-                #A3, 4-fold astigmatism
-                astack[5][i][j] = (1.0/4.0)*wl**3.0*aber[5][0]*(x[i]**4.0 - 6.0*x[i]**2.0*y[j]**2.0 + y[j]**4.0)
-                #S3, star aberration
-                astack[6][i][j] = wl**3.0*aber[6][0]*(x[i]**4.0 - y[j]**4.0)
-                #A4, 5-fold astigmatism
-                astack[7][i][j] = (1.0/5.0)*wl**4.0*aber[7][0]*(x[i]**5.0 - 10.0*x[i]**3.0*y[j]**2.0 + 5.0*x[i]*y[j]**4.0)
-                #D4, 3-lobe aberration
-                astack[8][i][j] = wl**4.0*aber[8][0]*(x[i]**5.0 - 2.0*x[i]**3.0*y[j]**2.0 - 3.0*x[i]*y[j]**4.0)
-                #B4, axial coma
-                astack[9][i][j] = wl**4.0*aber[9][0]*(x[i]**5.0 + 2.0*x[i]**3.0*y[j]**2.0 + x[i]*y[j]**4.0)
-                #C5, 5th order spherical aberration
-                astack[10][i][j] = (1.0/6.0)*wl**5.0*aber[10][0]*(x[i]**6.0 + 3.0*x[i]**4.0*y[j]**2.0 + 3.0*x[i]**2.0*y[j]**4.0 + y[j]**6.0)
-                #A5, 5th order spherical aberration
-                astack[11][i][j] = (1.0/6.0)*wl**5.0*aber[11][0]*(x[i]**6.0 - 15.0*x[i]**4.0*y[j]**2.0 + 15.0*x[i]**2.0*y[j]**4.0 - y[j]**6.0)
+        astack = [
+            #C1, defocus
+            (1.0/2.0)*wl*aber[0][0]*(X**2.0 + Y**2.0),
+            #A1, 2-fold astigmatism
+            (1.0/2.0)*wl*aber[1][0]*(X**2.0 - Y**2.0),
+            #A2, 3-fold astigmatism
+            (1.0/3.0)*wl**2.0*aber[2][0]*(X**3.0 - 3.0*X*Y**2.0),
+            #B2, axial coma
+            wl**2.0*aber[3][0]*(X**3.0 + X*Y**2.0),
+            #C3, primary spherical aberration
+            (1.0/4.0)*wl**3.0*aber[4][0]*(X**4.0 + 2.0*X**2.0*Y**2.0 + Y**4.0),
+            #A3, 4-fold astigmatism
+            (1.0/4.0)*wl**3.0*aber[5][0]*(X**4.0 - 6.0*X**2.0*Y**2.0 + Y**4.0),
+            #S3, star aberration
+            wl**3.0*aber[6][0]*(X**4.0 - Y**4.0),
+            #A4, 5-fold astigmatism
+            (1.0/5.0)*wl**4.0*aber[7][0]*(X**5.0 - 10.0*X**3.0*Y**2.0 + 5.0*X*Y**4.0),
+            #D4, 3-lobe aberration
+            wl**4.0*aber[8][0]*(X**5.0 - 2.0*X**3.0*Y**2.0 - 3.0*X*Y**4.0),
+            #B4, axial coma
+            wl**4.0*aber[9][0]*(X**5.0 + 2.0*X**3.0*Y**2.0 + X*Y**4.0),
+            #C5, 5th order spherical aberration
+            (1.0/6.0)*wl**5.0*aber[10][0]*(X**6.0 + 3.0*X**4.0*Y**2.0 + 3.0*X**2.0*Y**4.0 + Y**6.0),
+            #A5, 5th order spherical aberration
+            (1.0/6.0)*wl**5.0*aber[11][0]*(X**6.0 - 15.0*X**4.0*Y**2.0 + 15.0*X**2.0*Y**4.0 - Y**6.0)]
 
         #Set minimum to zero
         #nnastack = [numpy.zeros((len(x),len(y))) for one in range(12)] 
@@ -507,10 +604,7 @@ class STEM_eval(object):
            # print astack[i][0]
 
         # sum all the aberration contributions
-        fsum = numpy.zeros((len(x),len(y)))
-        for i in range(len(x)):
-            for j in range(len(y)):
-                fsum[i][j] = sum([one[i][j] for one in astack])*2*math.pi
+        fsum = numpy.sum(astack, axis=0)*2*math.pi
         #MatrixOp/O phase = 2*Pi*sumbeams(astack)
         #SetScale/I x -2*kmax, 2*kmax, "", phase
         #SetScale/I y -2*kmax, 2*kmax, "", phase
@@ -549,12 +643,8 @@ class STEM_eval(object):
         #zed=2 for rutherford scattering of the nucleus, less for screening
         zed = 1.7
 
-        ix = numpy.arange(1.0,nx)
-        iy = numpy.arange(1.0,ny)
         dx = xmax/nx
         dy = ymax/ny
-        rx = numpy.arange(0,xmax-dx,dx)
-        ry = numpy.arange(0,ymax-dy,dy)
 
         Zatom = atms.get_atomic_numbers()
         #translate atoms such that the center of mass is in the center of the computational cell
@@ -567,63 +657,31 @@ class STEM_eval(object):
         #com += pixelshift
         #print 'com+pixelshift',com
         cop = xmax/2.0
-        trans = [cop-i for i in com]
-        atms.translate(trans)
-        positions=atms.get_positions()
-        ax=[]
-        ay=[]
-        az=[]
-        for o,t,h in positions:
-            ax.append(o)
-            ay.append(t)
-            az.append(h)
-        ax = numpy.array(ax)
-        ay = numpy.array(ay)
-        az = numpy.array(az)
-        amax = len(Zatom)
-
-        #find boundaries of slice
-        axmin = min(ax)
-        axmax = max(ax)
-        aymin = min(ay)
-        aymax = max(ay)
-
-        V= numpy.zeros((nx,ny))
+        positions = atms.get_positions() + (cop - com)
+        ax = positions[:,0]
+        ay = positions[:,1]
 
         #map x and y coords of the atoms to the nearest grid points
         #A fraction of the atom must be assigned to the closest gridpoints
         #to avoid sum and difference frequencies appearing in the image
-        #grid point to the left of the atom
-        ix = numpy.array([math.floor(axi/dx) for axi in ax])
-        #apply periodic boundary conditions
-        iax = numpy.array([math.fmod(iaxi,nx) for iaxi in ix])
-        ibx = numpy.array([math.fmod(iaxi+1,nx) for iaxi in ix])
+        #grid point to the left of the atom, with periodic boundary conditions
+        ix = numpy.floor(ax/dx).astype(int)
+        iax = numpy.mod(ix, nx)
+        ibx = numpy.mod(ix+1, nx)
         #fraction of atom at iax
-        fax = numpy.array([1-math.fmod((axi/dx),1 ) for axi in ax])
-        #grid point above the atom
-        iy = numpy.array([math.floor(ayi/dy) for ayi in ay])
-        #apply periodic boundary conditions
-        iay = numpy.array([math.fmod(iayi,ny) for iayi in iy])
-        iby = numpy.array([math.fmod(iayi+1,ny) for iayi in iy])
-        #fraction of atom at iay 
-        fay = numpy.array([1-math.fmod((ayi/dy),1 ) for ayi in ay])
-        #Add each atom to the potential grid
-        V1 = numpy.array([fax[i] * fay[i] * (Zatom[i]**zed) for i in range(len(fax))])
-        V2 = numpy.array([(1-fax[i]) * fay[i] * (Zatom[i]**zed) for i in range(len(fax))])
-        V3 = numpy.array([fax[i] * (1-fay[i]) * (Zatom[i]**zed) for i in range(len(fax))])
-        V4 = numpy.array([(1-fax[i]) * (1-fay[i]) * (Zatom[i]**zed) for i in range(len(fax))])
-        #V1 = numpy.array([fax[i] * fay[i] * scalefactor for i in range(len(fax))])
-        #V2 = numpy.array([(1-fax[i]) * fay[i] * scalefactor for i in range(len(fax))])
-        #V3 = numpy.array([fax[i] * (1-fay[i]) * scalefactor for i in range(len(fax))])
-        #V4 = numpy.array([(1-fax[i]) * (1-fay[i]) * scalefactor for i in range(len(fax))])
-
-        for j in range(amax):
-           V[iax[j],iay[j]] += V1[j]
-           V[ibx[j],iay[j]] += V2[j]
-           V[iax[j],iby[j]] += V3[j]
-           V[ibx[j],iby[j]] += V4[j]
-        rev_trans = [-1.0*i for i in trans]
-        atms.translate(rev_trans)
+        fax = 1 - numpy.fmod(ax/dx, 1)
+        #grid point above the atom, with periodic boundary conditions
+        iy = numpy.floor(ay/dy).astype(int)
+        iay = numpy.mod(iy, ny)
+        iby = numpy.mod(iy+1, ny)
+        #fraction of atom at iay
+        fay = 1 - numpy.fmod(ay/dy, 1)
+
+        #Add each atom to the four surrounding grid points
+        Z = Zatom**zed
+        index = numpy.concatenate([iax*ny+iay, ibx*ny+iay, iax*ny+iby, ibx*ny+iby])
+        weights = numpy.concatenate([fax*fay*Z, (1-fax)*fay*Z, fax*(1-fay)*Z, (1-fax)*(1-fay)*Z])
+        V = numpy.bincount(index, weights=weights, minlength=nx*ny).reshape((nx,ny))
         return V
 
     def wavlen(self, keV):
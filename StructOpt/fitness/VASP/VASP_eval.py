@@ -62,21 +62,22 @@ class VASP_eval(object):
         return setup_energy_calculator(Optimizer,'VASP')
 
     def evaluate_fitness(self, Optimizer, individ, relax=False):
-        rank = MPI.COMM_WORLD.Get_rank()
+        rank = Optimizer.comm.Get_rank()
 
         if rank == 0:
             cwd = os.getcwd()
+            vaspfiles = '{filename}-rank{root}/VASPFiles'.format(filename=Optimizer.filename, root=Optimizer.island_root)
             try:
-                os.mkdir('{filename}-rank0/VASPFiles'.format(filename=Optimizer.filename))
+                os.mkdir(vaspfiles)
             except OSError:
                 pass
-            os.chdir('{filename}-rank0/VASPFiles'.format(filename=Optimizer.filename))
+            os.chdir(vaspfiles)
             out = self.evaluate_indiv(Optimizer, individ, relax)
             out = zip(*out)
             os.chdir(cwd)
         else:
             out = None
-        out = MPI.COMM_WORLD.bcast(out, root=0)
+        out = Optimizer.comm.bcast(out, root=0)
         return out
 
     def evaluate_indiv(self, Optimizer, individ, relax):
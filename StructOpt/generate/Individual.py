@@ -1,25 +1,68 @@
 import copy
 from ase import Atom, Atoms
 from StructOpt.fileio import write_individual
+from StructOpt.generate.structure_cache import structure_hash, descriptor_cache
+
+# Bulk regions shared copy-on-write between an individual and its duplicates
+SHARED_REGIONS = ['bulki', 'bulko', 'box', 'vacancies', 'swaps']
+
+def shared_region(name):
+    """Returns the property for the bulk region name of an Individual.
+    Regions are shared with duplicates until an individual takes the atoms
+    through the property, which is taken as an intent to modify them: the
+    first access after duplicate() gets a private copy, later ones don't.
+    Read-only code uses Individual.view instead."""
+    slot = '_' + name
+
+    def get(self):
+        if name not in self.owned:
+            setattr(self, slot, getattr(self, slot).copy())
+            self.owned.add(name)
+        return getattr(self, slot)
+
+    def set(self, atoms):
+        setattr(self, slot, atoms)
+        self.owned.add(name)
+
+    return property(get, set)
+
 
 class Individual(object):
-    """Defines class object individual for use in evolution"""
+    """Defines class object individual for use in evolution.
+    The attributes are kept in __slots__ and the structure is held directly
+    rather than in a list, individ[0] still returns it. The bulk regions in
+    SHARED_REGIONS are shared by duplicate until one of the individuals takes
+    them through the attribute to modify them, use view for read-only access."""
+
+    __slots__ = ['structure', 'fitness', 'index', 'history_index', 'energy', 'tenergymx',
+        'tenergymin', 'pressure', 'volume', 'force', 'purebulkenpa', 'natomsbulk',
+        'fingerprint', 'swaplist', 'predicted', 'descriptors', 'descriptor_key',
+        'hpealist', 'lpealist', 'owned'] + ['_' + name for name in SHARED_REGIONS]
+
+    bulki = shared_region('bulki')
+    bulko = shared_region('bulko')
+    box = shared_region('box')
+    vacancies = shared_region('vacancies')
+    swaps = shared_region('swaps')
 
     def __init__(self, data, fitness=0, index=0, history_index='0', energy=0, tenergymx=0,
-                tenergymin=0, bulki=Atoms(), bulko=Atoms(), box=Atoms(), pressure=0, volume=0,
+                tenergymin=0, bulki=None, bulko=None, box=None, pressure=0, volume=0,
                 force=0, purebulkenpa=0, natomsbulk=0, fingerprint=0, swaplist=None,
-                vacancies=Atoms(), swaps=Atoms()):
+                vacancies=None, swaps=None, predicted=False):
         if swaplist is None:
             swaplist = []
+        self.structure = data
+        # Bulk regions not shared with a duplicate
+        self.owned = set()
         self.fitness = fitness
         self.index = index
         self.history_index = history_index
         self.energy = energy
         self.tenergymx = tenergymx
         self.tenergymin = tenergymin
-        self.bulki = bulki
-        self.bulko = bulko
-        self.box = box
+        self.bulki = Atoms() if bulki is None else bulki
+        self.bulko = Atoms() if bulko is None else bulko
+        self.box = Atoms() if box is None else box
         self.pressure = pressure
         self.volume = volume
         self.force = force
@@ -27,61 +70,95 @@ class Individual(object):
         self.natomsbulk = natomsbulk
         self.fingerprint = fingerprint
         self.swaplist = swaplist
-        self.vacancies = vacancies
-        self.swaps = swaps
-        self.data = [data]
+        self.vacancies = Atoms() if vacancies is None else vacancies
+        self.swaps = Atoms() if swaps is None else swaps
+        # True if the fitness was predicted by the surrogate model instead of evaluated
+        self.predicted = predicted
+        # Descriptors of the structure with hash descriptor_key, see get_descriptor
+        self.descriptors = {}
+        self.descriptor_key = None
 
     def __getitem__(self, i):
-        return self.data[i]
+        if i not in (0, -1):
+            raise IndexError('Individual only holds structure 0', i)
+        return self.structure
 
     def __setitem__(self, key, item):
-        self.data[key] = item
+        if key not in (0, -1):
+            raise IndexError('Individual only holds structure 0', key)
+        self.structure = item
+        # New structure, the stored descriptors no longer apply
+        self.descriptors = {}
+        self.descriptor_key = None
+
+    def __len__(self):
+        return 1
 
-    def __iter__(self):
-        return self
+    def len(self):
+        return 1
 
     def __copy__(self):
-        self.data = copy.copy(self.data)
-        return self.data
+        return self.duplicate()
 
-    def __deepcopy__(self):
-        self.data = copy.deepcopy(self.data)
-        return self.data
+    def __deepcopy__(self, memo):
+        return self.duplicate()
 
-    def __setattr__(self, attr, value):
-        super(Individual, self).__setattr__(attr, value)
+    def __getstate__(self):
+        # Duplicates pickled together keep sharing their regions
+        return dict((name, getattr(self, name)) for name in self.__slots__
+            if hasattr(self, name))
 
-    def next(self):
-        if self.index > len(self.data):
-            raise StopIteration
-        self.index = self.index+1
-        return self.data[self.index]
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
 
-    def len(self):
-        return len(self.data)
+    def view(self, name):
+        """Returns the bulk region name without taking a private copy when it
+        is shared, the returned atoms must not be modified"""
+        return getattr(self, '_' + name)
+
+    def get_descriptor(self, name, function, *args, **kwargs):
+        """Returns the structural descriptor name of the individual, calling
+        function(*args, **kwargs) only if neither the individual nor the shared
+        descriptor_cache holds it for the current structure hash"""
+        key = structure_hash(self)
+        if key != self.descriptor_key:
+            self.descriptors = {}
+            self.descriptor_key = key
+        if name not in self.descriptors:
+            value = descriptor_cache.get((key, name))
+            if value is None:
+                value = function(*args, **kwargs)
+                descriptor_cache.set((key, name), value)
+            self.descriptors[name] = value
+        return self.descriptors[name]
 
     def duplicate(offspring):
-        """Duplicates individual"""
-
-        dupli = offspring[0].copy()
-        dup = Individual(dupli)
-        dup.fitness = copy.copy(offspring.fitness)
-        dup.index = copy.copy(offspring.index)
-        dup.history_index = copy.copy(offspring.history_index)
-        dup.energy = copy.copy(offspring.energy)
-        dup.tenergymx = copy.copy(offspring.tenergymx)
-        dup.tenergymin = copy.copy(offspring.tenergymin)
-        dup.bulki = offspring.bulki.copy()
-        dup.bulko = offspring.bulko.copy()
-        dup.box = offspring.box.copy()
-        dup.pressure = copy.copy(offspring.pressure)
-        dup.volume = copy.copy(offspring.volume)
-        dup.force = copy.copy(offspring.force)
-        dup.purebulkenpa = copy.copy(offspring.purebulkenpa)
-        dup.natomsbulk = copy.copy(offspring.natomsbulk)
+        """Duplicates individual. The bulk regions are shared with the
+        duplicate and each individual copies them on its first access through
+        the attribute."""
+
+        dup = Individual.__new__(Individual)
+        dup.structure = offspring.structure.copy()
+        dup.fitness = offspring.fitness
+        dup.index = offspring.index
+        dup.history_index = offspring.history_index
+        dup.energy = offspring.energy
+        dup.tenergymx = offspring.tenergymx
+        dup.tenergymin = offspring.tenergymin
+        for name in SHARED_REGIONS:
+            setattr(dup, '_' + name, getattr(offspring, '_' + name))
+        dup.owned = set()
+        offspring.owned = set()
+        dup.pressure = offspring.pressure
+        dup.volume = offspring.volume
+        dup.force = offspring.force
+        dup.purebulkenpa = offspring.purebulkenpa
+        dup.natomsbulk = offspring.natomsbulk
         dup.fingerprint = copy.copy(offspring.fingerprint)
         dup.swaplist = copy.deepcopy(offspring.swaplist)
-        dup.vacancies = offspring.vacancies.copy()
-        dup.swaps = offspring.swaps.copy()
+        dup.predicted = offspring.predicted
+        dup.descriptors = copy.copy(offspring.descriptors)
+        dup.descriptor_key = offspring.descriptor_key
 
         return dup
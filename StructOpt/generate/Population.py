@@ -0,0 +1,232 @@
+import numpy
+
+class GatheredArray(object):
+    """Array attribute of a Population, gathered from the individuals in a
+    single pass the first time it is read and kept up to date by the list
+    operations of the Population afterwards"""
+
+    def __init__(self, function, dtype):
+        self.function = function
+        self.dtype = dtype
+        self.name = '_' + function.__name__
+
+    def __get__(self, population, owner):
+        if population is None:
+            return self
+        values = population.__dict__.get(self.name)
+        if values is None:
+            values = self.gather(population)
+            population.__dict__[self.name] = values
+        return values
+
+    def gather(self, individuals):
+        """Returns the array of the values of individuals"""
+        if self.dtype is object:
+            values = numpy.empty(len(individuals), dtype=object)
+            values[:] = [self.function(ind) for ind in individuals]
+            return values
+        return numpy.fromiter((self.function(ind) for ind in individuals),
+            dtype=self.dtype, count=len(individuals))
+
+
+def gathered(dtype):
+    """Decorator turning a function of an individual into a GatheredArray"""
+    return lambda function: GatheredArray(function, dtype)
+
+
+class Population(list):
+    """List of individuals with their fitness, energy, index, history index
+    and number of atoms as parallel numpy arrays. Each array is gathered in a
+    single pass when it is first used and then maintained by append, extend,
+    insert, item assignment and deletion, so the population kept by the
+    Optimizer never has to be gathered again. Sorting, reversing and slice
+    assignment drop the arrays to be gathered on next use. Individuals
+    changed in place are brought up to date with update, reindex and
+    reset_history. generation is the generation the population belongs to."""
+
+    def __init__(self, individuals=(), generation=None):
+        list.__init__(self, individuals)
+        self.generation = generation
+
+    @gathered(float)
+    def fitness(ind):
+        return nan_if_none(ind.fitness)
+
+    @gathered(float)
+    def energy(ind):
+        return nan_if_none(ind.energy)
+
+    @gathered(int)
+    def index(ind):
+        return ind.index
+
+    @gathered(object)
+    def history_index(ind):
+        return str(ind.history_index)
+
+    @gathered(int)
+    def natoms(ind):
+        return len(ind[0])
+
+    def arrays(self):
+        """Returns the (GatheredArray, values) pairs of the gathered arrays"""
+        return [(attr, self.__dict__[attr.name]) for attr in GATHERED
+            if self.__dict__.get(attr.name) is not None]
+
+    def set_array(self, attr, values):
+        self.__dict__[attr.name] = values
+
+    def invalidate(self):
+        """Drops the gathered arrays, they are gathered again on next use"""
+        for attr in GATHERED:
+            self.__dict__.pop(attr.name, None)
+
+    def append(self, ind):
+        list.append(self, ind)
+        for attr, values in self.arrays():
+            self.set_array(attr, numpy.concatenate([values, attr.gather([ind])]))
+
+    def extend(self, individuals):
+        individuals = list(individuals)
+        list.extend(self, individuals)
+        for attr, values in self.arrays():
+            self.set_array(attr, numpy.concatenate([values, attr.gather(individuals)]))
+
+    def __iadd__(self, individuals):
+        self.extend(individuals)
+        return self
+
+    def insert(self, position, ind):
+        n = len(self)
+        if position < 0:
+            position = max(0, n + position)
+        position = min(position, n)
+        list.insert(self, position, ind)
+        for attr, values in self.arrays():
+            self.set_array(attr, numpy.insert(values, position, attr.gather([ind])))
+
+    def __setitem__(self, key, value):
+        list.__setitem__(self, key, value)
+        if isinstance(key, slice):
+            self.invalidate()
+            return
+        for attr, values in self.arrays():
+            values[key] = attr.gather([value])[0]
+
+    def __delitem__(self, key):
+        if not isinstance(key, slice) and key < 0:
+            key += len(self)
+        list.__delitem__(self, key)
+        for attr, values in self.arrays():
+            self.set_array(attr, numpy.delete(values, key))
+
+    # Simple slices of lists go through these methods in Python 2
+    def __setslice__(self, i, j, individuals):
+        list.__setslice__(self, i, j, individuals)
+        self.invalidate()
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self.invalidate()
+
+    def pop(self, position=-1):
+        if position < 0:
+            position += len(self)
+        ind = list.pop(self, position)
+        for attr, values in self.arrays():
+            self.set_array(attr, numpy.delete(values, position))
+        return ind
+
+    def remove(self, ind):
+        del self[list.index(self, ind)]
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self.invalidate()
+
+    def reverse(self):
+        list.reverse(self)
+        for attr, values in self.arrays():
+            self.set_array(attr, values[::-1].copy())
+
+    def update(self, position):
+        """Updates the arrays after the individual at position was changed in place"""
+        for attr, values in self.arrays():
+            values[position] = attr.gather([self[position]])[0]
+
+    def reindex(self):
+        """Sets the index of every individual to its position"""
+        for position, ind in enumerate(self):
+            ind.index = position
+        self.set_array(Population.index, numpy.arange(len(self)))
+
+    def reset_history(self):
+        """Sets the history index of every individual to its index"""
+        for ind in self:
+            ind.history_index = repr(ind.index)
+        self.__dict__.pop(Population.history_index.name, None)
+
+    def take(self, indices):
+        """Returns the Population of the individuals at the positions in
+        indices, with the gathered arrays taken from this population"""
+        indices = numpy.asarray(indices, dtype=int)
+        subset = Population([self[i] for i in indices], self.generation)
+        for attr, values in self.arrays():
+            subset.set_array(attr, values[indices])
+        return subset
+
+    def sorted_indices(self):
+        """Returns the positions of the individuals sorted by fitness,
+        individuals with equal fitness keep their order"""
+        return numpy.argsort(self.fitness, kind='mergesort')
+
+    def best(self, nkeep):
+        """Returns the Population of the nkeep individuals with the lowest fitness"""
+        return self.take(self.sorted_indices()[:nkeep])
+
+    def argmin(self):
+        """Returns the position of the first individual with the lowest fitness"""
+        fits = self.fitness
+        return int(numpy.argmin(numpy.where(numpy.isnan(fits), numpy.inf, fits)))
+
+
+# Array attributes of a Population
+GATHERED = [Population.fitness, Population.energy, Population.index,
+    Population.history_index, Population.natoms]
+
+
+def as_population(pop, generation=None):
+    """Returns pop if it already is a Population, else a Population of its
+    individuals. generation is recorded on the population if given."""
+    if not isinstance(pop, Population):
+        pop = Population(pop)
+    if generation is not None:
+        pop.generation = generation
+    return pop
+
+
+def nan_if_none(value):
+    if value is None:
+        return numpy.nan
+    return value
+
+
+def new_generator(seed=None):
+    """Returns a numpy random Generator, or a RandomState with numpy versions
+    older than 1.17. The selection operators only use the methods common to both."""
+    try:
+        return numpy.random.default_rng(seed)
+    except AttributeError:
+        return numpy.random.RandomState(seed)
+
+
+def get_generator(Optimizer=None):
+    """Returns the numpy random generator of the Optimizer, created from the
+    seed of the island on first use"""
+    rng = getattr(Optimizer, 'rng', None)
+    if rng is None:
+        if Optimizer is None or getattr(Optimizer, 'seed', None) is None:
+            return new_generator()
+        rng = new_generator(Optimizer.seed + getattr(Optimizer, 'island', 0))
+        Optimizer.rng = rng
+    return rng
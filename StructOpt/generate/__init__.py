@@ -6,7 +6,9 @@ from generate_dumbbells import *
 from get_population import *
 from get_restart_population import *
 from Individual import *
+from Population import *
 from rot_vec import *
+from structure_cache import *
 import crystal
 import defect
 import surface
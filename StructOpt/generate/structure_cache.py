@@ -0,0 +1,129 @@
+import hashlib
+from collections import OrderedDict
+import numpy
+
+# Positions and cell are rounded to this tolerance (Angstrom) before hashing
+STRUCTURE_HASH_TOL = 1e-4
+
+
+def structure_hash(indiv, tol=STRUCTURE_HASH_TOL):
+    """Returns a hash of the symbols, positions and cell of an individual.
+    The bulk atoms in indiv.bulki are included for Defect structures.
+    Inputs:
+        indiv = Individual class object
+        tol = tolerance the positions and cell are rounded to
+    Outputs:
+        key = hex digest identifying the structure
+    """
+    h = hashlib.sha1()
+    for atoms in [indiv[0], indiv.view('bulki')]:
+        update_hash(h, atoms, tol)
+    return h.hexdigest()
+
+
+def atoms_hash(atoms, tol=STRUCTURE_HASH_TOL):
+    """Returns a hash of the symbols, positions and cell of an ASE atoms
+    object, such as the perfect bulk a descriptor is computed against"""
+    h = hashlib.sha1()
+    update_hash(h, atoms, tol)
+    return h.hexdigest()
+
+
+def update_hash(h, atoms, tol):
+    """Adds the symbols, rounded positions, cell and periodic boundary
+    conditions of atoms to the hash h"""
+    if atoms is None or len(atoms) == 0:
+        return
+    h.update(' '.join(atoms.get_chemical_symbols()).encode())
+    h.update(numpy.round(atoms.get_positions() / tol).astype(numpy.int64).tobytes())
+    h.update(numpy.round(numpy.asarray(atoms.get_cell()) / tol).astype(numpy.int64).tobytes())
+    h.update(numpy.asarray(atoms.get_pbc()).astype(numpy.int8).tobytes())
+
+
+def canonical_hash(indiv, tol=STRUCTURE_HASH_TOL):
+    """Returns a hash of the structure of an individual that does not depend
+    on the order of the atoms. Positions in periodic directions are wrapped
+    into the cell before they are rounded to tol.
+    Inputs:
+        indiv = Individual class object
+        tol = tolerance the positions and cell are rounded to
+    Outputs:
+        key = hex digest identifying the structure
+    """
+    h = hashlib.sha1()
+    for atoms in [indiv[0], indiv.view('bulki')]:
+        if atoms is None or len(atoms) == 0:
+            h.update(b'|')
+            continue
+        cell = numpy.asarray(atoms.get_cell(), dtype=float)
+        positions = atoms.get_positions()
+        pbc = atoms.get_pbc()
+        if pbc.any() and abs(numpy.linalg.det(cell)) > 1e-12:
+            scaled = numpy.linalg.solve(cell.T, positions.T).T
+            lengths = numpy.linalg.norm(cell, axis=1)
+            for d in numpy.nonzero(pbc)[0]:
+                scaled[:, d] %= 1.0
+                # Atoms on the upper face of the cell are the same as on the lower one
+                scaled[(1.0 - scaled[:, d]) * lengths[d] < 0.5 * tol, d] = 0.0
+            positions = numpy.dot(scaled, cell)
+        rounded = numpy.round(positions / tol).astype(numpy.int64)
+        numbers = atoms.get_atomic_numbers()
+        order = numpy.lexsort((rounded[:, 2], rounded[:, 1], rounded[:, 0], numbers))
+        h.update(numbers[order].astype(numpy.int64).tobytes())
+        h.update(rounded[order].tobytes())
+        h.update(numpy.round(cell / tol).astype(numpy.int64).tobytes())
+        h.update(pbc.astype(numpy.int8).tobytes())
+    return h.hexdigest()
+
+
+class StructureCache(object):
+    """Least recently used cache of data computed from a structure, such as
+    descriptors (fingerprints, neighbor lists, defect decompositions) keyed by
+    (structure_hash, name) or evaluated individuals keyed by canonical_hash"""
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        """Returns the value stored for key and marks it as recently used"""
+        if key in self.data:
+            value = self.data.pop(key)
+            self.data[key] = value
+            self.hits += 1
+            return value
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        """Stores value for key, dropping the least recently used entries
+        beyond maxsize"""
+        self.data.pop(key, None)
+        self.data[key] = value
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def resize(self, maxsize):
+        """Changes the maximum number of entries"""
+        self.maxsize = maxsize
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def clear(self):
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Cache shared by all individuals on this rank
+descriptor_cache = StructureCache()
+# Relaxed and evaluated individuals, used on rank 0 to skip repeated evaluations
+evaluation_cache = StructureCache(0)
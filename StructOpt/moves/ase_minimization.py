@@ -34,9 +34,9 @@ def ase_minimization(indiv, Optimizer):
         nat=indiv[0].get_number_of_atoms
         sol=Atoms()
         sol.extend(indiv[0])
-        sol.extend(indiv.bulko)
+        sol.extend(indiv.view('bulko'))
         sol.set_calculator(calc2)
-        sol.set_cell(indiv.bulko.get_cell())
+        sol.set_cell(indiv.view('bulko').get_cell())
         sol.set_pbc(True)
         dyn=BFGS(sol)
         dyn.run(fmax=0.001, steps=2500)
@@ -1,6 +1,6 @@
 import numpy
 import random
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def lattice_alteration(indiv, Optimizer):
     """Move function to perform Lattice Alteration of atoms
@@ -18,7 +18,7 @@ def lattice_alteration(indiv, Optimizer):
     cell_min=numpy.minimum.reduce(indiv[0].get_positions())
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            indc,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            indc,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
             positions=indc.get_positions()
         else:
             positions=indiv[0].get_positions()
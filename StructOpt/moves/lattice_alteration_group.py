@@ -1,7 +1,7 @@
 import random
 import numpy
 from ase import Atom, Atoms
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def lattice_alteration_group(indiv, Optimizer):
     """Move function to perform Lattice Alteration of group of atoms based on location
@@ -17,7 +17,7 @@ def lattice_alteration_group(indiv, Optimizer):
         debug = False
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            indc,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            indc,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
             atms=indc.copy()
         else:
             atms=indiv[0].copy()
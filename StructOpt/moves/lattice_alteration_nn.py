@@ -1,6 +1,6 @@
 import random
 import numpy
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 from ase import Atom, Atoms
 from ase.calculators.neighborlist import NeighborList
 
@@ -18,7 +18,7 @@ def lattice_alteration_nn(indiv, Optimizer):
         debug = False
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            indc,indb,vacant,swaps,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            indc,indb,vacant,swaps,stro = get_defects(indiv,Optimizer.solidbulk,0)
             ind = indc.copy()
             ind.extend(indb)
         else:
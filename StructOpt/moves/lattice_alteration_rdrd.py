@@ -1,7 +1,7 @@
 import random
 import math
 import numpy
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def lattice_alteration_rdrd(indiv, Optimizer):
     """Move function to move random atoms in random direction for random distance
@@ -18,7 +18,7 @@ def lattice_alteration_rdrd(indiv, Optimizer):
     d_max=numpy.minimum.reduce(numpy.maximum.reduce(indiv[0].get_positions())-numpy.minimum.reduce(indiv[0].get_positions()))
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            indc,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            indc,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
             positions=indc.get_positions()
         else:
             positions = indiv[0].get_positions()
@@ -1,5 +1,5 @@
 import random
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def lattice_alteration_small(indiv, Optimizer):
     """Move function to perform small Lattice Alteration of atoms
@@ -17,7 +17,7 @@ def lattice_alteration_small(indiv, Optimizer):
     ratmlocnew = 0
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            indc,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            indc,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
             positions = indc.get_positions()
             if len(positions) != 0:
                 try:
@@ -1,6 +1,6 @@
 import random
 import numpy
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def move_la(indiv, Optimizer):
     """Move function to move atoms in structure by lattice constant.  Intended for use in Defect optimization.
@@ -18,7 +18,7 @@ def move_la(indiv, Optimizer):
     Optimizer.output.write('Lattice Constant Move Mutation performed on individual\n')
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            indc,indb,vacant,swaps,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            indc,indb,vacant,swaps,stro = get_defects(indiv,Optimizer.solidbulk,0)
             ind = indc.copy()
         else:
             ind = indiv[0]
@@ -21,9 +21,9 @@ def permutation_crystal(indiv, Optimizer):
         indexbulk=len(indiv[0])
         solid=Atoms()
         solid.extend(indiv[0])
-        solid.extend(indiv.bulki)
+        solid.extend(indiv.view('bulki'))
         solid.set_pbc(True)
-        solid.set_cell(indiv.bulko.get_cell())
+        solid.set_cell(indiv.view('bulko').get_cell())
         a1=solid[random.randint(0,indiv[0].get_number_of_atoms()-1)]
         opts=[inds for inds in solid if inds.symbol != a1.symbol]
         try:
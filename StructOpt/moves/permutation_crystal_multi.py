@@ -21,7 +21,7 @@ def permutation_crystal_multi(indiv, Optimizer):
         indexbulk=len(indiv[0])
         solid=Atoms()
         solid.extend(indiv[0])
-        solid.extend(indiv.bulki)
+        solid.extend(indiv.view('bulki'))
         solid.set_pbc(True)
         solid.set_cell(indiv[0].get_cell())
         a1=solid[random.randint(0,indiv[0].get_number_of_atoms()-1)]
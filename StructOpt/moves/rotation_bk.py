@@ -1,5 +1,5 @@
 import random
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def rotation(indiv, Optimizer):
     """Move function to perform rotation of a group of atoms
@@ -15,7 +15,7 @@ def rotation(indiv, Optimizer):
         debug = False
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            atms,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            atms,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
         else:
             atms = indiv[0]
     else:
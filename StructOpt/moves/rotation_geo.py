@@ -1,7 +1,7 @@
 import random
 import numpy
 from ase import Atom, Atoms
-from StructOpt.tools.find_defects import find_defects
+from StructOpt.tools.find_defects import get_defects
 
 def rotation_geo(indiv, Optimizer):
     '''Function to handle a geometry based rotation mutation
@@ -19,7 +19,7 @@ def rotation_geo(indiv, Optimizer):
     #Rotate group of atoms based on geometry
     if Optimizer.structure=='Defect':
         if Optimizer.isolate_mutation:
-            atms,indb,vacant,swap,stro = find_defects(indiv[0],Optimizer.solidbulk,0)
+            atms,indb,vacant,swap,stro = get_defects(indiv,Optimizer.solidbulk,0)
         else:
             atms = indiv[0].copy()
     else:
@@ -33,7 +33,7 @@ def swap_int(indiv, Optimizer):
     if Optimizer.structure=='Defect':
         indatms=indiv[0].copy()
         brmark=len(indatms)
-        indatms.extend(indiv.bulki.copy())
+        indatms.extend(indiv.view('bulki'))
     else:
         indatms=indiv[0].copy()
         brmark=int(len(indatms)/2.0)
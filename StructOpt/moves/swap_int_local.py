@@ -23,7 +23,7 @@ def swap_int_local(indiv, Optimizer):
     nat = len(atmsst)
     totalsol = atmsst.copy()
     if Optimizer.structure=='Defect':
-        totalsol.extend(indiv.bulki.copy())
+        totalsol.extend(indiv.view('bulki'))
         ctoff = [Optimizer.sf for one in totalsol]
     else:
         ctoff = [1.5 for one in totalsol]
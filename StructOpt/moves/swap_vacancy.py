@@ -14,7 +14,7 @@ def swap_vacancy(indiv, Optimizer):
         debug = False
     Optimizer.output.write('Vacancy Swap Mutation performed on individual\n')
     Optimizer.output.write('Index = '+repr(indiv.index)+'\n')
-    vacancies = indiv.vacancies.copy()
+    vacancies = indiv.view('vacancies').copy()
     if len(vacancies) == 0:
         Optimizer.output.write('Vacancy Swap Failed. Individual has no identified vacancies to exchange\n')
         natomsswap = 0
@@ -27,7 +27,7 @@ def swap_vacancy(indiv, Optimizer):
         vacant = random.choice(vacancies)
         if Optimizer.alloy:
             solid=indiv[0].copy()
-            solid.extend(indiv.bulki)
+            solid.extend(indiv.view('bulki'))
             select = random.choice([one.index for one in solid if one.symbol==vacant.symbol])
         else:
             select = random.choice([one.index for one in indiv[0] if one.symbol==vacant.symbol])
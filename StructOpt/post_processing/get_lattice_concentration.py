@@ -65,12 +65,8 @@ def get_lattice_concentration(bulkfile,indivfile):
 
     #Get Lattice sites for individual
     onlatcon=[[-1,concentbulk]]
-    n=0
-    while True:
-        try:
-            indiv = StructOpt.fileio.read_xyz(indivfile,n)
-        except:
-            break
+    # Stream the frames, indiv files can be too large to read at once
+    for n, (indiv, data) in enumerate(StructOpt.fileio.XYZTrajectory(indivfile)):
         indiv.translate([nnxd/2.0,nnyd/2.0,nnzd/2.0])
         bxarray=[[0,[],[]] for i in range(nx*ny*nz)]
         positions=indiv.get_positions()
@@ -114,7 +110,6 @@ def get_lattice_concentration(bulkfile,indivfile):
             concenti.append(float(numberofsym)/float(nlatsites))
         concents=zip(reducedsyms,concenti)
         onlatcon.append([n,concents])
-        n+=1
 
     maxlen=max([len(con) for n,con in onlatcon])
     maxsyms=[con for n,con in onlatcon if len(con)==maxlen]
@@ -6,13 +6,16 @@ import numpy
 from StructOpt.post_processing.read_genealogy import read_genealogy
 import logging
 
+# Bytes read from an output file at a time
+BLOCK_SIZE = 4*1024*1024
+
 def read_output(folder,genealogytree=False,natoms=None):
     """Function to analyze structural optimization output.
     Inputs:
         folder = folder containing output from structural optimization
         genealogytree = Boolean for whether or not to construct genealogy tree from data
             Default = False
-        natoms = number of atoms in an individual 
+        natoms = number of atoms in an individual
             Default = False
     Outputs:
         Plot-All_Energies-XXX.png
@@ -25,245 +28,358 @@ def read_output(folder,genealogytree=False,natoms=None):
         genealogytree-Genealogy-XXX.png
 
     """
-    logger = logging.getLogger('default')
-    files=os.listdir(folder)
-    for filename in files:
-        if ('All_Energies' in filename) and not ('png' in filename): #TTM 20151030 do not process a plot file if it was created first.
-            logger.info('Reading from All_Energies file.  Plotting all energies vs. generation')
-            f=open(os.path.join(folder,filename),'r')
-            line0=f.readline()
-            indenergies=[[float(value)] for value in line0.split()]
-            for line in f.readlines():
-                i=0
-                for value in line.split():
-                    a=float(value)
-                    if a != 0:
-                        indenergies[i].append(float(value))
-                    else:
-                        indenergies[i].append(None)
-                    i+=1
+    monitor = OutputMonitor(folder, natoms)
+    monitor.update()
+    monitor.plot(genealogytree)
 
-            f.close()
-            generation=range(len(indenergies[0]))
-            clist=[]
-            for i in range(len(indenergies)):
-                clist.append(numpy.random.rand(3,1))
 
-            fig=plt.figure()
-            ax1=fig.add_subplot(111)
-            i=0
-            for i in range(len(indenergies)):
-                ax1.scatter(generation,indenergies[i],c=clist[i],label='Ind '+repr(i+1))
-
-            handles, labels = ax1.get_legend_handles_labels()
-            ax1.legend(handles, labels)
-            box = ax1.get_position()
-            ax1.set_position([box.x0, box.y0, box.width * 0.8, box.height])
-            ax1.legend(loc='center left', bbox_to_anchor=(1, 0.5))
-            #ax1.legend(loc='upper center', bbox_to_anchor=(0.5, 1.0),ncol=4, fancybox=True, shadow=True)
-            plt.xlabel('Generation')
-            plt.ylabel('Total Energy, eV')
-            plt.title('Energy Evolution')
-            plt.xlim([0,len(generation)])
-            plt.savefig('Plot-{0}.png'.format(filename[:-4]))
-            indperatom=[]
-            if natoms !=None:
-                logger.info('Plotting energy per atom vs. generation')
-                for ind in indenergies:
-                    indperatom.append([en/natoms for en in ind])
-
-                fig=plt.figure()
-                ax1=fig.add_subplot(111)
-                i=0
-                for i in range(len(indperatom)):
-                    ax1.scatter(generation,indperatom[i],c=clist[i],label='Ind '+repr(i+1))
-
-                handles, labels = ax1.get_legend_handles_labels()
-                ax1.legend(handles, labels)
-                box = ax1.get_position()
-                ax1.set_position([box.x0, box.y0, box.width * 0.8, box.height])
-                ax1.legend(loc='center left', bbox_to_anchor=(1, 0.5))
-                plt.xlabel('Generation')
-                plt.ylabel('Energy/atom, eV/atom')
-                plt.title('Energy Evolution')
-                plt.xlim([0,len(generation)])
-                plt.savefig('Plot-Peratom-{0}.png'.format(filename[:-4]))
-        if ('Summary' in filename) and not ('png' in filename): #TTM 20151030 do not parse plot graphics if they happened to have been created first
-            #print 'HKK :: filename' : filename
-            if 'StructureSummary' not in filename:
-                logger.info('Plotting Fitness min, max and medium vs. generation')
-                f=open(os.path.join(folder,filename),'r')
-                #print 'HKK :: file', os.path.join(folder,filename) 
-                line0=f.readline()
-                line1=f.readline().split(':')
-                bulkepa=float(line1[1])
-                line2=f.readline().split()
-                natoms=float(line2[1])
-                labels=f.readline().split()
-                data=dict((lab,[]) for lab in labels)
-                for line in f.readlines():
-                    for i, value in enumerate(line.split(None, 6)):
-                        #print 'HKK ::' , value
-                        if i < 6:
-                            data[labels[i]].append(float(value))
-                        else:
-                            sp=value.strip()
-                            data[labels[i]].append(sp)
-    
-                f.close()
-                yl=[data['Fitmedium'][one]-data['Fitmin'][one] for one in range(len(data['Gen']))]
-                yh=[data['Fitmax'][one]-data['Fitmedium'][one] for one in range(len(data['Gen']))]
-                fig=plt.figure()
-                ax1=fig.add_subplot(111)
-                ax1.errorbar(data['Gen'],data['Fitmedium'],xerr=0,yerr=[yl,yh])
-                plt.xlabel('Gen')
-                plt.ylabel('Fitness')
-                plt.xlim([1,len(data['Gen'])+1])
-                plt.title('Fitness vs. Generation (Medium, Min, Max)')
-                plt.ylim([min(data['Fitmin'])-1.0,max(data['Fitmin'])+10.0])
-                plt.savefig('Plot-{0}.png'.format(filename[:-4]))
-                srtsl=data['Time'][0].split()
-                strtime=[float(one) for one in srtsl[3].split(':')]
-                tclk=[0.0]
-                for one in data['Time']:
-                    stl=one.split()
-                    otime=[float(two) for two in stl[3].split(':')]
-                    diff=[otime[i]-strtime[i] for i in range(len(otime))]
-                    if diff[0]<0:
-                        diff[0]+=24
-                    for i in range(len(diff)):
-                        if diff[i]<0:
-                            diff[i-1]-=1.0
-                            diff[i]+=60
-                    tclk.append(diff[0]*3600+diff[1]*60+diff[2])
-                    strtime=otime
-                logger.info('Plotting computational time per generation')
-                fig = plt.figure()
-                ax1 = fig.add_subplot(111)
-                ax1.plot(tclk)
-                plt.xlabel('Generation')
-                plt.ylabel('CPU Time (s)')
-                plt.xlim([1,len(data['Gen'])+1])
-                plt.title('Processing Time per Generation')
-                totaltime=sum(tclk)/3600.0
-                plt.text(0.5, 0.95,'Total Time for run = '+'%.3f' % round(totaltime, 3)+'hours',horizontalalignment='center',verticalalignment='top',transform = ax1.transAxes)
-                plt.savefig('Plot-time-{0}.png'.format(filename[:-4]))
-        if 'FingerprintMin' in filename:
-            logger.info('Plotting minimum fingerprint functions by generation')
-            f = open(os.path.join(folder,filename),'r')
-            fpmin=[]
-            enfp=[]
-            i=0
-            for line in f.readlines():
-                if i==0:
-                    bins=line.split(', ')
-                    nbin=[]
-                    for one in bins:
-                        if '[' in one:
-                            one=one[1::]
-                        elif ']'in one:
-                            ind=[i for i,some in list(enumerate(one)) if some==']']
-                            one=one[0:ind[0]]
-                        nbin.append(float(one))
-                    fpmin.append(nbin)
-                    i=1
-                elif i==1:
-                    enfp.append(float(line))
-                    i=0
-            f.close()
-            for i in range(len(fpmin)):
-                fig=plt.figure()
-                ax=fig.add_subplot(111)
-                ax.plot(fpmin[i])
-                plt.xlabel('Distance, bins')
-                plt.ylabel('Intensity')
-                plt.title('Minimum Individual Fingerprint, Generation={0}'.format(i))
-                plt.text(0.5, 0.95,'Structure Energy = '+repr(enfp[i]),horizontalalignment='center',verticalalignment='top',transform = ax.transAxes)
-                if max(fpmin[i])>100:
-                    plt.ylim([0,100])
-                plt.savefig('Plot-FPMin-{0}-gen{1}.png'.format(filename[:-4],i))
-        if 'Fingerprints' in filename:
-            logger.info('Plotting fingerprint distance vs. energy by generation')
-            f = open(os.path.join(folder,filename),'r')
-            fpds=[]
-            ens=[]
-            for line in f.readlines():
-                fpg=[]
-                eng=[]
-                i=0
-                for value in line.split():
-                    if i==0:
-                        fpg.append(float(value))
-                        i=1
-                    else:
-                        eng.append(float(value))
-                        i=0
-                fpds.append(fpg)
-                ens.append(eng)
+class OutputMonitor(object):
+    """Incremental version of read_output.
+    Every call to update only parses the lines appended to the output files
+    since the previous call and adds them to running NumPy arrays, so the
+    plots can be refreshed during a run without re-reading the history.
+    Plots of single generations are only made once.
+    Inputs:
+        folder = folder containing output from structural optimization
+        natoms = number of atoms in an individual, read from the Summary file if None
+        plotdir = folder the plots are written to, default is the working directory
+    """
 
-            f.close()
+    def __init__(self, folder, natoms=None, plotdir=None):
+        self.folder = folder
+        self.natoms = natoms
+        self.plotdir = plotdir
+        self.histories = {}
+        self.logger = logging.getLogger('default')
 
-            for i in range(len(fpds)):
-                emin=min(ens[i])
-                eng=[one-emin for one in ens[i]]
-                fig=plt.figure()
-                ax=fig.add_subplot(111)
-                ax.scatter(fpds[i],eng)
-                plt.xlabel('Fingerprint Cosine Distance from Minimum Energy Structure')
-                plt.ylabel('Energy Difference, eV')
-                plt.title('Fingerprint Distance vs. Energy, Generation={0}'.format(i))
-                plt.savefig('Plot-FpDist-{0}-gen{1}.png'.format(filename[:-4],i))
-        if ('Genealogy' in filename) and (not 'png' in filename): #TTM do not try to process any Genealogy*.png plots
-            logger.info('Plotting bar plot of mutation success')
-            f = open(os.path.join(folder,filename),'r')
-            line0=f.readline()
-            indhist=[[value] for value in line0.split()]
-            for line in f.readlines():
-                i=0
-                for value in line.split():
-                    indhist[i].append(value)
-                    i+=1
-            mutoptn = ['Lattice_Alteration_nn', 'Lattice_Alteration_rdrd', 'Lattice_Alteration_Group', 'Rotation_geo', 'ZP_Rotation', 'Random_Replacement']
-            mutopt = ['LANN','LARD','LAG','GR','ZPR','RGR']
-            count = [[0 for j in range(len(indhist[0]))] for i in mutopt]
-            for i in range(len(indhist[0])):
-                for j in range(len(indhist)):
-                    for k in range(len(mutopt)):
-                        if mutopt[k] in indhist[j][i]:
-                            count[k][i]+=1
-            generation=numpy.arange(len(indhist[0]))
-            width=1.0/(len(count)+1)
-            clist=[]
-            for i in range(len(count)):
-                clist.append(numpy.random.rand(3,1))
+    def update(self):
+        """Reads the new lines of all output files in the folder"""
+        for filename in sorted(os.listdir(self.folder)):
+            if filename not in self.histories:
+                history = get_history(filename)
+                if history is None:
+                    continue
+                self.histories[filename] = (TailFile(os.path.join(self.folder, filename)), history)
+            tail, history = self.histories[filename]
+            for line in tail.read_lines():
+                history.add_line(line)
 
-            fig=plt.figure()
-            ax1=fig.add_subplot(111)
-            for i in range(len(count)):
-                ax1.bar(generation+width*i,count[i],width,color=clist[i],label=mutoptn[i])
-
-            plt.xlabel('Generation')
-            plt.ylabel('Successful Mutations')
-            ax1.legend(loc='upper left')
-            plt.title('Successful Mutations by Generation')
-            plt.savefig('Plot-SuccessfulMutations-{0}.png'.format(filename[:-4]))
-            if genealogytree:
-                logger.info('Plotting genealogy tree')
+    def plot(self, genealogytree=False):
+        """Writes the plots of the data read so far"""
+        plotdir = self.plotdir or os.getcwd()
+        natoms = self.natoms
+        for filename, (tail, history) in sorted(self.histories.items()):
+            if natoms is None and isinstance(history, SummaryHistory):
+                natoms = history.natoms
+        for filename, (tail, history) in sorted(self.histories.items()):
+            self.logger.info('Plotting data from {0}'.format(filename))
+            history.plot(os.path.join(plotdir, filename[:-4]), natoms)
+            if genealogytree and isinstance(history, GenealogyHistory):
+                self.logger.info('Plotting genealogy tree')
                 read_genealogy(filename)
-        if 'Bests-energies' in filename:
-            logger.info('Plotting Best-energies scatter')
-            f=open(os.path.join(folder,filename),'r')
-            benergies = []
-            for line in f.readlines():
-                benergies.append(float(line))
+
+
+def get_history(filename):
+    """Returns the history object for the data of an output file, None if the file is not analyzed"""
+    if filename.endswith('.png'):
+        return None
+    if 'All_Energies' in filename:
+        return EnergyHistory()
+    if 'Summary' in filename and 'StructureSummary' not in filename:
+        return SummaryHistory()
+    if 'FingerprintMin' in filename:
+        return FingerprintMinHistory()
+    if 'Fingerprints' in filename:
+        return FingerprintHistory()
+    if 'Genealogy' in filename:
+        return GenealogyHistory()
+    if 'Bests-energies' in filename:
+        return BestEnergyHistory()
+    return None
+
+
+class TailFile(object):
+    """Reads the complete lines appended to a file since the last call"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    def read_lines(self):
+        f = open(self.path, 'rb')
+        try:
+            f.seek(0, 2)
+            if f.tell() < self.offset:
+                # The file was replaced, start over
+                self.offset = 0
+            f.seek(self.offset)
+            rest = b''
+            while True:
+                block = f.read(BLOCK_SIZE)
+                if not block:
+                    break
+                lines = (rest + block).split(b'\n')
+                # An incomplete last line is read again by the next call
+                rest = lines.pop()
+                for line in lines:
+                    self.offset += len(line) + 1
+                    yield line if isinstance(line, str) else line.decode('ascii')
+        finally:
             f.close()
-            fig=plt.figure()
-            ax1=fig.add_subplot(111)
-            ax1.scatter(range(len(benergies)),benergies)
-            plt.xlabel('Rank')
-            plt.ylabel('Total Energy, eV')
-            plt.title('Energy of Best Structures in Optimization')
-            plt.savefig('Plot-{0}.png'.format(filename[:-4]))
+
+
+class RowArray(object):
+    """NumPy array growing by rows, missing values are nan"""
+
+    def __init__(self, ncolumns):
+        self.array = numpy.empty((16, ncolumns))
+        self.n = 0
+
+    def append(self, row):
+        row = numpy.asarray(row, dtype=float)
+        if self.n == len(self.array):
+            self.array = numpy.concatenate([self.array, numpy.empty(self.array.shape)])
+        if len(row) > self.array.shape[1]:
+            extra = numpy.empty((len(self.array), len(row) - self.array.shape[1]))
+            extra.fill(numpy.nan)
+            self.array = numpy.concatenate([self.array, extra], axis=1)
+        self.array[self.n].fill(numpy.nan)
+        self.array[self.n, :len(row)] = row
+        self.n += 1
+
+    @property
+    def data(self):
+        return self.array[:self.n]
+
+    def __len__(self):
+        return self.n
+
+
+class EnergyHistory(object):
+    """Energies of the individuals in each generation from an All_Energies file"""
+
+    def __init__(self):
+        self.energies = RowArray(1)
+        self.clist = []
+
+    def add_line(self, line):
+        values = [float(value) for value in line.split()]
+        if not values:
+            return
+        if len(self.energies) > 0:
+            values = [value if value != 0 else numpy.nan for value in values]
+        self.energies.append(values)
+
+    def plot(self, name, natoms):
+        if len(self.energies) == 0:
+            return
+        indenergies = self.energies.data.T
+        generation = numpy.arange(len(self.energies))
+        while len(self.clist) < len(indenergies):
+            self.clist.append(numpy.random.rand(3))
+        self.plot_energies(generation, indenergies, 'Total Energy, eV', 'Plot-{0}.png', name)
+        if natoms != None:
+            self.plot_energies(generation, indenergies/natoms, 'Energy/atom, eV/atom', 'Plot-Peratom-{0}.png', name)
+
+    def plot_energies(self, generation, indenergies, ylabel, plotname, name):
+        fig=plt.figure()
+        ax1=fig.add_subplot(111)
+        for i in range(len(indenergies)):
+            ax1.scatter(generation,indenergies[i],color=self.clist[i],label='Ind '+repr(i+1))
+        handles, labels = ax1.get_legend_handles_labels()
+        ax1.legend(handles, labels)
+        box = ax1.get_position()
+        ax1.set_position([box.x0, box.y0, box.width * 0.8, box.height])
+        ax1.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+        plt.xlabel('Generation')
+        plt.ylabel(ylabel)
+        plt.title('Energy Evolution')
+        plt.xlim([0,len(generation)])
+        save_plot(fig, name, plotname)
+
+
+class SummaryHistory(object):
+    """Fitness statistics and times of each generation from a Summary file"""
+
+    def __init__(self):
+        self.nheader = 0
+        self.natoms = None
+        self.stats = RowArray(6)
+        self.tclk = RowArray(1)
+        self.tclk.append([0.0])
+        self.lastclock = None
+
+    def add_line(self, line):
+        if self.nheader < 4:
+            # Run name, run type, number of atoms and column labels
+            if self.nheader == 2:
+                self.natoms = float(line.split()[1])
+            self.nheader += 1
+            return
+        values = line.split(None, 6)
+        if len(values) < 7:
+            return
+        self.stats.append([float(value) for value in values[:6]])
+        h, m, s = [float(one) for one in values[6].split()[3].split(':')]
+        clock = h*3600 + m*60 + s
+        if self.lastclock is None:
+            self.lastclock = clock
+        self.tclk.append([(clock - self.lastclock) % 86400])
+        self.lastclock = clock
+
+    def plot(self, name, natoms):
+        if len(self.stats) == 0:
+            return
+        gen, fitmin, fitavg, fitmedium, fitmax, std = self.stats.data.T
+        fig=plt.figure()
+        ax1=fig.add_subplot(111)
+        ax1.errorbar(gen,fitmedium,xerr=0,yerr=[fitmedium-fitmin,fitmax-fitmedium])
+        plt.xlabel('Gen')
+        plt.ylabel('Fitness')
+        plt.xlim([1,len(gen)+1])
+        plt.title('Fitness vs. Generation (Medium, Min, Max)')
+        plt.ylim([min(fitmin)-1.0,max(fitmin)+10.0])
+        save_plot(fig, name, 'Plot-{0}.png')
+        tclk = self.tclk.data[:, 0]
+        fig = plt.figure()
+        ax1 = fig.add_subplot(111)
+        ax1.plot(tclk)
+        plt.xlabel('Generation')
+        plt.ylabel('CPU Time (s)')
+        plt.xlim([1,len(gen)+1])
+        plt.title('Processing Time per Generation')
+        totaltime=sum(tclk)/3600.0
+        plt.text(0.5, 0.95,'Total Time for run = '+'%.3f' % round(totaltime, 3)+'hours',horizontalalignment='center',verticalalignment='top',transform = ax1.transAxes)
+        save_plot(fig, name, 'Plot-time-{0}.png')
+
+
+class FingerprintMinHistory(object):
+    """Fingerprint of the minimum individual of each generation from a FingerprintMin file.
+    Only the generations not plotted yet are kept."""
+
+    def __init__(self):
+        self.generation = 0
+        self.fingerprint = None
+        self.pending = []
+
+    def add_line(self, line):
+        if self.fingerprint is None:
+            self.fingerprint = numpy.array(line.strip()[1:-1].split(','), dtype=float)
         else:
-            pass
+            self.pending.append((self.generation, self.fingerprint, float(line)))
+            self.generation += 1
+            self.fingerprint = None
+
+    def plot(self, name, natoms):
+        for i, fpmin, enfp in self.pending:
+            fig=plt.figure()
+            ax=fig.add_subplot(111)
+            ax.plot(fpmin)
+            plt.xlabel('Distance, bins')
+            plt.ylabel('Intensity')
+            plt.title('Minimum Individual Fingerprint, Generation={0}'.format(i))
+            plt.text(0.5, 0.95,'Structure Energy = '+repr(enfp),horizontalalignment='center',verticalalignment='top',transform = ax.transAxes)
+            if max(fpmin)>100:
+                plt.ylim([0,100])
+            save_plot(fig, name, 'Plot-FPMin-{0}-gen{1}.png', i)
+        self.pending = []
+
+
+class FingerprintHistory(object):
+    """Fingerprint distances and energies of each generation from a Fingerprints file.
+    Only the generations not plotted yet are kept."""
+
+    def __init__(self):
+        self.generation = 0
+        self.pending = []
+
+    def add_line(self, line):
+        values = numpy.array(line.split(), dtype=float)
+        self.pending.append((self.generation, values[0::2], values[1::2]))
+        self.generation += 1
+
+    def plot(self, name, natoms):
+        for i, fpds, ens in self.pending:
+            fig=plt.figure()
+            ax=fig.add_subplot(111)
+            ax.scatter(fpds,ens-min(ens))
+            plt.xlabel('Fingerprint Cosine Distance from Minimum Energy Structure')
+            plt.ylabel('Energy Difference, eV')
+            plt.title('Fingerprint Distance vs. Energy, Generation={0}'.format(i))
+            save_plot(fig, name, 'Plot-FpDist-{0}-gen{1}.png', i)
+        self.pending = []
+
+
+class GenealogyHistory(object):
+    """Number of successful mutations of each type by generation from a Genealogy file"""
+    mutoptn = ['Lattice_Alteration_nn', 'Lattice_Alteration_rdrd', 'Lattice_Alteration_Group', 'Rotation_geo', 'ZP_Rotation', 'Random_Replacement']
+    mutopt = ['LANN','LARD','LAG','GR','ZPR','RGR']
+
+    def __init__(self):
+        self.count = RowArray(len(self.mutopt))
+        self.clist = [numpy.random.rand(3) for one in self.mutopt]
+
+    def add_line(self, line):
+        values = line.split()
+        if not values:
+            return
+        self.count.append([sum(1 for value in values if opt in value) for opt in self.mutopt])
+
+    def plot(self, name, natoms):
+        if len(self.count) == 0:
+            return
+        count = self.count.data.T
+        generation=numpy.arange(len(self.count))
+        width=1.0/(len(count)+1)
+        fig=plt.figure()
+        ax1=fig.add_subplot(111)
+        for i in range(len(count)):
+            ax1.bar(generation+width*i,count[i],width,color=self.clist[i],label=self.mutoptn[i])
+        plt.xlabel('Generation')
+        plt.ylabel('Successful Mutations')
+        ax1.legend(loc='upper left')
+        plt.title('Successful Mutations by Generation')
+        save_plot(fig, name, 'Plot-SuccessfulMutations-{0}.png')
+
+
+class BestEnergyHistory(object):
+    """Energies of the best structures from a Bests-energies file"""
+
+    def __init__(self):
+        self.benergies = RowArray(1)
+
+    def add_line(self, line):
+        if line.strip():
+            self.benergies.append([float(line)])
+
+    def plot(self, name, natoms):
+        if len(self.benergies) == 0:
+            return
+        benergies = self.benergies.data[:, 0]
+        fig=plt.figure()
+        ax1=fig.add_subplot(111)
+        ax1.scatter(range(len(benergies)),benergies)
+        plt.xlabel('Rank')
+        plt.ylabel('Total Energy, eV')
+        plt.title('Energy of Best Structures in Optimization')
+        save_plot(fig, name, 'Plot-{0}.png')
+
+
+def save_plot(fig, name, plotname, *args):
+    """Saves fig as plotname formatted with the base name of the data file"""
+    plotdir, base = os.path.split(name)
+    plt.savefig(os.path.join(plotdir, plotname.format(base, *args)))
+    plt.close(fig)
+
 
+if __name__ == '__main__':
+    # Refresh the plots of a running optimization:
+    # python -m StructOpt.post_processing.read_ouput folder [seconds between updates]
+    import sys
+    import time
+    monitor = OutputMonitor(sys.argv[1], plotdir=sys.argv[1])
+    interval = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    while True:
+        monitor.update()
+        monitor.plot()
+        time.sleep(interval)
@@ -1,6 +1,7 @@
 from StructOpt.fingerprinting import get_fingerprint
 from StructOpt.switches import selection_switch
 from StructOpt.tools import remove_duplicates
+from StructOpt.generate.Population import as_population
 import math
 
 def adapting(pop, Optimizer):
@@ -13,19 +14,19 @@ def adapting(pop, Optimizer):
     *** needs work ***
     """
 
-    fitlist = [one.fitness for one in pop]
+    population = as_population(pop)
+    fitlist = population.fitness
     nfitlist, nindices = remove_duplicates(fitlist, Optimizer.demin)
     STR = ''
-    newpop = []
     if len(nfitlist) != len(fitlist):
         STR += 'Predator: Removed total of {} from population\n'.format(repr(len(fitlist)-len(nfitlist)))
     otherlist = []
+    kept = set(nindices)
+    newpop = population.take(sorted(kept))
     for i in range(len(pop)):
-        if i not in nindices:
+        if i not in kept:
             STR += 'Predator: Removed {}\n'.format(repr(pop[i].history_index))
             otherlist.append(pop[i])
-        else:
-            newpop.append(pop[i])
     while len(newpop) < Optimizer.nindiv:
         Optimizer.output.write('Predator: Adding duplicates back')
         indiv = random.choice(otherlist)
@@ -33,8 +34,7 @@ def adapting(pop, Optimizer):
         STR += 'Predator: Adding mutated duplicates to new pop history = {}\n'.format(indiv.history_index)
     if Optimizer.natural_selection_scheme == 'fussf':
         for ind in newpop:
-            if ind.fingerprint == 0:
-                ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
+            ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
     if genrep >= Optimizer.reqrep*Optimizer.adaptbegin:
         ofusslim = Optimizer.fusslimit
         nfusslim = ofusslim*math.exp(-Optimizer.adaptmultiplier*float(Optimizer.genrep)/float(Optimizer.reqrep))
@@ -3,24 +3,25 @@ from StructOpt.switches import moves_switch, lambdacommamu
 from StructOpt.generate import gen_pop_box
 from StructOpt.generate.Individual import Individual
 from StructOpt.tools import remove_duplicates
+from StructOpt.generate.Population import as_population
 
 def fitpred_new(pop, Optimizer):
     """Predator function to identify similar structures based on energy and replace one with new structure."""
 
-    fitlist = [one.fitness for one in pop]
+    population = as_population(pop)
+    fitlist = population.fitness
     nfitlist, nindices = remove_duplicates(fitlist, Optimizer.demin)
     STR = ''
-    newpop = []
     if len(nfitlist) != len(fitlist):
         STR += 'Predator: Removed total of '+repr(len(fitlist)-len(nfitlist))+' from population\n'
 
     otherlist = []
+    kept = set(nindices)
+    newpop = population.take(sorted(kept))
     for i in range(len(pop)):
-        if i not in nindices:
+        if i not in kept:
             STR += 'Predator: Removed '+repr(pop[i].history_index)+'\n'
             otherlist.append(pop[i])
-        else:
-            newpop.append(pop[i])
 
     while len(newpop) < Optimizer.nindiv:
         if Optimizer.structure == 'Defect' or Optimizer.structure == 'Cluster':
@@ -45,8 +46,7 @@ def fitpred_new(pop, Optimizer):
 
     if Optimizer.natural_selection_scheme == 'fussf':
         for ind in newpop:
-            if ind.fingerprint == 0:
-                ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
+            ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
 
     if 'lambda, mu' in Optimizer.algorithm_type:
         try:
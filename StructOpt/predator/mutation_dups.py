@@ -2,24 +2,25 @@ from StructOpt.fingerprinting import get_fingerprint
 from StructOpt.tools import get_best
 from StructOpt.tools import remove_duplicates
 from StructOpt.switches import selection_switch, moves_switch, lambdacommamu
+from StructOpt.generate.Population import as_population
 import random
 
 def mutation_dups(pop, Optimizer):
     """Predator function that removes individuals based on fitness and mutates replacements"""
-    fitlist = [one.fitness for one in pop]
+    population = as_population(pop)
+    fitlist = population.fitness
     nfitlist, nindices = remove_duplicates(fitlist, Optimizer.demin)
     STR = ''
-    newpop = []
     if len(nfitlist) != len(fitlist):
         STR += 'Predator: Removed total of '+repr(len(fitlist)-len(nfitlist))+' from population\n'
 
     otherlist = []
+    kept = set(nindices)
+    newpop = population.take(sorted(kept))
     for i in range(len(pop)):
-        if i not in nindices:
+        if i not in kept:
             STR += 'Predator: Removed '+repr(pop[i].history_index)+'\n'
             otherlist.append(pop[i])
-        else:
-            newpop.append(pop[i])
 
     while len(newpop) < Optimizer.nindiv:
         indiv = random.choice(otherlist).duplicate()
@@ -33,8 +34,7 @@ def mutation_dups(pop, Optimizer):
 
     if Optimizer.natural_selection_scheme == 'fussf':
         for ind in newpop:
-            if ind.fingerprint == 0:
-                ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
+            ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
     if 'lambda, mu' in Optimizer.algorithm_type:
         try:
             mark = [ index for index, n in enumerate(nindices) if n > Optimizer.nindiv-1][0]
@@ -2,25 +2,26 @@ from StructOpt.tools import get_best
 from StructOpt.switches import selection_switch, moves_switch, lambdacommamu
 from StructOpt.fingerprinting import get_fingerprint
 from StructOpt.tools import remove_duplicates
+from StructOpt.generate.Population import as_population
 
 def mutation_dups_zp(pop, Optimizer):
     """Predator function that selects individuals that are too similar based fitness and
     replaces them with a zero point rotation of the structure"""
 
-    fitlist = [one.fitness for one in pop]
+    population = as_population(pop)
+    fitlist = population.fitness
     nfitlist, nindices = remove_duplicates(fitlist, Optimizer.demin)
     STR = ''
-    newpop = []
     if len(nfitlist) != len(fitlist):
         STR += 'Predator: Removed total of '+repr(len(fitlist)-len(nfitlist))+' from population\n'
 
     otherlist = []
+    kept = set(nindices)
+    newpop = population.take(sorted(kept))
     for i in range(len(pop)):
-        if i not in nindices:
+        if i not in kept:
             STR += 'Predator: Removed '+repr(pop[i].history_index)+'\n'
             otherlist.append(pop[i])
-        else:
-            newpop.append(pop[i])
 
     while len(newpop) < Optimizer.nindiv:
         indiv = random.choice(otherlist).duplicate()
@@ -35,8 +36,7 @@ def mutation_dups_zp(pop, Optimizer):
 
     if Optimizer.natural_selection_scheme == 'FUSSF':
         for ind in newpop:
-            if ind.fingerprint == 0:
-                ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
+            ind.fingerprint = get_fingerprint(Optimizer, ind, Optimizer.fpbin, Optimizer.fpcutoff)
 
     if 'lambda, mu' in Optimizer.algorithm_type:
         try:
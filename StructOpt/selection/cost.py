@@ -1,34 +1,24 @@
-from StructOpt.tools import get_best
-import random
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
 
 def cost(pop, nkeep, Optimizer):
 	"""Selection function to order and select structures based on simple relative cost"""
 
-	pop = get_best(pop,len(pop))
-	newpop = []
-	fitnesses = [ind.fitness for ind in pop]
-	prob = []
-	cumprob = []
-	try:
-		norms = [fit - pop[nkeep+1].fitness for fit in fitnesses[0:nkeep]]
-	except:
-		norms = [fit - pop[nkeep-1].fitness for fit in fitnesses[0:nkeep]]
-	sumn = sum(norms)
-	for i in range(nkeep):
-		prob.append(norms[i] / sumn)
-		cumprob.append(sum(prob))
-	prevcounter = []
-	for i in range(nkeep):
-		rand = random.random()
-		counter = 0
-		while cumprob[counter] < rand:
-			counter += 1
-		if counter in prevcounter:
-			a = random.choice(pop)
-			newpop.append(a)
-			prevcounter.append(a.index)
-		else:
-			newpop.append(pop[counter])
-			prevcounter.append(counter)
+	population = as_population(pop)
+	rng = get_generator(Optimizer)
+	order = population.sorted_indices()
+	fitnesses = population.fitness[order]
+	if nkeep+1 < len(order):
+		norms = fitnesses[:nkeep] - fitnesses[nkeep+1]
+	else:
+		norms = fitnesses[:nkeep] - fitnesses[nkeep-1]
+	cumprob = numpy.cumsum(norms / norms.sum())
 
-	return newpop
+	counters = numpy.searchsorted(cumprob, rng.uniform(size=nkeep))
+	counters = numpy.minimum(counters, nkeep-1)
+	# Structures drawn a second time are replaced by a random one
+	first = numpy.zeros(nkeep, dtype=bool)
+	first[numpy.unique(counters, return_index=True)[1]] = True
+	counters[~first] = rng.choice(len(order), size=(~first).sum())
+
+	return population.take(order[counters])
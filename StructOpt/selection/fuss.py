@@ -1,4 +1,5 @@
-import random
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
 
 def fuss(pop,nkeep, Optimizer):
 	"""Selection function to employ basic Fixed Uniform Selection Scheme to select and 
@@ -7,44 +8,77 @@ def fuss(pop,nkeep, Optimizer):
 	fuss point must reside within fusslimit of minimum energy structure
 	"""
 
-	fusslimit = Optimizer.fusslimit
+	population = as_population(pop)
+	return population.take(fuss_point(population.fitness, nkeep, Optimizer, Optimizer.fusslimit))
 
-	#picks one fuss point
-	newpop = []
 
-	# Collect fitnesses
-	fits = [ind.fitness for ind in pop]
-	minindex = min(xrange(len(fits)), key=fits.__getitem__)
+def fuss_point(fits, nkeep, Optimizer, fusslimit=None, minindex=None):
+	"""Picks one random point on the fitness line, at most fusslimit above the
+	minimum, and returns the positions of the nkeep fitnesses closest to it.
+	The position minindex of the lowest fitness, if not None, is always kept
+	in place of a random one of the others."""
+
+	rng = get_generator(Optimizer)
+	if minindex is None:
+		minindex = int(numpy.argmin(fits))
 
 	# Find min and max fitness
-	minf = min(fits)
-	maxf = max(fits)
-	if abs(maxf-minf) > fusslimit:
+	minf = fits.min()
+	maxf = fits.max()
+	if fusslimit is not None and abs(maxf-minf) > fusslimit:
 		maxf = minf + fusslimit
 
 	# Select random point on fitness line
-	pt = random.uniform(minf,maxf)
+	pt = rng.uniform(minf, maxf)
 
-	# Calculate the distance of each individual's fitness from that point
-	i = 0
-	distances = []
-	for fit in fits:
-		distances.append((abs(pt-fit),i))
-		i += 1
+	# Select individuals with lowest distance
+	indices = numpy.argsort(numpy.abs(pt - fits), kind='mergesort')[:nkeep].tolist()
 
-	# Sort distances from min to max
-	dlist = sorted(distances, key=lambda one: one[0])
+	# Always keep lowest energy individual
+	return keep_minimum(indices, minindex, rng)
 
-	# Select individuals with lowest distance
+
+def fuss_points(fits, nkeep, Optimizer, minf, maxf, maxrepeats=None):
+	"""Picks random points on the fitness line between minf and maxf and
+	returns the positions of the nkeep distinct individuals closest to them in
+	the order they were picked. With maxrepeats, once more than maxrepeats
+	points hit an individual already picked the remaining positions are filled
+	with the lowest positions not picked yet."""
+
+	rng = get_generator(Optimizer)
+	order = numpy.argsort(fits, kind='mergesort')
+	ordered = fits[order]
+	# The stable sort puts the lowest position first in a run of equal fitnesses
+	lowest = order[numpy.searchsorted(ordered, ordered, side='left')]
 	indices = []
-	for i in range(nkeep):
-		newpop.append(pop[dlist[i][1]])
-		indices.append(dlist[i][1])
+	picked = numpy.zeros(len(fits), dtype=bool)
+	repeats = 0
+	while len(indices) < nkeep:
+		pts = rng.uniform(minf, maxf, size=nkeep-len(indices))
+		# The closest fitness is one of the neighbours of pt in the sorted fitnesses,
+		# equal fitnesses go to the individual with the lowest position
+		right = numpy.clip(numpy.searchsorted(ordered, pts), 0, len(ordered)-1)
+		left = numpy.clip(right - 1, 0, len(ordered)-1)
+		nearest = numpy.where(numpy.abs(pts - ordered[left]) <= numpy.abs(ordered[right] - pts), left, right)
+		for one in lowest[nearest]:
+			if not picked[one]:
+				picked[one] = True
+				indices.append(one)
+			else:
+				repeats += 1
+		if maxrepeats is not None and repeats > maxrepeats:
+			others = numpy.flatnonzero(~picked)[:nkeep-len(indices)].tolist()
+			if len(others) < nkeep-len(indices):
+				others.extend(rng.choice(len(fits), size=nkeep-len(indices)-len(others)))
+			indices.extend(others)
+			break
+	return indices
 
-	# Always keep lowest energy individual
-	if minindex not in indices:
-		rm = random.choice(indices)
-		newpop = [pop[inx] for inx in indices if inx != rm]
-		newpop.append(pop[minindex])
 
-	return newpop
+def keep_minimum(indices, minindex, rng):
+	"""Replaces a random one of indices with minindex if it is missing"""
+	if minindex not in indices:
+		rm = indices[rng.choice(len(indices))]
+		indices = [inx for inx in indices if inx != rm]
+		indices.append(minindex)
+	return indices
@@ -1,4 +1,5 @@
-import random
+from StructOpt.generate.Population import as_population
+from StructOpt.selection.fuss import fuss_points
 
 def fuss1r(pop, nkeep, Optimizer):
 	"""Selection function to employ basic Fixed Uniform Selection Scheme to select and 
@@ -6,26 +7,10 @@ def fuss1r(pop, nkeep, Optimizer):
 	No constraint on fuss -> population will diverge
 	"""
 
-	newpop = []
-
-	# Collect fitnesses
-	fits = [ind.fitness for ind in pop]
-
-	# Identify the minimum and maximum fitness and index
-	minindex = min(xrange(len(fits)), key=fits.__getitem__)
-	minf = min(fits)
-	maxf = max(fits)
+	population = as_population(pop)
 
 	# Scale fitnesses to range 0-1
-	fits = [(f-minf)/(maxf-minf) for f in fits]
-	indices = []
-	while len(newpop) < nkeep:
-		pt = random.random()
-		if debug: print pt
-		distances = [abs(pt-fit) for fit in fits]
-		index = min(xrange(len(distances)), key=distances.__getitem__)
-		if index not in indices:
-			newpop.append(pop[index])
-			indices.append(index)
+	fits = population.fitness
+	fits = (fits - fits.min())/(fits.max() - fits.min())
 
-	return newpop
+	return population.take(fuss_points(fits, nkeep, Optimizer, 0.0, 1.0))
@@ -1,4 +1,5 @@
-import random
+from StructOpt.generate.Population import as_population, get_generator
+from StructOpt.selection.fuss import fuss_points, keep_minimum
 
 def fuss2(pop, nkeep, Optimizer):
     """Selection function to employ basic Fixed Uniform Selection Scheme to select and 
@@ -6,43 +7,14 @@ def fuss2(pop, nkeep, Optimizer):
 	fuss point must reside within fusslimit of minimum fitness
 	"""
 
-    newpop = []
-    fits = [ind.fitness for ind in pop]
-    minindex = min(xrange(len(fits)), key=fits.__getitem__)
-    minf = min(fits)
-    maxf = max(fits)
-    if abs(maxf - minf) > fusslimit:
-        maxf = minf + fusslimit
+    population = as_population(pop)
+    fits = population.fitness
+    minf = fits.min()
+    maxf = fits.max()
+    if abs(maxf - minf) > Optimizer.fusslimit:
+        maxf = minf + Optimizer.fusslimit
 
-    indices = []
-    loopcount = 0
-    while len(newpop) < nkeep:
-        pt = random.uniform(minf,maxf)
-        i = 0
-        distances = []
-        for fit in fits:
-            distances.append((abs(pt - fit),i))
-            i += 1
-        dlist = sorted(distances, key=lambda one: one[0])
-        index = dlist[0][1]
-        if index not in indices:
-            newpop.append(pop[index])
-            indices.append(index)
-        else:
-            loopcount += 1
-        if loopcount > 100:
-            indexl = [l for l in range(len(pop)) if l not in indices]
-            if len(indexl)==0:
-                randi = random.choice(range(len(pop)))
-                newpop.append(pop[randi])
-                indices.append(randi)
-            else:
-                newpop.append(pop[min(indexl)])
-                indices.append(min(indexl))
+    indices = fuss_points(fits, nkeep, Optimizer, minf, maxf, maxrepeats=100)
+    indices = keep_minimum(indices, population.argmin(), get_generator(Optimizer))
 
-    if minindex not in indices:
-        rm = random.choice(indices)
-        newpop = [pop[inx] for inx in indices if inx != rm]
-        newpop.append(pop[minindex])
-
-    return newpop
+    return population.take(indices)
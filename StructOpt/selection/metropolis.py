@@ -1,5 +1,5 @@
-import random
-import math
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
 
 def metropolis(pop, nkeep, Optimizer):
 	"""Selection function that applies metropolis algorithm to determine which individuals to keep
@@ -12,21 +12,19 @@ def metropolis(pop, nkeep, Optimizer):
 		newpop = new list of Individual class structures of length nkeep
 	"""
 
-	newpop = []
+	population = as_population(pop)
+	rng = get_generator(Optimizer)
 
 	# Identify temperature for algorithm
 	T = Optimizer.metropolis_temp
 
-	# Collect fitnesses
-	fits = [ind.fitness for ind in pop]
+	# Acceptance probability of each individual relative to the minimum fitness
+	accept = numpy.exp((population.fitness.min() - population.fitness)/T)
 
-	# Identify the minimum fitness
-	minf = min(fits)
-	print fits
-	while len(newpop)<nkeep:
-		ind = random.choice(pop)
-		r=random.random()
-		if r <= math.exp((minf-ind.fitness)/T):
-			newpop.append(ind)
+	indices = numpy.zeros(0, dtype=int)
+	while len(indices) < nkeep:
+		candidates = rng.choice(len(population), size=nkeep)
+		r = rng.uniform(size=nkeep)
+		indices = numpy.concatenate([indices, candidates[r <= accept[candidates]]])
 
-	return newpop
+	return population.take(indices[:nkeep])
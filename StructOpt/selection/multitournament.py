@@ -1,26 +1,16 @@
-import random
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
+from StructOpt.selection.tournament2 import no_repeat_winners
 
 def multitournament(pop, nkeep, Optimizer):
     """Multiple child tournament scheme for selection"""
 
-    tournsize = Optimizer.tournsize
-
     # Will allow repeats but not back to back
-    newpop = []
-    prevind = None
-    while len(newpop) < nkeep:
-        subgroup = []
-        for i in range(tournsize):
-            subgroup.append(random.choice(pop))
-        fitnesses = [ind.fitness for ind in subgroup]
-        mine = min(fitnesses)
-        select = [ind for ind in subgroup if ind.fitness==mine]
-        if select[0].index != prevind:
-            newpop.append(select[0])
-            prevind = select[0].index
+    population = as_population(pop)
+    winners = no_repeat_winners(population, nkeep, Optimizer)
 
-    for i in range(nkeep/4):
-        newpop.append(pop[0])
-        newpop.append(pop[random.randint(1, len(pop)-1)])
+    nextra = nkeep//4
+    extra = numpy.zeros(2*nextra, dtype=int)
+    extra[1::2] = get_generator(Optimizer).choice(numpy.arange(1, len(population)), size=nextra)
 
-    return newpop
+    return population.take(numpy.concatenate([winners, extra]))
@@ -1,13 +1,10 @@
-import random
-from StructOpt.tools import get_best
+from StructOpt.generate.Population import as_population, get_generator
 
 def random_pick(pop, nkeep, Optimizer):
 	"""Selection function that randomly choose structures from a population to survive."""
 
-	pop = get_best(pop, len(pop))
-	newpop = []
-	for i in range(nkeep):
-		sel = random.choice(pop)
-		newpop.append(sel)
+	population = as_population(pop)
+	order = population.sorted_indices()
+	picks = get_generator(Optimizer).choice(len(order), size=nkeep)
 
-	return newpop
+	return population.take(order[picks])
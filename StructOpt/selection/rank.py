@@ -1,33 +1,22 @@
-import random
-from StructOpt.tools import get_best
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
 
 def rank(pop, nkeep, Optimizer):
     """Selection function that chooses structures to survive and orders them based on their relative ranking"""
 
-    pop = get_best(pop, len(pop))
-    newpop = []
-    prob = []
-    cumprob = []
-    for i in range(len(pop)):
-        rankprob = float((nkeep-i)) / float(sum(range(nkeep+1)))
-        prob.append(rankprob)
-        cumprob.append(sum(prob))
+    population = as_population(pop)
+    rng = get_generator(Optimizer)
+    order = population.sorted_indices()
+    ranks = numpy.arange(len(order))
+    prob = (nkeep - ranks) / float(sum(range(nkeep+1)))
+    # Only the first nkeep probabilities are positive
+    cumprob = numpy.cumsum(prob)[:nkeep]
 
-    prevcounter = None
-    for i in range(nkeep):
-        rand = random.random()
-        counter = 0
-        while cumprob[counter] < rand:
-            counter += 1
-        if prevcounter==counter:
-            while True:
-                a = random.choice(pop)
-                if a.index != prevcounter:
-                    break
-            newpop.append(random.choice(pop))
-            prevcounter = a.index
-        else:
-            newpop.append(pop[counter])
-            prevcounter = counter
+    counters = numpy.searchsorted(cumprob, rng.uniform(size=nkeep))
+    counters = numpy.minimum(counters, len(cumprob)-1)
+    # A structure drawn twice in a row is replaced by a random one
+    repeat = numpy.zeros(nkeep, dtype=bool)
+    repeat[1:] = counters[1:] == counters[:-1]
+    counters[repeat] = rng.choice(len(order), size=repeat.sum())
 
-    return newpop
+    return population.take(order[counters])
@@ -1,18 +1,20 @@
-import random
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
 
 def tournament(pop, nkeep, Optimizer):
     """Selection function to order and choose individuals based on Tournament schemes
     Function will allow for repeats"""
 
-    tournsize = Optimizer.tournsize
-    newpop = []
-    for j in range(nkeep):
-        subgroup = []
-        for i in range(tournsize):
-            subgroup.append(random.choice(pop))
-        fitnesses = [ind.fitness for ind in subgroup]
-        mine = min(fitnesses)
-        select = [ind for ind in subgroup if ind.fitness==mine]
-        newpop.append(select[0])
+    population = as_population(pop)
+    rng = get_generator(Optimizer)
+    contestants = rng.choice(len(population), size=(nkeep, Optimizer.tournsize))
+    winners = tournament_winners(population, contestants)
 
-    return newpop
+    return population.take(winners)
+
+
+def tournament_winners(population, contestants):
+    """Returns the position of the winner of each tournament, a row of
+    contestants. Ties go to the first contestant with the lowest fitness."""
+    best = numpy.argmin(population.fitness[contestants], axis=1)
+    return contestants[numpy.arange(len(contestants)), best]
@@ -1,44 +1,39 @@
-import random
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
+from StructOpt.selection.tournament import tournament_winners
 
 def tournament1(pop, nkeep, Optimizer):
     """Selection function that orders and chooses individuals based on tournament schemes
     Function will attempt to prevent repeats"""
 
+    population = as_population(pop)
+    rng = get_generator(Optimizer)
+    n = len(population)
     tournsize = Optimizer.tournsize
-    fits = [ind.fitness for ind in pop]
-    minindex = min(xrange(len(fits)), key=fits.__getitem__)
-    newpop = []
-    indices = []
-    indexo = [ind.index for ind in pop]
-    for i in range(len(pop)):
-        pop[i].index = i
-
-    counter=0
-    while len(newpop) < nkeep:
-        subgroup = random.sample(pop,tournsize)
-        mine = min([ind.fitness for ind in subgroup])
-        select = [ind for ind in subgroup if ind.fitness==float(mine)][0]
-        if select.index not in indices:
-            newpop.append(select)
-            indices.append(select.index)
-        elif counter > 100000:
-            try:
-                nonpop = [ind for ind in pop if ind.index not in indices]
-                select = random.choice(nonpop)
-                newpop.append(select)
-                indices.append(select.index)
-            except:
-                select = random.choice(pop)
-                newpop.apend(select)
-                indices.append(select.index)
-        counter+=1
+    minindex = population.argmin()
 
-    for i in range(len(newpop)):
-        newpop[i].index = indexo[indices[i]]
+    indices = []
+    chosen = numpy.zeros(n, dtype=bool)
+    counter = 0
+    while len(indices) < nkeep and counter <= 100000:
+        # Tournaments are drawn without repeated contestants
+        contestants = rng.choice(n, size=(nkeep, tournsize))
+        distinct = (numpy.diff(numpy.sort(contestants, axis=1), axis=1) != 0).all(axis=1)
+        for one in tournament_winners(population, contestants[distinct]):
+            if not chosen[one] and len(indices) < nkeep:
+                chosen[one] = True
+                indices.append(one)
+        counter += nkeep
+    if len(indices) < nkeep:
+        # Fill up with random individuals, not yet chosen if there are any
+        others = numpy.flatnonzero(~chosen)
+        if len(others) == 0:
+            others = numpy.arange(n)
+        indices.extend(rng.choice(others, size=nkeep-len(indices), replace=len(others) < nkeep-len(indices)))
 
     if minindex not in indices:
-        rm = random.choice(indices)
-        newpop = [pop[inx] for inx in indices if inx != rm]
-        newpop.append(pop[minindex])
+        rm = indices[rng.choice(len(indices))]
+        indices = [inx for inx in indices if inx != rm]
+        indices.append(minindex)
 
-    return newpop
+    return population.take(indices)
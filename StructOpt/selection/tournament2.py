@@ -1,21 +1,31 @@
-import random
+import numpy
+from StructOpt.generate.Population import as_population, get_generator
+from StructOpt.selection.tournament import tournament_winners
 
 def tournament2(pop, nkeep, Optimizer):
     """Selection function to order and choose individuals based on Tournament schemes
     Function will allow repeats but not back to back"""
 
-    tournsize = Optimizer.tournsize
-    newpop = []
-    prevind = None
-    while len(newpop) < nkeep:
-        subgroup = []
-        for i in range(tournsize):
-            subgroup.append(random.choice(pop))
-        fitnesses = [ind.fitness for ind in subgroup]
-        mine = min(fitnesses)
-        select = [ind for ind in subgroup if ind.fitness==mine]
-        if select[0].index != prevind:
-            newpop.append(select[0])
-            prevind = select[0].index
+    population = as_population(pop)
+    return population.take(no_repeat_winners(population, nkeep, Optimizer))
+
 
-    return newpop
+def no_repeat_winners(population, nkeep, Optimizer):
+    """Returns the positions of nkeep tournament winners where no winner has
+    the same index as the one before it"""
+    rng = get_generator(Optimizer)
+    winners = numpy.zeros(0, dtype=int)
+    prevind = None
+    while len(winners) < nkeep:
+        contestants = rng.choice(len(population), size=(nkeep, Optimizer.tournsize))
+        batch = tournament_winners(population, contestants)
+        indices = population.index[batch]
+        # Dropping repeats within a run of equal indices leaves one of the run
+        keep = numpy.ones(len(batch), dtype=bool)
+        keep[1:] = indices[1:] != indices[:-1]
+        keep[0] = indices[0] != prevind
+        batch = batch[keep]
+        if len(batch):
+            prevind = population.index[batch[-1]]
+        winners = numpy.concatenate([winners, batch])
+    return winners[:nkeep]
@@ -1,3 +1,4 @@
+from StructOpt.tools.timing import timers
 from StructOpt.fileio.write_xyz import write_xyz
 import logging
 import pdb
@@ -14,34 +15,35 @@ def crossover_switch(child1, child2, Optimizer):
         s1 = child1[0].copy()
         s2 = child2[0].copy()
         if Optimizer.structure=='Defect':
-            s1.extend(child1.bulki.copy())
-            s2.extend(child2.bulki.copy())
+            s1.extend(child1.view('bulki'))
+            s2.extend(child2.view('bulki'))
         write_xyz(Optimizer.debugfile,s1,'First Cx Individual - Pre ')
         write_xyz(Optimizer.debugfile,s2,'Second Cx Individual - Pre')
     passflag = True
     scheme = Optimizer.cx_scheme
-    try:
-        exec "from StructOpt.crossover.{0} import {0}".format(scheme)
-        nchild1, nchild2 = eval('{0}(child1, child2, Optimizer)'.format(scheme))
-    except NameError, e:
-        logger.warning('Specified Crossover not one of the available options. Please check documentation and spelling! Crossover : {0}. {1}'.format(Optimizer.cx_scheme,e), exc_info=True)
-        print 'Name Error:', e
-        passflag = False
-    except Exception, e:
-        logger.error('Error in Crossover fuction : {0}. {1}'.format(Optimizer.cx_scheme,e), exc_info=True)
-        print 'Exception: ', e
-        passflag = False
-    if not passflag:
+    with timers.timer('crossover/' + scheme):
         try:
-            from StructOpt.crossover.cxtp import cxtp
-            nchild1, nchild2 = cxtp(child1, child2, Optimizer)
-            passflag = True
+            exec "from StructOpt.crossover.{0} import {0}".format(scheme)
+            nchild1, nchild2 = eval('{0}(child1, child2, Optimizer)'.format(scheme))
         except NameError, e:
-            logger.error('Error attempting to load back up cxTP Crossover.  Something very wrong!! {1}'.format(e), exc_info=True)
-            print 'CXTP Name Error: ', e
+            logger.warning('Specified Crossover not one of the available options. Please check documentation and spelling! Crossover : {0}. {1}'.format(Optimizer.cx_scheme,e), exc_info=True)
+            print 'Name Error:', e
+            passflag = False
         except Exception, e:
-            logger.error('Error in cxtp Crossover {0}'.format(e), exc_info=True)
-            print 'Exception: ',e
+            logger.error('Error in Crossover fuction : {0}. {1}'.format(Optimizer.cx_scheme,e), exc_info=True)
+            print 'Exception: ', e
+            passflag = False
+        if not passflag:
+            try:
+                from StructOpt.crossover.cxtp import cxtp
+                nchild1, nchild2 = cxtp(child1, child2, Optimizer)
+                passflag = True
+            except NameError, e:
+                logger.error('Error attempting to load back up cxTP Crossover.  Something very wrong!! {1}'.format(e), exc_info=True)
+                print 'CXTP Name Error: ', e
+            except Exception, e:
+                logger.error('Error in cxtp Crossover {0}'.format(e), exc_info=True)
+                print 'Exception: ',e
     if passflag:
         child1=nchild1
         child2=nchild2
@@ -56,8 +58,8 @@ def crossover_switch(child1, child2, Optimizer):
         s1 = child1[0].copy()
         s2 = child2[0].copy()
         if Optimizer.structure=='Defect':
-            s1.extend(child1.bulki.copy())
-            s2.extend(child2.bulki.copy())
+            s1.extend(child1.view('bulki'))
+            s2.extend(child2.view('bulki'))
         write_xyz(Optimizer.debugfile,s1,'First Cx Individual - Post')
         write_xyz(Optimizer.debugfile,s2,'Second Cx Individual - Post')
 
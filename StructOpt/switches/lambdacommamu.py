@@ -1,15 +1,15 @@
 from StructOpt.tools import get_best
+from StructOpt.generate.Population import as_population
 from StructOpt.switches import selection_switch
 
 def lambdacommamu(pop, Optimizer):
     """Selection function to employ a lambda,mu GA scheme
     """
-    fits = [ind.fitness for ind in pop]
-    minindex = [i for i in range(len(pop)) if pop[i].fitness==min(fits)]
+    minindex = as_population(pop).argmin()
     try:
         Optimizer.mark
     except:
-        Optimizer.mark = len(pop)/2
+        Optimizer.mark = len(pop)//2
     parents = pop[0:Optimizer.mark]
     offspring = pop[Optimizer.mark::]
     if minindex < Optimizer.mark:
@@ -1,3 +1,4 @@
+from StructOpt.tools.timing import timers
 import random
 import logging
 
@@ -9,18 +10,19 @@ def moves_switch(indiv, Optimizer):
         debug = True
     else:
         debug = False
-    try:
-       exec "from StructOpt.moves.{0} import {0}".format(scheme)
-       mutant = eval('{0}(indiv, Optimizer)'.format(scheme))
-       mutant.energy = 0
-       mutant.fitness = 0
-    except NameError, e:
-        logger.warning('Specified mutation not one of the available options. Please check documentation and spelling! SKIPPING. Mutation : {0}. {1}'.format(scheme,e), exc_info=True)
-        print 'Mutation Name error: ',e
-        print scheme
-        mutant = indiv
-    except Exception, e:
-        logger.error('Problem with mutation! SKIPPING. Mutation = {0}. {1}'.format(scheme,e), exc_info=True)
-        print 'Mutation Exception: ', e
-        mutant = indiv
+    with timers.timer('mutation/' + scheme):
+        try:
+           exec "from StructOpt.moves.{0} import {0}".format(scheme)
+           mutant = eval('{0}(indiv, Optimizer)'.format(scheme))
+           mutant.energy = 0
+           mutant.fitness = 0
+        except NameError, e:
+            logger.warning('Specified mutation not one of the available options. Please check documentation and spelling! SKIPPING. Mutation : {0}. {1}'.format(scheme,e), exc_info=True)
+            print 'Mutation Name error: ',e
+            print scheme
+            mutant = indiv
+        except Exception, e:
+            logger.error('Problem with mutation! SKIPPING. Mutation = {0}. {1}'.format(scheme,e), exc_info=True)
+            print 'Mutation Exception: ', e
+            mutant = indiv
     return mutant, scheme
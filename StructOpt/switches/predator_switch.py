@@ -2,6 +2,8 @@ from StructOpt.tools import get_best
 from StructOpt.switches import selection_switch
 from StructOpt.switches import lambdacommamu
 from StructOpt.tools import remove_duplicates
+from StructOpt.generate.Population import as_population
+from StructOpt.tools.timing import timers
 import logging
 import random
 import pdb
@@ -12,36 +14,37 @@ def predator_switch(pop,Optimizer):
     scheme = Optimizer.predator
     logger.info('Applying predator to population with initial size = {0}'.format(len(pop)))
     STR = 'PREDATOR\n'
-    try:
-       exec "from StructOpt.predator.{0} import {0}".format(scheme)
-       pop, STR = eval('{0}(pop, Optimizer)'.format(scheme))
-       passflag = True
-    except NameError, e:
-        logger.warning('Specified predator not one of the available options. Please check documentation and spelling! Predator : {0}. {1}'.format(scheme,e), exc_info=True)
-        passflag = False
-        STR+='Specified predator not one of the available options. Please check documentation and spelling! Predator : '+repr(scheme)
-        STR+=repr(e)+'\n'
-    except Exception, e:
-        logger.error('ERROR: Issue in Predator Scheme. Predator = {0}. {1}'.format(scheme,e), exc_info=True)
-        print 'ERROR: Issue in Predator Scheme. Predator = '+repr(scheme)
-        print e
-        passflag = False
-        STR+=''
+    with timers.timer('predator/' + scheme):
+        try:
+           exec "from StructOpt.predator.{0} import {0}".format(scheme)
+           pop, STR = eval('{0}(pop, Optimizer)'.format(scheme))
+           passflag = True
+        except NameError, e:
+            logger.warning('Specified predator not one of the available options. Please check documentation and spelling! Predator : {0}. {1}'.format(scheme,e), exc_info=True)
+            passflag = False
+            STR+='Specified predator not one of the available options. Please check documentation and spelling! Predator : '+repr(scheme)
+            STR+=repr(e)+'\n'
+        except Exception, e:
+            logger.error('ERROR: Issue in Predator Scheme. Predator = {0}. {1}'.format(scheme,e), exc_info=True)
+            print 'ERROR: Issue in Predator Scheme. Predator = '+repr(scheme)
+            print e
+            passflag = False
+            STR+=''
     if not passflag:
         logger.warning('Issue in predator. Attempting basic Fitpred')
-        fitlist = [one.fitness for one in pop]
+        population = as_population(pop)
+        fitlist = population.fitness
         nfitlist, nindices = remove_duplicates(fitlist, Optimizer.demin)
         STR += 'Issue in predator. Attempting basic Fitpred\n'
-        newpop = []
         if len(nfitlist) != len(fitlist):
             STR+='Predator: Removed total of '+repr(len(fitlist)-len(nfitlist))+' from population\n'
         otherlist = []
+        kept = set(nindices)
+        newpop = population.take(sorted(kept))
         for i in range(len(pop)):
-            if i not in nindices:
+            if i not in kept:
                 STR+='Predator: Removed '+repr(pop[i].history_index)+'\n'
                 otherlist.append(pop[i])
-            else:
-                newpop.append(pop[i])
         while len(newpop) < Optimizer.nindiv:
             STR+='Predator: Adding duplicates back\n'
             choice = random.choice(otherlist)
@@ -51,8 +54,7 @@ def predator_switch(pop,Optimizer):
         nindices.sort()
         if Optimizer.natural_selection_scheme=='fussf':
             for ind in newpop:
-                if ind.fingerprint == 0:
-                    ind.fingerprint = get_fingerprint(Optimizer,ind,Optimizer.fpbin,Optimizer.fpcutoff)
+                ind.fingerprint = get_fingerprint(Optimizer,ind,Optimizer.fpbin,Optimizer.fpcutoff)
         if 'lambda,mu' in Optimizer.algorithm_type:
             try:
                 mark = [ index for index,n in enumerate(nindices) if n > Optimizer.nindiv-1][0]
@@ -1,7 +1,9 @@
 import os
+import bisect
 from operator import attrgetter
 from ase import Atom, Atoms
 from StructOpt.fileio.write_xyz import write_xyz
+from StructOpt.fingerprinting import get_fingerprint, fingerprint_dist
 import logging
 try:
     from mpi4py import MPI
@@ -10,6 +12,11 @@ except:
 
 def BestInds(pop, bests, Optimizer, writefile = False, fname = None):
     """Function to keep track of the best individuals throughout an optimization
+    The best list is kept sorted by fitness and bounded to number_of_bests structures.
+    New structures are placed by bisection of the fitnesses of the list, which takes
+    O(log n) comparisons but O(n) for list.insert to shift the entries after them,
+    n = number_of_bests. The list stays sorted rather than a heap since
+    best_duplicate looks up every structure within demin of a fitness.
     Inputs:
         pop = list of Individual class structures to be compared
         bests = list of previously obtained best structures
@@ -24,64 +31,23 @@ def BestInds(pop, bests, Optimizer, writefile = False, fname = None):
     logger.info('best_inds_list recieved population with length = {0} and best list with length = {1} for generation {2}'.format(
         len(pop), len(bests), Optimizer.generation))
 
-    pop = sorted(pop, key = attrgetter('fitness'))
-    tol = Optimizer.demin
-    if len(bests)!= 0:
-        bfits = [ind.fitness for ind in bests]
-        # Identify the fitnesses in the population
-        popfits = [ind.fitness for ind in pop]
-        # Initialize a list for individuals to not be added to best list
-        indices = []
-        for i in range(len(popfits)):
-            for j in range(len(bfits)):
-                if popfits[i] == bfits[j]:
-                    indices.append(i)
-                if popfits[i] < bfits[j]:
-                    diff = abs(bfits[j] - popfits[i])
-                    diff2 = abs(bfits[j-1] - popfits[i])
-                    if diff > tol:
-                        if diff2 > tol:
-                            if i not in indices:
-                                bests.append(pop[i])
-                                logger.info('Best list found new structure for List HI = {0}'.format(pop[i].history_index))
-                                indices.append(i)
-                                b = bfits[0:j]
-                                b.append(pop[i].fitness)
-                                b.extend(bfits[j::])
-                                bfits = b
-                        else:
-                            indices.append(i)
-        bests = sorted(bests, key = attrgetter('fitness'))
-        if len(bests) < Optimizer.number_of_bests:
-            bmax = bests[len(bests)-1].fitness
-            for i in range(len(popfits)):
-                if popfits[i] > bmax:
-                    diff = abs(popfits[i]-bmax)
-                    if diff > tol:
-                        bests.append(pop[i])
-                        logger.info('Appending best list with lower energy structure')
-                        bmax = pop[i].fitness
-        else:
-            logger.info('Removing extra {0} structures from best list'.format(len(bests)-Optimizer.number_of_bests))
-            bests = bests[0:Optimizer.number_of_bests]
-        bfits = [ind.fitness for ind in bests]
-    else:
-        bests = []
-        bfits = []
-        for one in pop:
-            fit = one.fitness
-            if len(bfits) == 0:
-                bests.append(one)
-                logger.info('Adding new structure to best list HI = {0}'.format(one.history_index))
-                bfits.append(fit)
-            else:
-                diff = abs(bfits[-1]-fit)
-                if diff > tol:
-                    bests.append(one)
-                    bfits.append(fit)
-        if len(bests) > Optimizer.number_of_bests:
-            logger.info('Removing extra {0} structures from best list'.format(len(bests)-Optimizer.number_of_bests))
-            bests = bests[0:Optimizer.number_of_bests]
+    nbests = Optimizer.number_of_bests
+    bests = sorted(bests, key = attrgetter('fitness'))
+    bfits = [ind.fitness for ind in bests]
+    # Only evaluated structures are kept, not fitnesses predicted by the surrogate model
+    for one in sorted([ind for ind in pop if not ind.predicted], key = attrgetter('fitness')):
+        # The population is sorted, so nothing after a rejected structure fits in a full list
+        if len(bests) >= nbests and (nbests == 0 or one.fitness >= bfits[-1]):
+            break
+        if best_duplicate(one, bests, bfits, Optimizer):
+            continue
+        index = bisect.bisect_right(bfits, one.fitness)
+        bfits.insert(index, one.fitness)
+        bests.insert(index, one)
+        logger.info('Best list found new structure for List HI = {0}'.format(one.history_index))
+        if len(bests) > nbests:
+            bfits.pop()
+            bests.pop()
 
     if writefile == True:
         if fname == None:
@@ -102,7 +68,7 @@ def BestInds(pop, bests, Optimizer, writefile = False, fname = None):
             if Optimizer.structure == 'Defect':
                 cbulk = Atoms()
                 cbulk.extend(one[0])
-                cbulk.extend(one.bulki)
+                cbulk.extend(one.view('bulki'))
                 write_xyz(bestfile, cbulk, one.energy)
             else:
                 write_xyz(bestfile, one[0], one.energy)
@@ -112,3 +78,27 @@ def BestInds(pop, bests, Optimizer, writefile = False, fname = None):
 
     return bests
 
+
+def best_duplicate(indiv, bests, bfits, Optimizer):
+    """Function to check whether an individual duplicates a structure in the best list
+    Inputs:
+        indiv = Individual class structure to check
+        bests = list of best structures sorted by fitness
+        bfits = list of the fitnesses of bests
+        Optimizer = Optimizer class structure that contains key parameters
+    Outputs:
+        True if the fitness of indiv is within demin of a structure in bests and, when
+        best_inds_fptol is set, their fingerprints are also within best_inds_fptol
+    """
+    lo = bisect.bisect_left(bfits, indiv.fitness - Optimizer.demin)
+    hi = bisect.bisect_right(bfits, indiv.fitness + Optimizer.demin)
+    if lo == hi:
+        return False
+    if not Optimizer.best_inds_fptol:
+        return True
+    fp = get_fingerprint(Optimizer, indiv, Optimizer.fpbin, Optimizer.fpcutoff)
+    for other in bests[lo:hi]:
+        fpo = get_fingerprint(Optimizer, other, Optimizer.fpbin, Optimizer.fpcutoff)
+        if fingerprint_dist(fp, fpo) <= Optimizer.best_inds_fptol:
+            return True
+    return False
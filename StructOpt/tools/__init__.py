@@ -13,8 +13,11 @@ from find_top_layer import *
 from get_best import *
 from get_cluster_volume import *
 from lammps import *
+from lammps_lib import *
+from mock_lammps import *
 from parallelization import *
 from parallel_mpi4py import *
+from periodic_tree import *
 from position_average import *
 from rattle import *
 from remove_duplicates import *
@@ -22,3 +25,6 @@ from serial_for import *
 from setup_energy_calculator import *
 from setup_fixed_region_calculator import *
 from shift_atoms import *
+from surrogate import *
+from timing import *
+from work_queue import *
@@ -2,7 +2,10 @@ import os
 from ase import Atom, Atoms
 from ase.optimize import BFGS
 from ase.units import GPa
-from ase.calculators.neighborlist import NeighborList
+try:
+    from ase.neighborlist import neighbor_list
+except ImportError:
+    pass
 from StructOpt.fileio.write_xyz import write_xyz
 from StructOpt.tools.find_defects import find_defects
 from StructOpt.tools.check_cell_type import check_cell_type
@@ -29,12 +32,15 @@ def check_structures(Optimizer, indiv):
         stro = ''
         for ind in range(len(indiv)):
             totalsol = indiv[ind][0].copy()
+            # Individual whose cached neighbor list still applies to totalsol
+            cached = indiv[ind]
             if Optimizer.constrain_position:
                 if Optimizer.structure == 'Defect':
                     totalsol, stro = constrain_positions(totalsol, Optimizer.solidbulk, Optimizer.sf)
+                    cached = None
             min_len = 0.7
             if not Optimizer.fixed_region:
-                totalsol, stro = check_min_dist(Optimizer, totalsol, Optimizer.structure, totalsol.get_number_of_atoms(), min_len, stro)
+                totalsol, stro = check_min_dist(Optimizer, totalsol, Optimizer.structure, totalsol.get_number_of_atoms(), min_len, stro, cached)
             indiv[ind][0] = totalsol.copy()
         return indiv, stro
 
@@ -60,37 +66,15 @@ def constrain_positions(indiv, bulk, sf):
         return ts, STR
 
 
-def check_min_dist(Optimizer, totalsol, type='Defect', nat=None, min_len=0.7, STR=''):
+def check_min_dist(Optimizer, totalsol, type='Defect', nat=None, min_len=0.7, STR='', indiv=None):
         if type == 'Defect' or type == 'Crystal' or type == 'Surface':
             if nat == None:
                 nat = len(totalsol)
-            cutoffs = [2.0 for one in totalsol]
-            nl = NeighborList(cutoffs, bothways = True, self_interaction = False)
-            nl.update(totalsol)
-            for one in totalsol[0:nat]:
-                nbatoms = Atoms()
-                nbatoms.append(one)
-                indices, offsets = nl.get_neighbors(one.index)
-                for index, d in zip(indices, offsets):
-                    index = int(index)
-                    sym = totalsol[index].symbol
-                    pos = totalsol[index].position + numpy.dot(d, totalsol.get_cell())
-                    at = Atom(symbol = sym, position = pos)
-                    nbatoms.append(at)
-                while True:
-                    dflag = False
-                    for i in range(1, len(nbatoms)):
-                        d = nbatoms.get_distance(0, i)
-                        if d < min_len:
-                            nbatoms.set_distance(0, i, min_len+.01, fix = 0.5)
-                            STR += '--- WARNING: Atoms too close (<0.7A) - Implement Move ---\n'
-                            dflag = True
-                    if dflag == False:
-                        break
-                for i in range(len(indices)):
-                    totalsol[indices[i]].position = nbatoms[i+1].position
-                totalsol[one.index].position = nbatoms[0].position
-                nl.update(totalsol)
+            totalsol, npairs, nclose = separate_close_atoms(totalsol, nat, min_len, indiv=indiv)
+            if npairs > 0:
+                STR += '--- WARNING: {0} pairs of atoms too close (<{1}A) - Implement Move ---\n'.format(npairs, min_len)
+            if nclose > 0:
+                STR += '--- WARNING: {0} pairs of atoms still too close (<{1}A) after separation ---\n'.format(nclose, min_len)
         elif type == 'Cluster':
             if not 'LAMMPS' in Optimizer.modules:
                 for i in range(len(totalsol)):
@@ -142,3 +126,61 @@ def check_min_dist(Optimizer, totalsol, type='Defect', nat=None, min_len=0.7, ST
         else:
             print 'WARNING: In Check_Min_Dist in EvalEnergy: Structure Type not recognized'
         return totalsol, STR
+
+
+def get_neighbor_list(indiv, quantities, cutoff):
+    """Returns ase.neighborlist.neighbor_list(quantities, indiv[0], cutoff),
+    calculated only if it is not cached for the current structure of indiv"""
+    name = ('neighbor_list', quantities, cutoff)
+    return indiv.get_descriptor(name, neighbor_list, quantities, indiv[0], cutoff)
+
+
+def separate_close_atoms(totalsol, nat=None, min_len=0.7, maxiter=100, indiv=None):
+    """Pushes apart all pairs of atoms closer than min_len that involve one of
+    the first nat atoms, taking periodic images into account.
+    All close pairs are found at once with the cell list of ase.neighborlist and
+    every pair is moved symmetrically to min_len+0.01 in a single vectorized
+    update. This is repeated until no close pairs remain or maxiter is reached.
+    Inputs:
+        totalsol = ASE atoms class to check, modified in place
+        nat = number of atoms at the start of totalsol to check (default all)
+        min_len = minimum allowed distance between atoms
+        maxiter = maximum number of update rounds
+        indiv = Individual class object with the same structure as totalsol
+            whose cached neighbor list is used in the first round (optional)
+    Outputs:
+        totalsol = ASE atoms class without close pairs
+        npairs = number of distinct pairs of atoms that were moved apart
+        nclose = number of pairs still closer than min_len after maxiter rounds
+    """
+    if nat == None:
+        nat = len(totalsol)
+    R = totalsol.get_positions()
+    fixed = set()
+    nclose = 0
+    for iteration in range(maxiter + 1):
+        if iteration == 0 and indiv is not None:
+            i, j, D = get_neighbor_list(indiv, 'ijD', min_len)
+        else:
+            i, j, D = neighbor_list('ijD', totalsol, min_len)
+        # Every pair appears twice, keep it once
+        keep = (i < j) & ((i < nat) | (j < nat))
+        i, j, D = i[keep], j[keep], D[keep]
+        if len(i) == 0:
+            break
+        if iteration == maxiter:
+            nclose = len(i)
+            break
+        fixed.update(zip(i.tolist(), j.tolist()))
+        d = numpy.sqrt((D**2).sum(axis=1))
+        # Atoms on top of each other are separated along x from a distance of 0
+        overlap = d < 1e-8
+        norm = d.copy()
+        D[overlap] = [1.0, 0.0, 0.0]
+        norm[overlap] = 1.0
+        d[overlap] = 0.0
+        shift = (0.5*(min_len + 0.01 - d)/norm)[:, numpy.newaxis] * D
+        numpy.add.at(R, i, -shift)
+        numpy.add.at(R, j, shift)
+        totalsol.set_positions(R)
+    return totalsol, len(fixed), nclose
@@ -11,7 +11,7 @@ def compose_structure(Optimizer, individ):
 
     if Optimizer.structure == 'Defect':
         indi = indiv.copy()
-        bulk = individ.bulki
+        bulk = individ.view('bulki')
         nat = indi.get_number_of_atoms()
         if debug:
             logger.info('Extending defect structure to include bulk len(r1+r2) = {0} len(bulk) = {1}'.format(nat, len(bulk)))
@@ -26,9 +26,9 @@ def compose_structure(Optimizer, individ):
         totalsol = Atoms()
         totalsol.extend(indiv)
         nat = indiv.get_number_of_atoms()
-        totalsol.extend(individ.bulki)
+        totalsol.extend(individ.view('bulki'))
         if debug:
-            logger.info('Extending surface structure to include bulk len(r1+r2) = {0} len(bulk) = {1}'.format(nat, len(individ.bulki)))
+            logger.info('Extending surface structure to include bulk len(r1+r2) = {0} len(bulk) = {1}'.format(nat, len(individ.view('bulki'))))
         for sym, c, m, u in Optimizer.atomlist:
             nc = len([atm for atm in totalsol if atm.symbol == sym])
             STR += 'Surface-Bulk configuration contains '+repr(nc)+' '+repr(sym)+' atoms\n'
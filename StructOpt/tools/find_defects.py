@@ -1,13 +1,13 @@
+import copy
 from ase import Atom, Atoms
-from ase.calculators.neighborlist import NeighborList
 import numpy
-import copy
 from StructOpt.fileio.write_xyz import write_xyz
-from StructOpt.tools.calc_dist import calc_dist
+from StructOpt.tools.periodic_tree import PeriodicTree, get_bulk_tree
 
-def find_defects(solid, bulko, rcutoff, atomlistcheck = False, trackvacs = False, trackswaps = False, debug = False, dcheck = 0.6):
+def find_defects(solid, bulko, rcutoff, atomlistcheck = False, trackvacs = False, trackswaps = False, debug = False, dcheck = 0.6, return_indices = False):
     """Function to find interstitials, vacancies, and substitutional atoms (swaps) in a defected structure.
-    Identifies species by comparison to perfect structure.
+    Identifies species by matching every atom to the nearest site of the perfect structure
+    with a single query of the KD-tree of the perfect structure.
     Inputs:
         solid = ASE atoms class for defected structure
         bulko = ASE atoms class for perfect structure
@@ -15,65 +15,58 @@ def find_defects(solid, bulko, rcutoff, atomlistcheck = False, trackvacs = False
         atomlistcheck = False/list of atom types and concentrations according to atomlist format
         trackvacs = True/False whether or not to identify vacancies in defect
         trackswaps = True/False whether or not to identify substitutional defects
-        debug = False/file object to write debug structures"""
-
-    # Combine perfect and defect structures together
-    b = bulko.copy()
-    b.extend(solid)
-    b.set_pbc(True)
+        debug = False/file object to write debug structures
+        dcheck = float value of the distance within which an atom occupies a site
+        return_indices = True/False whether or not to also return the index arrays
+    Outputs:
+        indiv = ASE atoms class for the defect and its surroundings
+        bulki = ASE atoms class for the rest of the defected structure
+        vacant = ASE atoms class for the vacant sites
+        swaps = ASE atoms class for the substitutional atoms
+        stro = string of output
+        indices = dictionary of index arrays, only if return_indices is True:
+            interstitials, swaps = indices of the atoms in solid
+            vacancies = indices of the sites in bulko
+            indiv, bulki = indices of the atoms of indiv and bulki in solid"""
 
     # Debug: Write solid and bulko to file
     if debug:
+        b = bulko.copy()
+        b.extend(solid)
+        b.set_pbc(True)
         print len(bulko)
         write_xyz(debug, b, 'Find Ints: Solid and Bulko')
 
-    # Identify nearest neighbor atoms for each atom in perfect structure
-    ntot = len(bulko)
-    ctoff1 = [1.2 for one in b]
-    nl = NeighborList(ctoff1, bothways = True, self_interaction = False)
-    nl.update(b)
-    slist = []
-    blist = []
-    wlist = []
-
-    # Loop over each atom in perfect structure
-    for one in range(ntot):
-        indices, offsets = nl.get_neighbors(one)
-        for index, d in zip(indices, offsets):
-            index = int(index)
-            if index >= ntot:
-                pos = b[index].position + numpy.dot(d, bulko.get_cell())
-                natm1 = Atom(position = pos)
-                dist, dx, dy, dz = calc_dist(b[one], natm1)
-                if dist <= dcheck:
-                    # Assume atoms closer than 0.6 Angstroms to be equivalent
-                    slist.append(index-ntot)
-                    blist.append(one)
-                    if b[one].symbol == b[index].symbol:
-                        wlist.append(index-ntot)
+    # Match each atom to the nearest site of the perfect structure
+    # Assume atoms closer than dcheck Angstroms to a site to be equivalent
+    ntot = len(solid)
+    dists, sites = get_bulk_tree(bulko).query(solid.get_positions(), distance_upper_bound = dcheck)
+    matched = sites >= 0
+    symbols = numpy.array(solid.get_chemical_symbols())
+    bulksymbols = numpy.array(bulko.get_chemical_symbols())
+    same = numpy.zeros(ntot, dtype = bool)
+    same[matched] = symbols[matched] == bulksymbols[sites[matched]]
+    occupied = numpy.zeros(len(bulko), dtype = bool)
+    occupied[sites[matched]] = True
 
     # Identify those atoms corresponding to interstitials, vacancies, and substitutions
-    oslist = [atm.index for atm in solid if atm.index not in slist]
-    vlist = [atm.index for atm in bulko if atm.index not in blist]
-    swlist = [atm.index for atm in solid if atm.index not in wlist and atm.index not in oslist]
+    ilist = numpy.flatnonzero(~matched)
+    vlist = numpy.flatnonzero(~occupied)
+    swlist = numpy.flatnonzero(matched & ~same)
+    oslist = list(ilist)
 
     # Create Atoms objects for each identified defect
-    ntot = len(solid)
-    cluster = Atoms()
-    for one in oslist:
-        cluster.append(solid[one])
+    cluster = atoms_subset(solid, ilist)
     vacant = Atoms()
     if trackvacs == True:
-        for one in vlist:
-            vacant.append(Atom(symbol = bulko[one].symbol, position = bulko[one].position))
-            solid.append(Atom(symbol = 'X', position = bulko[one].position))
-            oslist.append(len(solid)-1)
+        vacant = Atoms(symbols = list(bulksymbols[vlist]), positions = bulko.get_positions()[vlist])
+        solid.extend(Atoms(symbols = ['X']*len(vlist), positions = bulko.get_positions()[vlist]))
+        oslist.extend(range(ntot, len(solid)))
         stro = 'Cluster Identified with length = {0}\nIdentified {1} vacancies\n'.format(len(cluster), len(vlist))
     swaps = Atoms()
     if trackswaps == True:
-        for one in swlist:
-            swaps.append(solid[one])
-            oslist.append(one)
+        swaps = atoms_subset(solid, swlist)
+        oslist.extend(swlist)
         stro = 'Cluster Identified with length = {0}\nIdentified {1} swaps\n'.format(len(cluster), len(swlist))
     else:
         stro = 'Cluster Identified with length = {0}\n'.format(len(cluster))
@@ -85,115 +78,74 @@ def find_defects(solid, bulko, rcutoff, atomlistcheck = False, trackvacs = False
         debug.flush()
         print('Found cluster size = ', len(b))
 
+    # Defect atoms of the defected structure, in order of identification
+    oslist = numpy.array(oslist, dtype = int)
+    repinds = []
+    isdefect = numpy.zeros(len(solid), dtype = bool)
+    for one in oslist:
+        if one < ntot and not isdefect[one]:
+            repinds.append(one)
+            isdefect[one] = True
+    nbatmsd = [(0, one) for one in repinds]
+
     # Identify atoms surrounding the identified defects in the defected structure
-    box = Atoms()
-    bulki = Atoms()
+    if rcutoff != 0 or atomlistcheck:
+        tree = PeriodicTree(solid.get_positions(), solid.get_cell())
+    # Range of an ASE NeighborList with cutoffs of max(rcutoff, 2.0): the skin of 0.3 is added to each cutoff
+    rneighbor = 2*(max(rcutoff, 2.0) + 0.3)
     if rcutoff != 0:
-        if rcutoff > 2.0:
-            cutoffs = [rcutoff for one in solid]
-        else:
-            cutoffs = [2.0 for one in solid]
         solid.set_pbc(True)
-        nl = NeighborList(cutoffs, bothways = True, self_interaction = False)
-        nl.update(solid)
-        nbatmsd = []
-        repinds = []
-        for one in oslist:
-            if one not in repinds:
-                if one < ntot:
-                    nbatmsd.append((0, one))
-                    repinds.append(one)
-        for one in oslist:
-            indices, offsets = nl.get_neighbors(one)
-            for index, d in zip(indices, offsets):
-                index = int(index)
-                if index not in repinds and index < ntot:
-                    opos = copy.copy(solid[index].position)
-                    solid[index].position = solid[index].position + numpy.dot(d, solid.get_cell())
-                    dist = solid.get_distance(one, index)
-                    solid[index].position = opos
-                    if dist <= rcutoff:
-                        nbatmsd.append((dist, index))
-                        repinds.append(index)
-    else:
-        nbatmsd = []
-        repinds = []
-        for one in oslist:
-            if one not in repinds:
-                if one < ntot:
-                    nbatmsd.append((0, one))
-                    repinds.append(one)
+        defs, nbrs, dists = tree.query_pairs(solid.get_positions()[oslist], rcutoff)
+        keep = (nbrs < ntot) & ~isdefect[nbrs]
+        # Distance of each surrounding atom to the closest defect atom
+        dmin = numpy.empty(ntot)
+        dmin.fill(numpy.inf)
+        numpy.minimum.at(dmin, nbrs[keep], dists[keep])
+        nbatmsd += [(dmin[one], one) for one in numpy.flatnonzero(numpy.isfinite(dmin))]
     nbatmsd = sorted(nbatmsd, key = lambda one:one[0], reverse = True)
     indices = []
-    natomsbox = 0
+    inbox = numpy.zeros(ntot, dtype = bool)
 
     # Select only atoms closest to defects that satisfy concentrations specified by atomlist given in atomlistcheck
     if atomlistcheck:
         for sym, c, m, u in atomlistcheck:
-            i = 0
-            nbsym = [one for one in nbatmsd if solid[one[1]].symbol == sym]
+            nbsym = [one for one in nbatmsd if symbols[one[1]] == sym]
             if len(nbsym) > c:
-                while i < c:
-                    a = nbsym.pop()
-                    box.append(solid[a[1]])
-                    indices.append(a[1])
-                    i += 1
+                selected = [nbsym.pop()[1] for i in range(c)]
             else:
-                for a in nbsym:
-                    box.append(solid[a[1]])
-                    indices.append(a[1])
-                    i += 1
-                if len(box)-natomsbox < c:
-                    try:
-                        while True:
-                            for n in range(len(nbatmsd)-1, -1, -1):
-                                inds, offsets = nl.get_neighbors(nbatmsd[n][1])
-                                for one, d in zip(inds, offsets):
-                                    if len(box)-natomsbox < c:
-                                        if one not in indices and one < ntot and solid[one].symbol == sym:
-                                            opos = copy.copy(solid[one].position)
-                                            solid[one].position = solid[one].position + numpy.dot(d, solid.get_cell())
-                                            dist = solid.get_distance(nbatmsd[n][1], one)
-                                            solid[one].position = opos
-                                            if dist <= rcutoff*5.0:
-                                                box.append(solid[one])
-                                                indices.append(one)
-                                    else:
-                                        raise StopIteration()
-                                for one, d in zip(inds, offsets):
-                                    if len(box)-natomsbox < c:
-                                        if one not in indices and one < ntot and solid[one].symbol == sym:
-                                            opos = copy.copy(solid[one].position)
-                                            solid[one].position = solid[one].position + numpy.dot(d, solid.get_cell())
-                                            dist = solid.get_distance(nbatmsd[n][1], one)
-                                            solid[one].position = opos
-                                            box.append(solid[one])
-                                            indices.append(one)
-                                    else:
-                                        raise StopIteration()
-                    except StopIteration:
-                        pass
-            natomsbox = len(box)
+                selected = [one[1] for one in nbsym]
+            for one in selected:
+                indices.append(one)
+                inbox[one] = True
+            if len(selected) < c:
+                # Fill up with the nearest atoms of this type around the closest defect atoms
+                for n in range(len(nbatmsd)-1, -1, -1):
+                    center = nbatmsd[n][1]
+                    cs, nbrs, dists = tree.query_pairs(solid.get_positions()[[center]], rneighbor)
+                    order = numpy.argsort(dists, kind = 'mergesort')
+                    for one, dist in zip(nbrs[order], dists[order]):
+                        if len(selected) < c and one < ntot and not inbox[one] and symbols[one] == sym:
+                            selected.append(one)
+                            indices.append(one)
+                            inbox[one] = True
+                    if len(selected) >= c:
+                        break
         # Double check for sanity
         for sym, c, m, u in atomlistcheck:
-            symsbox = [one for one in box if one.symbol == sym]
-            if len(symsbox) != c:
+            if numpy.sum(symbols[indices] == sym) != c:
                 stro += 'WARNING!!!! : FAILURE IN FIND_DEFECTS TO MATCH PROVIDED ATOMLIST. DEBUG!!!!\n'
 
     # If atomlistcheck is False then use all the atoms in the given cutoff distance
     else:
         for a in nbatmsd:
-            box.append(solid[a[1]])
             indices.append(a[1])
+            inbox[a[1]] = True
 
     # Add remaining atoms in defect to defected bulk atoms object
-    for one in range(len(solid)):
-        if one not in indices and one < ntot:
-            bulki.append(solid[one])
-
-    # Check for accidental vacancy admissions
-    #checklist = [atm for atm in box if atm.symbol == 'X']
-    #checklist.extend([atm for atm in bulki if atm.symbol == 'X'])
+    indices = numpy.array(indices, dtype = int)
+    bulkindices = numpy.flatnonzero(~inbox)
+    box = atoms_subset(solid, indices)
+    bulki = atoms_subset(solid, bulkindices)
 
     # Set up new individual
     indiv = box.copy()
@@ -216,4 +168,37 @@ def find_defects(solid, bulko, rcutoff, atomlistcheck = False, trackvacs = False
         debug.flush()
         print(len(bulko))
 
+    if return_indices:
+        defect_indices = {'interstitials': ilist, 'vacancies': vlist, 'swaps': swlist,
+                          'indiv': indices, 'bulki': bulkindices}
+        return indiv, bulki, vacant, swaps, stro, defect_indices
     return indiv, bulki, vacant, swaps, stro
+
+
+def get_defects(indiv, bulko, rcutoff, **kwargs):
+    """Function to find the defects of the structure of an individual.
+    Calls find_defects on a copy of indiv[0] only if the decomposition for
+    bulko, rcutoff and the keyword arguments is not cached for the current
+    structure of indiv, see Individual.get_descriptor.
+    Inputs:
+        indiv = Individual class object
+        bulko = ASE atoms class for perfect structure
+        rcutoff = float value of distance to surrounding atoms to include
+        kwargs = keyword arguments of find_defects
+    Outputs:
+        copies of the outputs of find_defects
+    """
+    from StructOpt.generate.structure_cache import atoms_hash
+    if kwargs.get('debug'):
+        return find_defects(indiv[0].copy(), bulko, rcutoff, **kwargs)
+    name = ('defects', atoms_hash(bulko), rcutoff, repr(sorted(kwargs.items())))
+    outs = indiv.get_descriptor(name, find_defects, indiv[0].copy(), bulko, rcutoff, **kwargs)
+    return tuple(copy.deepcopy(one) for one in outs)
+
+
+def atoms_subset(atoms, indices):
+    """Returns a new Atoms object with the atoms at indices appended in order"""
+    subset = Atoms()
+    if len(indices) > 0:
+        subset.extend(atoms[list(indices)])
+    return subset
@@ -1,9 +1,6 @@
-from operator import attrgetter
+from StructOpt.generate.Population import as_population
 
 def get_best(pop, nkeep):
     """Function for sorting population by fitness attributes"""
 
-    pop = sorted(pop, key=attrgetter('fitness'))
-    pop = pop[0:nkeep]
-
-    return pop
+    return as_population(pop).best(nkeep)
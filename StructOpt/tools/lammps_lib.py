@@ -0,0 +1,250 @@
+"""In-process LAMMPS calculator built on the LAMMPS python library.
+Drop-in replacement for the subprocess based LAMMPS calculator: it takes the same
+parameters dictionary from setup_energy_calculator and returns the same output
+dictionary from calculate, but passes coordinates and types to LAMMPS through
+numpy arrays instead of writing data files and parsing the log and dump output."""
+
+import os
+import numpy as np
+from ase import Atoms
+from StructOpt.tools.lammps import LAMMPS
+try:
+    from lammps import lammps
+except ImportError:
+    lammps = None
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+__all__ = ['LAMMPSlib']
+
+
+class LAMMPSlib(LAMMPS):
+
+    def __init__(self, label='lammps', tmp_dir=None, parameters={},
+                 specorder=None, files=[], always_triclinic=False,
+                 keep_alive=True, keep_tmp_files=False):
+        """The in-process LAMMPS calculator object. Arguments are the same as for
+        the LAMMPS calculator. The LAMMPS instance is kept alive between calls
+        unless keep_alive is False. When keep_tmp_files is set the commands and
+        LAMMPS log of each call are written to tmp_dir for reference.
+        """
+        LAMMPS.__init__(self, label=label, tmp_dir=tmp_dir, parameters=parameters,
+                        specorder=specorder, files=files, always_triclinic=always_triclinic,
+                        keep_alive=keep_alive, keep_tmp_files=keep_tmp_files)
+        # No dump or data files are used by the library interface
+        self.trajfile = None
+        self.datafile = None
+        self.infile = None
+        self.logfile = None
+        # Parameters, species and box type the loaded potential was set up for
+        self._setup_key = None
+
+    def _lmp_alive(self):
+        # Return True if this calculator currently holds a LAMMPS instance
+        return self._lmp_handle is not None
+
+    def _lmp_end(self):
+        # Close the LAMMPS instance
+        if self._lmp_alive():
+            self._lmp_handle.close()
+            self._lmp_handle = None
+            self._setup_key = None
+
+    def _lmp_start(self):
+        # Each rank runs its own serial LAMMPS instance
+        cmdargs = ['-echo', 'none', '-screen', 'none', '-log', 'none']
+        if MPI is not None:
+            return lammps(cmdargs=cmdargs, comm=MPI.COMM_SELF)
+        return lammps(cmdargs=cmdargs)
+
+    def command(self, text):
+        """Passes one or more newline separated commands to LAMMPS"""
+        for line in text.split('\n'):
+            if line.strip():
+                self._lmp_handle.command(line)
+
+    def run(self):
+        """Method which runs LAMMPS through the library interface."""
+        if lammps is None:
+            raise RuntimeError('The lammps python module is required for the LAMMPS library calculator')
+
+        self.calls += 1
+
+        # change into subdirectory so relative potential file names resolve
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        try:
+            if not self._lmp_alive():
+                self._lmp_handle = self._lmp_start()
+
+            label = '{0}{1:06d}'.format(self.label, self.calls)
+            box_commands, run_commands = self.lammps_commands()
+            if self.keep_tmp_files:
+                self.infile = os.path.join(self.tmp_dir, 'in_{0}'.format(label))
+                self.logfile = os.path.join(self.tmp_dir, 'log_{0}'.format(label))
+                with open(self.infile, 'w') as f:
+                    f.write('\n'.join(box_commands + run_commands) + '\n')
+                self.command('log {0}'.format(self.logfile))
+
+            self.command('\n'.join(box_commands))
+            self.create_atoms()
+            self.command('\n'.join(run_commands))
+            self.read_lammps_output()
+        finally:
+            if self.keep_tmp_files and self._lmp_alive():
+                self.command('log none')
+            if not self.keep_alive:
+                self._lmp_end()
+            os.chdir(cwd)
+
+        # A few sanity checks
+        if len(self.thermo_content) == 0:
+            raise RuntimeError('Failed to retreive any thermo_style-output')
+        if int(self.thermo_content[-1]['atoms']) != len(self.atoms):
+            raise RuntimeError('Atoms have gone missing')
+
+    def lammps_commands(self):
+        """Returns the LAMMPS commands for the current calculation as two lists,
+        the commands before and after the atoms are created through the library.
+        If the previous call used the same parameters, species and box type the
+        loaded potential is kept and only the atoms and the box are replaced."""
+        parameters = self.parameters
+        pbc = self.atoms.get_pbc()
+        species = self.get_species()
+        triclinic = self.always_triclinic or self.prism.is_skewed()
+        xhi, yhi, zhi, xy, xz, yz = self.prism.get_lammps_prism_str()
+
+        # Commands appended to the pair_coeff and mass lines (min_style, groups,
+        # fixes) have to be repeated for every new set of atoms
+        pair_coeff_cmds = []
+        extra_cmds = []
+        if ('pair_style' in parameters) and ('pair_coeff' in parameters):
+            pair_coeff_cmds.append('pair_style {0}'.format(parameters['pair_style']))
+            for pair_coeff in parameters['pair_coeff']:
+                lines = pair_coeff.split('\n')
+                pair_coeff_cmds.append('pair_coeff {0}'.format(lines[0]))
+                extra_cmds += lines[1:]
+            if 'mass' in parameters:
+                for mass in parameters['mass']:
+                    extra_cmds.append('mass {0}'.format(mass))
+        else:
+            # simple default parameters
+            pair_coeff_cmds += ['pair_style lj/cut 2.5', 'pair_coeff * * 1 1']
+            extra_cmds.append('mass * 1.0')
+
+        setup_key = (repr(sorted(parameters.items())), tuple(species), tuple(pbc), triclinic)
+        if self._lmp_alive() and all(pbc) and setup_key == self._setup_key:
+            box_cmds = ['thermo_style custom {0}'.format(' '.join(self._custom_thermo_args)),
+                        'uncompute pea_sum',
+                        'uncompute pea',
+                        'delete_atoms group all',
+                        'reset_timestep 0']
+            box = 'change_box all x final 0.0 {0} y final 0.0 {1} z final 0.0 {2}'.format(xhi, yhi, zhi)
+            if triclinic:
+                box += ' xy final {0} xz final {1} yz final {2}'.format(xy, xz, yz)
+            box_cmds.append(box + ' units box')
+            return box_cmds, extra_cmds + self.run_commands()
+        self._setup_key = setup_key
+
+        box_cmds = ['clear', 'units metal']
+        if 'boundary' in parameters:
+            box_cmds.append('boundary {0}'.format(parameters['boundary']))
+        else:
+            box_cmds.append('boundary {0} {1} {2}'.format(*['sp'[int(x)] for x in pbc]))
+        box_cmds.append('atom_modify map array sort 0 0.0')
+        for key in ('neighbor', 'newton'):
+            if key in parameters:
+                box_cmds.append('{0} {1}'.format(key, parameters[key]))
+        if triclinic:
+            box_cmds.append('region asecell prism 0.0 {0} 0.0 {1} 0.0 {2} {3} {4} {5} side in units box'.format(
+                xhi, yhi, zhi, xy, xz, yz))
+        else:
+            box_cmds.append('region asecell block 0.0 {0} 0.0 {1} 0.0 {2} side in units box'.format(
+                xhi, yhi, zhi))
+        box_cmds.append('create_box {0} asecell'.format(len(species)))
+        return box_cmds, pair_coeff_cmds + extra_cmds + self.run_commands()
+
+    def run_commands(self):
+        """Returns the thermo output and run commands"""
+        parameters = self.parameters
+        cmds = ['thermo_style custom {0}'.format(' '.join(self._custom_thermo_args))]
+        if 'thermosteps' in parameters:
+            cmds.append('thermo {0}'.format(parameters['thermosteps']))
+        else:
+            cmds.append('thermo 1')
+
+        cmds.append('fix fix_nve all nve')
+        if 'lammps_command' in parameters:
+            cmds.append('minimize {0}'.format(parameters['minimize']))
+            cmds.append('unfix fix_nve')
+            cmds.append(parameters['lammps_command'])
+            cmds.append('minimize {0}'.format(parameters['minimize']))
+        else:
+            if 'minimize' in parameters:
+                cmds.append('minimize {0}'.format(parameters['minimize']))
+            if 'run' in parameters:
+                cmds.append('run {0}'.format(parameters['run']))
+
+        # Final static step tallies the per-atom energies and the thermo values
+        cmds.append('compute pea all pe/atom')
+        cmds.append('compute pea_sum all reduce sum c_pea')
+        cmds.append('thermo_style custom {0} c_pea_sum'.format(' '.join(self._custom_thermo_args)))
+        cmds.append('run 0')
+        for key in self._custom_thermo_args:
+            if key != 'cpu':
+                cmds.append('variable thermo_{0} equal {0}'.format(key))
+        return cmds
+
+    def get_species(self):
+        """Returns the atom types in LAMMPS order"""
+        if self.specorder is None:
+            # By default, atom types in alphabetic order
+            return sorted(set(self.atoms.get_chemical_symbols()))
+        return self.specorder
+
+    def create_atoms(self):
+        """Scatters the rotated and folded positions and the types into LAMMPS"""
+        species = self.get_species()
+        species_i = dict([(s, i+1) for i, s in enumerate(species)])
+        natoms = len(self.atoms)
+        types = [species_i[s] for s in self.atoms.get_chemical_symbols()]
+        positions = np.dot(self.atoms.get_positions(), self.prism.R)
+        scaled = self.prism.car2dir(positions)
+        pbc = self.atoms.get_pbc()
+        scaled[:, pbc] = np.mod(scaled[:, pbc], 1.0)
+        positions = self.prism.dir2car(scaled)
+        self._lmp_handle.create_atoms(natoms, list(range(1, natoms+1)), types,
+                                      positions.ravel().tolist(), None, None, True)
+
+    def read_lammps_output(self):
+        """Gathers the thermo values, positions, cell and per-atom energies"""
+        lmp = self._lmp_handle
+        natoms = len(self.atoms)
+
+        # The cpu keyword cannot be evaluated between runs
+        thermo = {'cpu': 0.0}
+        for key in self._custom_thermo_args:
+            if key != 'cpu':
+                thermo[key] = float(lmp.extract_variable('thermo_{0}'.format(key), None, 0))
+        self.thermo_content = [thermo]
+
+        positions = np.array(lmp.gather_atoms('x', 1, 3)[:3*natoms]).reshape(natoms, 3)
+
+        # Per-atom energies are stored in local order; sort them by atom id
+        nlocal = int(lmp.get_natoms())
+        ids = lmp.extract_atom('id', 0)
+        ids = np.array([ids[i] for i in range(nlocal)])
+        pea = lmp.extract_compute('pea', 1, 1)
+        pea = np.array([pea[i] for i in range(nlocal)])[np.argsort(ids)]
+
+        boxlo, boxhi, xy, yz, xz, periodicity, box_change = lmp.extract_box()
+        cell = np.array([[boxhi[0] - boxlo[0], 0, 0],
+                         [xy, boxhi[1] - boxlo[1], 0],
+                         [xz, yz, boxhi[2] - boxlo[2]]])
+
+        rotation_lammps2ase = np.linalg.inv(self.prism.R)
+        self.atoms = Atoms(self.atoms.get_atomic_numbers(),
+                           positions=np.dot(positions, rotation_lammps2ase), cell=cell)
+        self.pea = [[e] for e in pea]
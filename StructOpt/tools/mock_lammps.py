@@ -0,0 +1,615 @@
+#!/usr/bin/env python
+"""Stand-in for the LAMMPS binary, for running the LAMMPS calculator of
+tools/lammps.py without LAMMPS. It reads the input script the calculator
+writes on stdin and answers with the thermo output and dump file it parses,
+so whole runs with the LAMMPS fitness module can be tested and timed offline.
+
+Energies come from a Lennard-Jones (lj/cut) or Morse pair potential in metal
+units, taken from the pair_style and pair_coeff commands of the input. Other
+pair styles, such as eam, are replaced by the pair potential given with
+--potential and --coeffs. minimize relaxes the atoms by steepest descent,
+run only advances the timestep. Every calculation sleeps for a time drawn
+from the distribution set by the --latency options to stand in for the cost
+of a real calculation. Point the calculator to it with
+
+    export LAMMPS_COMMAND="/path/to/StructOpt/tools/mock_lammps.py --latency 0.5"
+
+The options of mock_lammps_command give the same command line.
+"""
+import os
+import sys
+import math
+import time
+import random
+import shlex
+import argparse
+import numpy
+
+__all__ = ['MockLAMMPS', 'mock_lammps_command']
+
+# Conversion of eV/Angstrom^3 to bar for the pressure in metal units
+EV_A3_TO_BAR = 1.602176634e6
+
+# Names printed in the thermo header for the thermo_style keywords
+THERMO_NAMES = {'step': 'Step', 'temp': 'Temp', 'press': 'Press', 'cpu': 'CPU',
+    'ke': 'KinEng', 'pe': 'PotEng', 'etotal': 'TotEng', 'vol': 'Volume',
+    'atoms': 'Atoms'}
+
+# Default coefficients and cutoff of the pair potentials used in place of
+# the pair styles which are not implemented
+DEFAULT_COEFFS = {'lj': [0.4, 2.6], 'morse': [0.5, 1.6, 3.0]}
+DEFAULT_CUTOFF = {'lj': 6.5, 'morse': 6.0}
+
+# Largest number of atom pairs handled at once in compute
+CHUNK_PAIRS = 1000000
+
+
+def lj_pair(r, coeffs):
+    """Energy and derivative of the energy of Lennard-Jones pairs
+    at distances r, coeffs = [epsilon, sigma]"""
+    epsilon, sigma = coeffs[0], coeffs[1]
+    sr6 = (sigma/r)**6
+    energy = 4*epsilon*(sr6*sr6 - sr6)
+    dedr = -24*epsilon*(2*sr6*sr6 - sr6)/r
+    return energy, dedr
+
+
+def morse_pair(r, coeffs):
+    """Energy and derivative of the energy of Morse pairs
+    at distances r, coeffs = [D0, alpha, r0]"""
+    d0, alpha, r0 = coeffs[0], coeffs[1], coeffs[2]
+    e = numpy.exp(-alpha*(r - r0))
+    energy = d0*(e*e - 2*e)
+    dedr = 2*alpha*d0*(e - e*e)
+    return energy, dedr
+
+# Pair function and number of coefficients of each potential
+POTENTIALS = {'lj': (lj_pair, 2), 'morse': (morse_pair, 3)}
+
+
+def potential_of_style(style):
+    """Returns the potential implementing a pair style, or None"""
+    if style.startswith('lj'):
+        return 'lj'
+    if style.startswith('morse'):
+        return 'morse'
+    return None
+
+
+class MockError(Exception):
+    pass
+
+
+class Latency(object):
+    """Simulated time of one calculation, with mean seconds plus per_atom
+    seconds per atom and standard deviation spread (half width for the
+    uniform distribution)"""
+
+    def __init__(self, mean=0.0, distribution='constant', spread=0.0, per_atom=0.0, seed=None):
+        self.mean = mean
+        self.distribution = distribution
+        self.spread = spread
+        self.per_atom = per_atom
+        self.random = random.Random(seed)
+
+    def sample(self, natoms):
+        mean = self.mean + self.per_atom*natoms
+        if mean <= 0:
+            return 0.0
+        if self.distribution == 'uniform':
+            seconds = self.random.uniform(mean - self.spread, mean + self.spread)
+        elif self.distribution == 'exponential':
+            seconds = self.random.expovariate(1.0/mean)
+        elif self.distribution == 'normal':
+            seconds = self.random.gauss(mean, self.spread)
+        elif self.distribution == 'lognormal':
+            sigma2 = math.log(1 + (self.spread/mean)**2)
+            seconds = self.random.lognormvariate(math.log(mean) - sigma2/2, math.sqrt(sigma2))
+        else:
+            seconds = mean
+        return max(seconds, 0.0)
+
+
+class MockLAMMPS(object):
+    """Interpreter of the LAMMPS commands written by the LAMMPS calculator.
+    Commands which do not change the energy or output, such as fix nve or
+    min_style, are accepted and ignored."""
+
+    def __init__(self, out=sys.stdout, potential='morse', coeffs=None, cutoff=None,
+                 latency=None, echo=False):
+        self.out = out
+        self.fallback = potential
+        self.fallback_coeffs = coeffs or DEFAULT_COEFFS[potential]
+        self.fallback_cutoff = cutoff or DEFAULT_CUTOFF[potential]
+        self.latency = latency or Latency()
+        self.echo = echo
+        self.clear()
+
+    def clear(self):
+        self.periodic = [True, True, True]
+        self.box = None
+        self.positions = numpy.zeros((0, 3))
+        self.types = numpy.zeros(0, dtype=int)
+        self.ntypes = 0
+        self.atom_style = 'atomic'
+        self.regions = {}
+        self.groups = {}
+        self.frozen = []
+        self.pea_computes = set()
+        self.dumps = {}
+        self.pair_style = None
+        self.pair_coeffs = []
+        self.potential = None
+        self.thermo_args = ['step', 'temp', 'press', 'etotal']
+        self.thermo_every = 0
+        self.timestep = 0
+        self.pending_latency = True
+
+    def write(self, text):
+        self.out.write(text + '\n')
+        self.out.flush()
+
+    def run_input(self, stream):
+        """Executes the commands read from stream until it is closed"""
+        self.write('LAMMPS (mock)')
+        for line in iter(stream.readline, ''):
+            line = line.strip()
+            if self.echo and line:
+                self.write(line)
+            # Strip comments, print keeps its text
+            if '#' in line and not line.startswith('print'):
+                line = line[:line.index('#')].strip()
+            if line:
+                self.execute(line)
+
+    def execute(self, line):
+        words = shlex.split(line)
+        command = getattr(self, 'command_' + words[0].replace('/', '_'), None)
+        if command is not None:
+            try:
+                command(words[1:])
+            except (IndexError, ValueError) as e:
+                raise MockError('Illegal {0} command: {1}'.format(words[0], e))
+
+    # Simulation box and atoms
+
+    def command_clear(self, args):
+        self.clear()
+
+    def command_units(self, args):
+        if args[0] != 'metal':
+            raise MockError('Only metal units are supported, got {0}'.format(args[0]))
+
+    def command_boundary(self, args):
+        self.periodic = [arg == 'p' for arg in args[:3]]
+
+    def command_atom_style(self, args):
+        self.atom_style = args[0]
+
+    def command_read_data(self, args):
+        self.read_data(args[0])
+
+    def command_region(self, args):
+        # region ID block|prism xlo xhi ylo yhi zlo zhi [xy xz yz] ...
+        if args[1] not in ['block', 'prism']:
+            raise MockError('Region style {0} is not supported'.format(args[1]))
+        n = 9 if args[1] == 'prism' else 6
+        bounds = [float(x) for x in args[2:2 + n]] + [0.0]*(9 - n)
+        self.regions[args[0]] = bounds
+
+    def command_create_box(self, args):
+        xlo, xhi, ylo, yhi, zlo, zhi, xy, xz, yz = self.regions[args[1]]
+        self.ntypes = int(args[0])
+        self.set_box([xlo, ylo, zlo], [xhi - xlo, yhi - ylo, zhi - zlo], [xy, xz, yz])
+
+    def command_create_atoms(self, args):
+        # create_atoms type single x y z units box
+        if args[1] != 'single':
+            raise MockError('Only single atoms can be created')
+        self.types = numpy.append(self.types, int(args[0]) - 1)
+        self.positions = numpy.vstack([self.positions, [float(x) for x in args[2:5]]])
+
+    def set_box(self, lo, lengths, tilt):
+        lx, ly, lz = lengths
+        xy, xz, yz = tilt
+        self.box = {'lo': numpy.array(lo, dtype=float), 'tilt': tilt,
+            'cell': numpy.array([[lx, 0, 0], [xy, ly, 0], [xz, yz, lz]], dtype=float)}
+
+    def read_data(self, filename):
+        """Reads the box, types and positions of the atoms of a data file"""
+        with open(filename) as f:
+            lines = [line.split('#')[0].strip() for line in f.readlines()[1:]]
+        natoms = 0
+        lo = [0.0]*3
+        hi = [0.0]*3
+        tilt = [0.0]*3
+        i = 0
+        while i < len(lines):
+            words = lines[i].split()
+            i += 1
+            if not words:
+                continue
+            if words[-1] == 'atoms':
+                natoms = int(words[0])
+            elif words[-2:] == ['atom', 'types']:
+                self.ntypes = int(words[0])
+            elif words[-1] in ['xhi', 'yhi', 'zhi']:
+                k = 'xyz'.index(words[-1][0])
+                lo[k], hi[k] = float(words[0]), float(words[1])
+            elif words[-3:] == ['xy', 'xz', 'yz']:
+                tilt = [float(x) for x in words[:3]]
+            elif words[0] == 'Atoms':
+                rows = [line.split() for line in lines[i:] if line][:natoms]
+                # atom_style charge has the charge before the position
+                first = 3 if self.atom_style == 'charge' else 2
+                rows.sort(key=lambda row: int(row[0]))
+                self.types = numpy.array([int(row[1]) - 1 for row in rows])
+                self.positions = numpy.array([[float(x) for x in row[first:first + 3]]
+                    for row in rows]).reshape(-1, 3)
+                break
+        if len(self.positions) != natoms:
+            raise MockError('Expected {0} atoms in {1}, found {2}'.format(
+                natoms, filename, len(self.positions)))
+        self.set_box(lo, [h - l for l, h in zip(lo, hi)], tilt)
+
+    # Interactions
+
+    def command_pair_style(self, args):
+        self.pair_style = args
+        self.pair_coeffs = []
+
+    def command_pair_coeff(self, args):
+        self.pair_coeffs.append(args)
+
+    def command_group(self, args):
+        # group ID id|type <|<=|>|>=|== N
+        name, key = args[0], args[1]
+        if key not in ['id', 'type'] or len(args) != 4:
+            raise MockError('Only group ID id|type <op> N is supported')
+        values = numpy.arange(1, len(self.types) + 1) if key == 'id' else self.types + 1
+        limit = int(args[3])
+        ops = {'<': numpy.less, '<=': numpy.less_equal, '>': numpy.greater,
+            '>=': numpy.greater_equal, '==': numpy.equal, '!=': numpy.not_equal}
+        self.groups[name] = ops[args[2]](values, limit)
+
+    def command_fix(self, args):
+        # Atoms of fix setforce 0.0 0.0 0.0 groups do not move in minimize
+        if args[2] == 'setforce':
+            if any(float(x) != 0 for x in args[3:6]):
+                raise MockError('Only fix setforce 0.0 0.0 0.0 is supported')
+            self.frozen.append((args[0], args[1]))
+
+    def command_unfix(self, args):
+        self.frozen = [(fix, group) for fix, group in self.frozen if fix != args[0]]
+
+    def command_compute(self, args):
+        if args[2] == 'pe/atom':
+            self.pea_computes.add(args[0])
+
+    def setup_potential(self):
+        """Builds the per type pair coefficient and cutoff tables from the
+        pair_style and pair_coeff commands"""
+        if self.pair_style is None:
+            raise MockError('Pair style must be defined before running')
+        name = potential_of_style(self.pair_style[0])
+        if name is not None and len(self.pair_style) < 2:
+            raise MockError('Pair style {0} needs a cutoff'.format(self.pair_style[0]))
+        ntypes = max(self.ntypes, int(self.types.max()) + 1 if len(self.types) else 1)
+        if name is None:
+            name = self.fallback
+            ncoeffs = POTENTIALS[name][1]
+            coeffs = numpy.tile(self.fallback_coeffs[:ncoeffs], (ntypes, ntypes, 1))
+            cutoff = numpy.ones((ntypes, ntypes))*self.fallback_cutoff
+        else:
+            ncoeffs = POTENTIALS[name][1]
+            coeffs = numpy.zeros((ntypes, ntypes, ncoeffs))
+            cutoff = numpy.ones((ntypes, ntypes))*float(self.pair_style[1])
+            for args in self.pair_coeffs:
+                values = [float(x) for x in args[2:]]
+                for i in type_range(args[0], ntypes):
+                    for j in type_range(args[1], ntypes):
+                        coeffs[i, j] = coeffs[j, i] = values[:ncoeffs]
+                        if len(values) > ncoeffs:
+                            cutoff[i, j] = cutoff[j, i] = values[ncoeffs]
+        self.potential = (POTENTIALS[name][0], coeffs, cutoff)
+
+    def compute(self, positions):
+        """Returns the energy of each atom, the forces on the atoms and the
+        virial of the pair potential for the atoms at positions"""
+        pair, coeffs, cutoff = self.potential
+        natoms = len(positions)
+        types = self.types
+        pea = numpy.zeros(natoms)
+        forces = numpy.zeros((natoms, 3))
+        virial = numpy.zeros((3, 3))
+        chunk = max(1, CHUNK_PAIRS//max(natoms, 1))
+        for shift in self.image_shifts(cutoff.max()):
+            for start in range(0, natoms, chunk):
+                rows = numpy.arange(start, min(start + chunk, natoms))
+                d = positions[rows, None, :] - positions[None, :, :] - shift
+                r2 = (d*d).sum(axis=2)
+                ti = types[rows]
+                inside = r2 < cutoff[ti[:, None], types[None, :]]**2
+                if not shift.any():
+                    inside[numpy.arange(len(rows)), rows] = False
+                i, j = numpy.nonzero(inside)
+                if not len(i):
+                    continue
+                dij = d[i, j]
+                r = numpy.maximum(numpy.sqrt(r2[i, j]), 1e-3)
+                with numpy.errstate(over='ignore', invalid='ignore'):
+                    energy, dedr = pair(r, coeffs[ti[i], types[j]].T)
+                energy = numpy.nan_to_num(energy)
+                fij = numpy.nan_to_num(-dedr/r)[:, None]*dij
+                # Each pair is found from both atoms, each takes half the energy
+                numpy.add.at(pea, rows[i], 0.5*energy)
+                numpy.add.at(forces, rows[i], fij)
+                virial += 0.5*numpy.dot(dij.T, fij)
+        return pea, forces, virial
+
+    def image_shifts(self, cutoff):
+        """Returns the translations of the periodic images of the box
+        which can have atoms within cutoff of the atoms in the box"""
+        cell = self.box['cell']
+        volume = abs(numpy.linalg.det(cell))
+        ranges = []
+        for k in range(3):
+            if self.periodic[k]:
+                normal = numpy.cross(cell[(k + 1) % 3], cell[(k + 2) % 3])
+                width = volume/numpy.linalg.norm(normal)
+                n = int(math.ceil(cutoff/width))
+                ranges.append(range(-n, n + 1))
+            else:
+                ranges.append([0])
+        return [numpy.dot([a, b, c], cell) for a in ranges[0] for b in ranges[1] for c in ranges[2]]
+
+    def wrap(self, positions):
+        """Returns the positions moved into the box along its periodic directions"""
+        cell = self.box['cell']
+        scaled = numpy.linalg.solve(cell.T, (positions - self.box['lo']).T).T
+        for k in range(3):
+            if self.periodic[k]:
+                scaled[:, k] %= 1.0
+        return numpy.dot(scaled, cell) + self.box['lo']
+
+    def evaluate(self):
+        """Computes the energies, forces and stress of the current positions"""
+        self.positions = self.wrap(self.positions)
+        self.pea, self.forces, virial = self.compute(self.positions)
+        self.energy = self.pea.sum()
+        volume = abs(numpy.linalg.det(self.box['cell']))
+        self.pressure_tensor = virial/volume*EV_A3_TO_BAR
+
+    def state(self):
+        return (self.positions, self.pea, self.forces, self.energy, self.pressure_tensor)
+
+    def restore(self, state):
+        self.positions, self.pea, self.forces, self.energy, self.pressure_tensor = state
+
+    # Output
+
+    def command_thermo_style(self, args):
+        if args[0] != 'custom':
+            raise MockError('Only thermo_style custom is supported')
+        self.thermo_args = args[1:]
+
+    def command_thermo(self, args):
+        self.thermo_every = int(args[0])
+
+    def thermo_value(self, key, cpu):
+        cell = self.box['cell']
+        p = self.pressure_tensor
+        values = {'step': self.timestep, 'temp': 0.0, 'cpu': cpu,
+            'press': numpy.trace(p)/3, 'pxx': p[0, 0], 'pyy': p[1, 1], 'pzz': p[2, 2],
+            'pxy': p[0, 1], 'pxz': p[0, 2], 'pyz': p[1, 2],
+            'ke': 0.0, 'pe': self.energy, 'etotal': self.energy,
+            'vol': abs(numpy.linalg.det(cell)), 'lx': cell[0, 0], 'ly': cell[1, 1],
+            'lz': cell[2, 2], 'atoms': len(self.positions)}
+        if key not in values:
+            raise MockError('Thermo keyword {0} is not supported'.format(key))
+        value = values[key]
+        if key in ['step', 'atoms']:
+            return '{0:d}'.format(int(value))
+        return '{0:.12g}'.format(float(value))
+
+    def thermo_header(self):
+        self.write(' '.join([THERMO_NAMES.get(key, key.capitalize()) for key in self.thermo_args]))
+
+    def thermo_line(self, cpu):
+        self.write(' '.join([self.thermo_value(key, cpu) for key in self.thermo_args]))
+
+    def command_dump(self, args):
+        # dump ID group custom N file columns
+        if args[2] != 'custom':
+            raise MockError('Only custom dumps are supported')
+        self.dumps[args[0]] = {'every': int(args[3]), 'file': args[4],
+            'columns': args[5:], 'last': None}
+        open(args[4], 'w').close()
+
+    def command_undump(self, args):
+        self.dumps.pop(args[0], None)
+
+    def write_dumps(self, first=False):
+        for dump in self.dumps.values():
+            if dump['last'] == self.timestep:
+                continue
+            if not first and self.timestep % dump['every']:
+                continue
+            dump['last'] = self.timestep
+            self.write_dump(dump)
+
+    def write_dump(self, dump):
+        columns = []
+        for name in dump['columns']:
+            if name == 'id':
+                columns.append(['{0:d}'.format(i + 1) for i in range(len(self.types))])
+            elif name == 'type':
+                columns.append(['{0:d}'.format(t + 1) for t in self.types])
+            elif name in ['x', 'y', 'z']:
+                columns.append(self.positions[:, 'xyz'.index(name)])
+            elif name in ['fx', 'fy', 'fz']:
+                columns.append(self.forces[:, 'xyz'.index(name[1])])
+            elif name in ['vx', 'vy', 'vz']:
+                columns.append(numpy.zeros(len(self.types)))
+            elif name.startswith('c_') and name[2:] in self.pea_computes:
+                columns.append(self.pea)
+            else:
+                raise MockError('Dump custom column {0} is not supported'.format(name))
+        columns = [[v if isinstance(v, str) else '{0:.12g}'.format(v) for v in column]
+            for column in columns]
+        lo = self.box['lo']
+        cell = self.box['cell']
+        xy, xz, yz = self.box['tilt']
+        hi = lo + numpy.diag(cell)
+        flags = ' '.join(['pp' if p else 'ss' for p in self.periodic])
+        with open(dump['file'], 'a') as f:
+            f.write('ITEM: TIMESTEP\n{0}\n'.format(self.timestep))
+            f.write('ITEM: NUMBER OF ATOMS\n{0}\n'.format(len(self.types)))
+            if any(self.box['tilt']):
+                # Bounding box of the triclinic box, as LAMMPS writes it
+                xlo = lo[0] + min(0.0, xy, xz, xy + xz)
+                xhi = hi[0] + max(0.0, xy, xz, xy + xz)
+                ylo = lo[1] + min(0.0, yz)
+                yhi = hi[1] + max(0.0, yz)
+                f.write('ITEM: BOX BOUNDS xy xz yz {0}\n'.format(flags))
+                f.write('{0:.12g} {1:.12g} {2:.12g}\n'.format(xlo, xhi, xy))
+                f.write('{0:.12g} {1:.12g} {2:.12g}\n'.format(ylo, yhi, xz))
+                f.write('{0:.12g} {1:.12g} {2:.12g}\n'.format(lo[2], hi[2], yz))
+            else:
+                f.write('ITEM: BOX BOUNDS {0}\n'.format(flags))
+                for k in range(3):
+                    f.write('{0:.12g} {1:.12g}\n'.format(lo[k], hi[k]))
+            f.write('ITEM: ATOMS {0}\n'.format(' '.join(dump['columns'])))
+            for row in zip(*columns):
+                f.write(' '.join(row) + '\n')
+
+    def command_print(self, args):
+        self.write(' '.join(args))
+
+    # Runs
+
+    def start(self):
+        """Prepares a run or minimization, spending the simulated time of the
+        calculation on the first one after clear"""
+        if self.box is None:
+            raise MockError('Run command before simulation box is defined')
+        if self.pending_latency:
+            self.pending_latency = False
+            time.sleep(self.latency.sample(len(self.types)))
+        self.setup_potential()
+        self.evaluate()
+        self.start_time = time.time()
+        self.thermo_header()
+        self.thermo_line(0.0)
+        self.write_dumps(first=True)
+
+    def step(self, last):
+        self.timestep += 1
+        if last or (self.thermo_every and self.timestep % self.thermo_every == 0):
+            self.thermo_line(time.time() - self.start_time)
+        self.write_dumps()
+
+    def command_run(self, args):
+        # No dynamics, run only advances the timestep
+        nsteps = int(args[0])
+        self.start()
+        for n in range(nsteps):
+            self.step(n == nsteps - 1)
+        self.out.flush()
+
+    def command_minimize(self, args):
+        """Steepest descent with an adaptive step, at most 0.1 Angstrom per
+        atom and iteration, with the stopping criteria of LAMMPS"""
+        etol, ftol = float(args[0]), float(args[1])
+        maxiter, maxeval = int(args[2]), int(args[3])
+        self.start()
+        frozen = numpy.zeros(len(self.types), dtype=bool)
+        for fix, group in self.frozen:
+            frozen |= self.groups.get(group, True)
+        alpha = 0.01
+        evals = 0
+        for n in range(maxiter):
+            forces = numpy.where(frozen[:, None], 0.0, self.forces)
+            if evals >= maxeval or numpy.sqrt((forces*forces).sum()) <= ftol:
+                break
+            fmax = numpy.sqrt((forces*forces).sum(axis=1)).max()
+            alpha = min(alpha, 0.1/fmax)
+            state = self.state()
+            energy = self.energy
+            self.positions = self.positions + alpha*forces
+            self.evaluate()
+            evals += 1
+            if self.energy < energy:
+                self.step(False)
+                alpha *= 1.2
+                if energy - self.energy <= etol*0.5*(abs(energy) + abs(self.energy) + 1e-8):
+                    break
+            else:
+                self.restore(state)
+                alpha *= 0.5
+                if alpha*fmax < 1e-10:
+                    break
+        self.thermo_line(time.time() - self.start_time)
+        self.out.flush()
+
+
+def type_range(word, ntypes):
+    """Zero based atom types of a pair_coeff type argument: N, *, N*, *M or N*M"""
+    if '*' not in word:
+        return [int(word) - 1]
+    low, high = word.split('*')
+    return range(int(low or 1) - 1, int(high or ntypes))
+
+
+def mock_lammps_command(**options):
+    """Returns a LAMMPS_COMMAND running the mock with the current python
+    interpreter, options are the long command line options without the
+    leading dashes and with underscores, e.g. latency_distribution='uniform'"""
+    path = os.path.abspath(__file__)
+    if path.endswith('.pyc'):
+        path = path[:-1]
+    words = [sys.executable, path]
+    for key, value in sorted(options.items()):
+        words.append('--' + key.replace('_', '-'))
+        if isinstance(value, (list, tuple)):
+            words.extend([str(v) for v in value])
+        else:
+            words.append(str(value))
+    return ' '.join(words)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stand-in for the LAMMPS binary '
+        'computing pair potential energies with a simulated latency. Unknown '
+        'options, such as the LAMMPS -log and -screen switches, are ignored.')
+    parser.add_argument('--potential', choices=sorted(POTENTIALS), default='morse',
+        help='pair potential used in place of unsupported pair styles (default morse)')
+    parser.add_argument('--coeffs', type=float, nargs='+',
+        help='coefficients of that potential, epsilon sigma for lj and D0 alpha r0 '
+        'for morse (default {0} and {1})'.format(DEFAULT_COEFFS['lj'], DEFAULT_COEFFS['morse']))
+    parser.add_argument('--cutoff', type=float, help='cutoff of that potential in Angstrom')
+    parser.add_argument('--latency', type=float, default=0.0,
+        help='mean seconds spent on each calculation (default 0)')
+    parser.add_argument('--latency-distribution', default='constant',
+        choices=['constant', 'uniform', 'exponential', 'normal', 'lognormal'])
+    parser.add_argument('--latency-spread', type=float, default=0.0,
+        help='standard deviation of the latency, half width for uniform')
+    parser.add_argument('--latency-per-atom', type=float, default=0.0,
+        help='seconds added to the mean latency per atom')
+    parser.add_argument('--seed', type=int, help='seed of the latency distribution')
+    parser.add_argument('-echo', dest='echo', default='none',
+        help='LAMMPS switch, "log" or "both" echoes the input to the output')
+    args, unknown = parser.parse_known_args(argv)
+    latency = Latency(args.latency, args.latency_distribution, args.latency_spread,
+        args.latency_per_atom, args.seed)
+    mock = MockLAMMPS(sys.stdout, args.potential, args.coeffs, args.cutoff, latency,
+        echo=args.echo in ['log', 'both'])
+    try:
+        mock.run_input(sys.stdin)
+    except MockError as e:
+        mock.write('ERROR: {0}'.format(e))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import hashlib
+import itertools
+import numpy
+from scipy.spatial import cKDTree
+
+__all__ = ['PeriodicTree', 'get_bulk_tree']
+
+
+class PeriodicTree(object):
+    """KD-tree over the atoms of a periodic cell.
+    Orthorhombic cells use the periodic boxsize of cKDTree directly, other
+    cells are handled by adding the 26 neighboring images of every atom.
+    Query results are always indices of the original atoms."""
+
+    def __init__(self, positions, cell):
+        positions = numpy.asarray(positions, dtype=float)
+        cell = numpy.asarray(cell, dtype=float)
+        self.natoms = len(positions)
+        self.cell = cell
+        self.inverse_cell = numpy.linalg.inv(cell)
+        diagonal = numpy.diag(cell)
+        if numpy.allclose(cell, numpy.diag(diagonal)) and numpy.all(diagonal > 0):
+            self.boxsize = diagonal
+            self.tree = cKDTree(self.wrap(positions), boxsize=self.boxsize)
+            self.index = numpy.arange(self.natoms)
+        else:
+            self.boxsize = None
+            shifts = numpy.dot(list(itertools.product([0, -1, 1], repeat=3)), cell)
+            images = self.wrap(positions)[numpy.newaxis, :, :] + shifts[:, numpy.newaxis, :]
+            self.tree = cKDTree(images.reshape(-1, 3))
+            self.index = numpy.tile(numpy.arange(self.natoms), len(shifts))
+
+    def wrap(self, positions):
+        """Returns the positions wrapped back into the cell"""
+        scaled = numpy.dot(numpy.asarray(positions, dtype=float), self.inverse_cell)
+        scaled -= numpy.floor(scaled)
+        # Rounding can put a wrapped coordinate exactly on the upper boundary
+        scaled[scaled >= 1.0] = 0.0
+        return numpy.dot(scaled, self.cell)
+
+    def query(self, positions, distance_upper_bound=numpy.inf):
+        """Returns the distance to and index of the nearest atom for each
+        position. Positions without an atom within distance_upper_bound get
+        an infinite distance and index -1."""
+        if len(positions) == 0:
+            return numpy.zeros(0), numpy.zeros(0, dtype=int)
+        dists, indices = self.tree.query(self.wrap(positions), k=1,
+                                         distance_upper_bound=distance_upper_bound)
+        found = numpy.isfinite(dists)
+        nearest = -numpy.ones(len(positions), dtype=int)
+        nearest[found] = self.index[indices[found]]
+        return dists, nearest
+
+    def query_pairs(self, positions, r):
+        """Returns all (position, atom) pairs closer than r as three arrays:
+        the index of the position, the index of the atom and the distance"""
+        if len(positions) == 0 or self.natoms == 0:
+            return numpy.zeros(0, dtype=int), numpy.zeros(0, dtype=int), numpy.zeros(0)
+        if self.boxsize is not None:
+            other = cKDTree(self.wrap(positions), boxsize=self.boxsize)
+        else:
+            other = cKDTree(self.wrap(positions))
+        pairs = other.sparse_distance_matrix(self.tree, r, output_type='ndarray')
+        return pairs['i'].astype(int), self.index[pairs['j']], pairs['v']
+
+
+# Tree of the perfect bulk structure, built once per run
+_bulk_tree = {}
+
+
+def get_bulk_tree(bulko):
+    """Returns the PeriodicTree of the perfect bulk structure bulko. The tree
+    is only rebuilt when the positions or the cell of bulko change."""
+    h = hashlib.sha1()
+    h.update(numpy.ascontiguousarray(bulko.get_positions()).tobytes())
+    h.update(numpy.ascontiguousarray(bulko.get_cell(), dtype=float).tobytes())
+    key = h.hexdigest()
+    if key not in _bulk_tree:
+        _bulk_tree.clear()
+        _bulk_tree[key] = PeriodicTree(bulko.get_positions(), bulko.get_cell())
+    return _bulk_tree[key]
@@ -1,7 +1,14 @@
+import bisect
+import numpy
+
 def remove_duplicates(oldlist, tolerance):
     """Function to remove the duplicates in a list.
     ***A duplicate is defined as being less than a given tolerance
     different from the other numbers in the list***
+    The values are sorted once to find the items without any other item within
+    the tolerance, which are all kept. The other items are kept in list order
+    unless a kept item lies within the tolerance, found by bisection of the
+    sorted kept values.
     Inputs:
         oldlist = List of floats/integers possibly containing duplicates
         tolerance = maximum difference between items for them to be considered duplicates
@@ -10,40 +17,24 @@ def remove_duplicates(oldlist, tolerance):
         newlistindices = List of indices of items in newlist corresponding to positions in old list
     """
 
-    newlist = []
-    dups = []
-    newlistindices = []
-    for i in range(len(oldlist)):
-        diffs = []
-        # Identify the difference between given item and other items in list
-        for j in range(len(oldlist)):
-            diffs.append(abs(oldlist[i]- oldlist[j]))
-        # Check if any of the differences are less than the tolerance
-        flaggedlist = []
-        for k in range(len(diffs)):
-            if diffs[k] <= tolerance:
-                if k != i:
-                    flaggedlist.append(k)
-        if len(flaggedlist) != 0:
-            dups.append([i, flaggedlist])
-        else:
-            newlistindices.append(i)
+    values = numpy.asarray(oldlist, dtype=float)
+    order = numpy.argsort(values, kind='mergesort')
+    close = numpy.diff(values[order]) <= tolerance
+    flagged = numpy.zeros(len(values), dtype=bool)
+    flagged[order[:-1][close]] = True
+    flagged[order[1:][close]] = True
 
-    selects = []
-    for one, others in dups:
-        if len(selects) == 0:
-            selects.append(one)
-        else:
-            flag = True
-            for two in others:
-                if two in selects:
-                    flag = False
-            if flag:
-                selects.append(one)
-    newlistindices.extend(selects)
-    newlistindices.sort()
+    keep = ~flagged
+    kept = []
+    for i in numpy.flatnonzero(flagged):
+        # Only the nearest kept values on either side can be within the tolerance
+        k = bisect.bisect_left(kept, values[i])
+        if any(abs(kept[j] - values[i]) <= tolerance for j in (k-1, k) if 0 <= j < len(kept)):
+            continue
+        kept.insert(k, values[i])
+        keep[i] = True
 
-    for one in newlistindices:
-        newlist.append(oldlist[one])
+    newlistindices = numpy.flatnonzero(keep).tolist()
+    newlist = [oldlist[one] for one in newlistindices]
 
     return newlist, newlistindices
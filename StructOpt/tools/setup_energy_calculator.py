@@ -1,4 +1,5 @@
 from StructOpt.tools.lammps import LAMMPS
+from StructOpt.tools.lammps_lib import LAMMPSlib
 import os
 import json
 try:
@@ -7,7 +8,7 @@ except ImportError:
     pass
 import logging
 
-def setup_energy_calculator(Optimizer, mod, relax):
+def setup_energy_calculator(Optimizer, mod, relax, args=None):
     if mod == 'VASP':
         args = json.load(open('vasp_inp.json'))
         return
@@ -18,7 +19,8 @@ def setup_energy_calculator(Optimizer, mod, relax):
         else:
             debug = False
 
-        args = json.load(open('lammps_inp.json'))
+        if args is None:
+            args = json.load(open('lammps_inp.json'))
         atomlist = Optimizer.atomlist
         atomlist = sorted(atomlist, key = lambda symbol: symbol[0])
         
@@ -240,43 +242,51 @@ def setup_energy_calculator(Optimizer, mod, relax):
             parameters['minimize'] = "1e-8 1e-8 0 0"
         parameters['thermosteps'] = args["thermo_steps"]
 
+        # Run LAMMPS in-process through its python library if requested
+        if args.get("library", False):
+            if debug:
+                logger.info('Using the LAMMPS python library calculator')
+            calculator = LAMMPSlib
+        else:
+            calculator = LAMMPS
+
         if args["keep_files"]:
             if debug:
                 logger.info('Setting up directory for keeping LAMMPS files')
             try:
                 rank = MPI.COMM_WORLD.Get_rank()
                 if Optimizer.parallel:
-                    if 'Island_Method' not in Optimizer.algorithm_type:
-                        real_rank = MPI.COMM_WORLD.Get_rank()
-                        rank = 0
-                        path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename, rank))
-                        if not os.path.exists(os.path.join(path, 'LAMMPSFiles')):
-                            os.mkdir(os.path.join(path, 'LAMMPSFiles'))
-                            logger.info('Making directory: {0}'.format(os.path.join(path, 'LAMMPSFiles')))
+                    # Every rank of an island keeps its files in the directory of the island root
+                    real_rank = MPI.COMM_WORLD.Get_rank()
+                    rank = Optimizer.island_root
+                    path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename, rank))
+                    if not os.path.exists(os.path.join(path, 'LAMMPSFiles')):
+                        os.mkdir(os.path.join(path, 'LAMMPSFiles'))
+                        logger.info('Making directory: {0}'.format(os.path.join(path, 'LAMMPSFiles')))
             except:
                 rank = 0
 
             if filesL != None:
                 path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename, rank))
-                if Optimizer.parallel and ('Island_Method' not in Optimizer.algorithm_type):
+                if Optimizer.parallel:
                     tmpdir = os.path.join(os.path.join(path, 'LAMMPSFiles'), 'rank-{0}'.format(real_rank))
-                    calc = LAMMPS(parameters= parameters, files=filesL,
+                    calc = calculator(parameters= parameters, files=filesL,
                                   keep_tmp_files=True, tmp_dir=tmpdir)
                 else:
-                    calc = LAMMPS(parameters=parameters,files=filesL,
+                    calc = calculator(parameters=parameters,files=filesL,
                                   keep_tmp_files=True, tmp_dir=os.path.join(path, 'LAMMPSFiles'))
             else:
                 path = os.path.join(os.getcwd(), '{0}-rank{1}'.format(Optimizer.filename, rank))
                 # calc = LAMMPS(parameters = parameters, keep_tmp_files = True, \
                 #    tmp_dir = os.path.join(path, 'LAMMPSFiles'))
-                if Optimizer.parallel and ('Island_Method' not in Optimizer.algorithm_type):
+                if Optimizer.parallel:
                     tmpdir = os.path.join(os.path.join(path, 'LAMMPSFiles'), 'rank-{0}'.format(real_rank))
-                    calc = LAMMPS(parameters=parameters, keep_tmp_files=True, tmp_dir=tmpdir)
+                    calc = calculator(parameters=parameters, keep_tmp_files=True, tmp_dir=tmpdir)
                 else:
-                    calc = LAMMPS(parameters=parameters, keep_tmp_files=True, tmp_dir=os.path.join(path, 'LAMMPSFiles'))
+                    calc = calculator(parameters=parameters, keep_tmp_files=True, tmp_dir=os.path.join(path, 'LAMMPSFiles'))
         else:
             if filesL != None:
-                calc = LAMMPS(parameters=parameters, files=filesL)
+                calc = calculator(parameters=parameters, files=filesL)
             else:
-                calc = LAMMPS(parameters=parameters)
+                calc = calculator(parameters=parameters)
         return calc
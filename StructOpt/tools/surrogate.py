@@ -0,0 +1,75 @@
+import numpy
+
+__all__ = ['FitnessSurrogate']
+
+class FitnessSurrogate(object):
+    """Kernel ridge regression of the fitness on structure fingerprints.
+    Uses a gaussian kernel with the median distance between the training
+    fingerprints as width. Only the last maxsize samples are kept, and only
+    fingerprints with the length of the first sample are used, since the
+    fingerprint length changes with the species present. Fingerprints that
+    are not finite, as for overlapping atoms, are never used."""
+
+    def __init__(self, maxsize=500, alpha=1e-3):
+        self.maxsize = maxsize
+        self.alpha = alpha
+        self.X = []
+        self.y = []
+        self.length = None
+        self.weights = None
+
+    def __len__(self):
+        return len(self.y)
+
+    def usable(self, x):
+        return x is not None and len(x) == self.length and numpy.isfinite(x).all()
+
+    def add(self, x, y):
+        """Adds the fingerprint x of a structure with fitness y to the training set"""
+        x = numpy.ravel(numpy.asarray(x, dtype=float))
+        if self.length is None:
+            self.length = len(x)
+        if not self.usable(x) or not numpy.isfinite(y):
+            return
+        self.X.append(x)
+        self.y.append(float(y))
+        if len(self.y) > self.maxsize:
+            del self.X[0]
+            del self.y[0]
+        self.weights = None
+
+    def fit(self):
+        """Solves for the kernel weights of the current training set"""
+        X = numpy.array(self.X)
+        y = numpy.array(self.y)
+        d2 = squared_distances(X, X)
+        width = numpy.median(d2[numpy.triu_indices(len(y), 1)])
+        self.width = width if width > 0 else 1.0
+        self.mean = y.mean()
+        self.scale = y.std() or 1.0
+        K = numpy.exp(-d2/self.width)
+        K[numpy.diag_indices(len(y))] += self.alpha
+        self.weights = numpy.linalg.solve(K, (y - self.mean)/self.scale)
+        self.Xfit = X
+
+    def predict(self, features):
+        """Returns the predicted fitness of each fingerprint in features,
+        nan for fingerprints the model cannot be applied to"""
+        predictions = numpy.empty(len(features))
+        predictions.fill(numpy.nan)
+        if len(self.y) < 2:
+            return predictions
+        if self.weights is None:
+            self.fit()
+        use = [i for i, x in enumerate(features) if self.usable(x)]
+        if use:
+            X = numpy.array([features[i] for i in use])
+            K = numpy.exp(-squared_distances(X, self.Xfit)/self.width)
+            predictions[use] = self.mean + self.scale*K.dot(self.weights)
+        return predictions
+
+
+def squared_distances(A, B):
+    """Returns the matrix of squared euclidean distances between the rows of A and B"""
+    d2 = (A*A).sum(axis=1)[:, None] + (B*B).sum(axis=1)[None, :] - 2*A.dot(B.T)
+    return numpy.maximum(d2, 0)
@@ -0,0 +1,68 @@
+import time
+
+__all__ = ['Timers', 'timers']
+
+# Highest resolution wall clock available
+clock = getattr(time, 'perf_counter', time.time)
+
+class Timers(object):
+    """Accumulated wall-clock time and number of calls of named phases of a run.
+    Phases are timed with the timer context manager or added directly with add.
+    A phase timed inside another one is also included in the outer phase.
+    When enabled is False timing costs a single attribute lookup."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = {}
+
+    def add(self, name, seconds, count=1):
+        """Adds seconds and count calls to the phase name"""
+        if not self.enabled:
+            return
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [seconds, count]
+        else:
+            phase[0] += seconds
+            phase[1] += count
+
+    def timer(self, name):
+        """Returns a context manager adding the time spent inside it to the phase name"""
+        if not self.enabled:
+            return NULL_TIMER
+        return PhaseTimer(self, name)
+
+    def pop(self):
+        """Returns the {name: [seconds, calls]} dictionary of the phases and starts over"""
+        phases = self.phases
+        self.phases = {}
+        return phases
+
+
+class PhaseTimer(object):
+
+    def __init__(self, timers, name):
+        self.timers = timers
+        self.name = name
+
+    def __enter__(self):
+        self.start = clock()
+        return self
+
+    def __exit__(self, *args):
+        self.timers.add(self.name, clock() - self.start)
+        return False
+
+
+class NullTimer(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+NULL_TIMER = NullTimer()
+
+# Timers of the phases on this rank, switched on and off by the Optimizer timing parameter
+timers = Timers()
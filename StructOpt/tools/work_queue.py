@@ -0,0 +1,115 @@
+try:
+    from mpi4py import MPI
+except ImportError:
+    pass
+from StructOpt.tools.timing import timers
+
+# MPI message tags used by the work queue
+WORK_TAG = 21
+RESULT_TAG = 22
+
+
+def work_queue(individ, evaluate_indiv, Optimizer, *args):
+    """Dynamic MPI work-queue scheduler for the *_eval modules.
+    Rank 0 hands out one individual at a time, largest number of atoms first,
+    and sends the next individual to whichever rank returns a result, so no
+    rank waits for a full round to finish. Rank 0 evaluates the last
+    individual itself if every worker is still busy. Must be called on every
+    rank of the communicator of the Optimizer (its island in the island model).
+    Inputs:
+        individ = list of Individual class objects to evaluate (only used on rank 0)
+        evaluate_indiv = function called as evaluate_indiv(Optimizer, indiv, rank, *args)
+        Optimizer = structopt Optimizer class object
+        args = additional arguments passed on to evaluate_indiv
+    Outputs:
+        outs = list of evaluate_indiv outputs in the order of individ on rank 0,
+            empty list on all other ranks
+    """
+    comm = getattr(Optimizer, 'comm', MPI.COMM_WORLD)
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    if size == 1:
+        with timers.timer('busy'):
+            return [evaluate_indiv(Optimizer, ind, rank, *args) for ind in individ]
+
+    if rank == 0:
+        return work_queue_master(comm, individ, evaluate_indiv, Optimizer, args)
+    else:
+        work_queue_worker(comm, evaluate_indiv, Optimizer, args)
+        return []
+
+
+def work_queue_master(comm, individ, evaluate_indiv, Optimizer, args):
+    """Distributes the individuals to the worker ranks and collects the
+    results tagged with the position of each individual in individ.
+    Rank 0 only evaluates an individual itself when it is the last one left
+    and no result is waiting, so a worker never waits on rank 0 for work."""
+    # Longest expected job first, using the number of atoms as the cost estimate
+    queue = sorted(range(len(individ)), key=lambda i: get_natoms(individ[i]), reverse=True)
+    outs = [None for ind in individ]
+    requests = []
+
+    def dispatch(worker):
+        if queue:
+            i = queue.pop(0)
+            requests.append(comm.isend((i, individ[i]), dest=worker, tag=WORK_TAG))
+            return 1
+        requests.append(comm.isend(None, dest=worker, tag=WORK_TAG))
+        return 0
+
+    def collect(status):
+        i, out = comm.recv(source=MPI.ANY_SOURCE, tag=RESULT_TAG, status=status)
+        outs[i] = out
+        return dispatch(status.Get_source()) - 1
+
+    nbusy = 0
+    for worker in range(1, comm.Get_size()):
+        nbusy += dispatch(worker)
+
+    while nbusy > 0 or queue:
+        status = MPI.Status()
+        if queue and (nbusy == 0 or len(queue) == 1 and
+                not comm.Iprobe(source=MPI.ANY_SOURCE, tag=RESULT_TAG, status=status)):
+            # Last job and every worker busy, the workers finishing later are released
+            i = queue.pop()
+            with timers.timer('busy'):
+                outs[i] = evaluate_indiv(Optimizer, individ[i], comm.Get_rank(), *args)
+        else:
+            with timers.timer('idle'):
+                nbusy += collect(status)
+
+    MPI.Request.Waitall(requests)
+    return outs
+
+
+def work_queue_worker(comm, evaluate_indiv, Optimizer, args):
+    """Evaluates individuals received from rank 0 until it sends None.
+    Time spent evaluating is added to the busy timer and time spent waiting
+    for rank 0 to the idle timer."""
+    rank = comm.Get_rank()
+    request = None
+    while True:
+        with timers.timer('idle'):
+            job = comm.recv(source=0, tag=WORK_TAG)
+        if job is None:
+            break
+        i, ind = job
+        with timers.timer('busy'):
+            out = evaluate_indiv(Optimizer, ind, rank, *args)
+        if request is not None:
+            with timers.timer('idle'):
+                request.wait()
+        request = comm.isend((i, out), dest=0, tag=RESULT_TAG)
+    if request is not None:
+        with timers.timer('idle'):
+            request.wait()
+
+
+def get_natoms(indiv):
+    """Returns the number of atoms evaluated for an individual"""
+    natoms = len(indiv[0])
+    bulki = indiv.view('bulki')
+    if bulki is not None:
+        natoms += len(bulki)
+    return natoms